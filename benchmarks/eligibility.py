@@ -0,0 +1,89 @@
+"""Benchmark bulk eligibility checks against a local Redis.
+
+Seeds synthetic boost/owner data under throwaway channel ids, compares the
+per-user calls with the bulk APIs, then deletes the seeded keys. Uses the
+REDIS_* settings from the environment, so point it at a scratch database:
+
+    REDIS_HOST=localhost REDIS_DB=15 python -m benchmarks.eligibility --users 50000 --channels 3
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Callable, List
+
+from src.storage import RedisStorage
+
+# Far outside the real -100xxxxxxxxxx range, so seeded keys never collide
+BENCH_CHANNEL_BASE = -1009999000000000
+
+
+def _seed(storage: RedisStorage, channel_ids: List[int], user_ids: List[int], ratio: float) -> None:
+    """Give ``ratio`` of the users an active boost and ownership of each channel"""
+    client = storage.redis_client
+    expire_at = time.time() + 86400
+    for channel_id in channel_ids:
+        chosen = [uid for uid in user_ids if random.random() < ratio]
+        for start in range(0, len(chosen), 5000):
+            part = chosen[start:start + 5000]
+            pipe = client.pipeline(transaction=False)
+            pipe.zadd(f"channel:{channel_id}:boosts", {str(uid): expire_at for uid in part})
+            pipe.sadd(f"channel:{channel_id}:users", *part)
+            pipe.execute()
+
+
+def _cleanup(storage: RedisStorage, channel_ids: List[int]) -> None:
+    keys = [f"channel:{cid}:{suffix}" for cid in channel_ids for suffix in ("boosts", "users")]
+    storage.redis_client.delete(*keys)
+
+
+def _commands_processed(storage: RedisStorage) -> int:
+    return int(storage.redis_client.info("stats")["total_commands_processed"])
+
+
+def _measure(name: str, storage: RedisStorage, checks: int, fn: Callable[[], object]) -> None:
+    commands_before = _commands_processed(storage)
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    # -1: the INFO call itself
+    commands = _commands_processed(storage) - commands_before - 1
+    print(f"{name:<32} {elapsed * 1000:10.1f} ms {checks / elapsed:14.0f} checks/s {commands:10d} redis cmds")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.eligibility")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--channels", type=int, default=3)
+    parser.add_argument("--ratio", type=float, default=0.3, help="Share of users boosting each channel")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--skip-single", action="store_true", help="Skip the per-user baseline")
+    args = parser.parse_args(argv)
+
+    storage = RedisStorage()
+    channel_ids = [BENCH_CHANNEL_BASE - i for i in range(args.channels)]
+    user_ids = random.sample(range(10**6, 10**10), args.users)
+    checks = args.users * args.channels
+
+    _seed(storage, channel_ids, user_ids, args.ratio)
+    try:
+        if not args.skip_single:
+            _measure("has_channel_boost_user (loop)", storage, checks, lambda: [
+                storage.has_channel_boost_user(cid, uid) for cid in channel_ids for uid in user_ids
+            ])
+        _measure("filter_boosters", storage, checks, lambda: [
+            storage.filter_boosters(cid, user_ids, chunk_size=args.chunk_size) for cid in channel_ids
+        ])
+        _measure("boosters_across_channels", storage, checks, lambda: storage.boosters_across_channels(
+            channel_ids, user_ids, chunk_size=args.chunk_size
+        ))
+        _measure("filter_channel_owners", storage, checks, lambda: [
+            storage.filter_channel_owners(cid, user_ids, chunk_size=args.chunk_size) for cid in channel_ids
+        ])
+    finally:
+        _cleanup(storage, channel_ids)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,542 @@
+"""Replay recorded (or synthetic) updates through the bot's intake pipeline.
+
+Feeds a JSONL capture written with RECORD_UPDATES_PATH, or a synthetic mix
+of joins, kicks, boosts and /start commands, the way Telegram delivers them:
+joins, kicks and /start become Telethon updates run through the handlers
+ChatEventHandler and CommandHandler registered on the client, so channel
+work goes through the KeyedDispatcher and replies through the
+OutboundScheduler; boosts are served to the real boost poller over
+getUpdates. Telegram is replaced by the stubs in benchmarks/stubs.py:
+Telethon calls are answered in memory and Bot API calls go to a local aiohttp
+server, both with a configurable latency. Redis is real (REDIS_*, use a
+scratch database) unless --fake-redis is given. DISPATCH_* and SEND_* apply
+as in the bot; updates are handled one at a time with DISPATCH_OVERFLOW=block
+(sequential_updates), otherwise each gets its own task.
+
+Reports per-kind p50/p99 latency (arrival until every job the update queued
+has finished), updates dropped by the dispatcher or coalesced by the sender,
+sustained throughput, storage calls and Redis commands per event.
+--min-throughput and --max-p99-ms turn it into a CI gate (exit code 1 when
+missed):
+
+    REDIS_HOST=localhost REDIS_DB=15 python -m benchmarks.replay --synthetic 5000
+    REDIS_HOST=localhost REDIS_DB=15 python -m benchmarks.replay --input updates.jsonl --speed 10
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Type
+
+# Never talks to Telegram, so the credentials only have to parse
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "replay")
+os.environ.setdefault("BOT_TOKEN", "0:replay")
+
+from loguru import logger
+from telethon.errors import FloodWaitError
+from telethon.tl import types
+
+from src.bot_api import BotAPIClient
+from src.config import Config
+from src.handlers import ChatEventHandler, CommandHandler
+from src.metrics import HANDLER_ERRORS, REDIS_LATENCY
+from src.onboarding import ChannelOnboarding
+from src.sender import OutboundScheduler
+from src.storage import AsyncRedisStorage
+
+from .stubs import BOT_ID, StubBotAPI, StubTelegramClient
+
+# Throwaway ranges; channels are real-sized (-100 + 10 digits) since Telethon marks them
+BENCH_CHANNEL_BASE = -1009999000000
+BENCH_USER_BASE = 9900000000
+BENCH_UPDATE_BASE = 990000000
+
+KINDS = ("bot_added", "bot_removed", "boost", "start")
+
+BOOST_OFFSET_KEY = "bot:boost_updates:offset"
+
+def _synthetic(count: int, channels: int) -> List[Dict[str, Any]]:
+    """A mix weighted like production: mostly boosts and /start, some joins and kicks"""
+    now = time.time()
+    records = []
+    for i in range(count):
+        chat_id = BENCH_CHANNEL_BASE - random.randrange(channels)
+        user_id = BENCH_USER_BASE + random.randrange(count)
+        kind = random.choices(KINDS, weights=(2, 1, 5, 2))[0]
+        if kind == "boost":
+            boost = {"boost_id": f"bench-{i}", "source": {"source": "premium", "user": {"id": user_id}}}
+            if random.random() < 0.8:
+                update = {"chat_boost": {"chat": {"id": chat_id}, "boost": {
+                    **boost, "add_date": int(now), "expire_date": int(now) + 86400,
+                }}}
+            else:
+                update = {"removed_chat_boost": {"chat": {"id": chat_id}, "remove_date": int(now), **boost}}
+            records.append({"ts": now, "kind": kind, "update": {"update_id": BENCH_UPDATE_BASE + i, **update}})
+        elif kind == "start":
+            records.append({"ts": now, "kind": kind, "chat_id": user_id})
+        else:
+            records.append({"ts": now, "kind": kind, "chat_id": chat_id, "actor_id": user_id})
+    return records
+
+
+def _load(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return sorted((r for r in records if r.get("kind") in KINDS), key=lambda r: r["ts"])
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def _storage_calls() -> float:
+    return sum(
+        sample.value for metric in REDIS_LATENCY.collect() for sample in metric.samples
+        if sample.name.endswith("_count")
+    )
+
+
+def _handler_errors() -> float:
+    # Handlers log and swallow most failures, so count them from the metric
+    return sum(
+        sample.value for metric in HANDLER_ERRORS.collect() for sample in metric.samples
+        if sample.name.endswith("_total")
+    )
+
+
+async def _commands_processed(storage: AsyncRedisStorage) -> Optional[int]:
+    try:
+        return int((await storage.redis_client.info("stats"))["total_commands_processed"])
+    except Exception:
+        # fakeredis keeps no command stats
+        return None
+
+
+def _create_storage(fake: bool) -> AsyncRedisStorage:
+    if not fake:
+        return AsyncRedisStorage()
+    try:
+        from fakeredis import FakeServer
+        from fakeredis.aioredis import FakeConnection
+    except ImportError:
+        raise SystemExit("--fake-redis needs fakeredis: pip install fakeredis")
+    from redis.asyncio import ConnectionPool
+    return AsyncRedisStorage(ConnectionPool(
+        connection_class=FakeConnection, server=FakeServer(), decode_responses=True,
+    ))
+
+
+def _raw_channel_id(chat_id: int) -> int:
+    str_id = str(chat_id)
+    return int(str_id[4:]) if str_id.startswith("-100") else abs(chat_id)
+
+
+def _telethon_update(record: Dict[str, Any], seq: int) -> Tuple[types.TypeUpdate, List[types.User], List[types.Channel]]:
+    """The update Telegram sends for a join, kick or /start, with the entities that come along"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if record["kind"] == "start":
+        user_id = record["chat_id"]
+        message = types.Message(
+            id=seq, peer_id=types.PeerUser(user_id), date=now, message="/start", from_id=types.PeerUser(user_id),
+        )
+        return types.UpdateNewMessage(message=message, pts=seq, pts_count=1), [types.User(id=user_id)], []
+
+    channel_id = _raw_channel_id(record["chat_id"])
+    actor_id = record.get("actor_id") or BENCH_USER_BASE
+    participant = types.ChannelParticipantAdmin(
+        user_id=BOT_ID, promoted_by=actor_id, date=now, admin_rights=types.ChatAdminRights(),
+    )
+    joined = record["kind"] == "bot_added"
+    update = types.UpdateChannelParticipant(
+        channel_id=channel_id, date=now, actor_id=actor_id, user_id=BOT_ID, qts=seq,
+        prev_participant=None if joined else participant,
+        new_participant=participant if joined else None,
+    )
+    channel = types.Channel(
+        id=channel_id, title=f"Channel {channel_id}", photo=types.ChatPhotoEmpty(), date=now,
+        access_hash=1, broadcast=True,
+    )
+    return update, [types.User(id=actor_id), types.User(id=BOT_ID, bot=True)], [channel]
+
+
+class _InFlight:
+    """One Telethon update: finished once its handlers and every job they queued are done"""
+
+    def __init__(self, kind: str, arrival: float) -> None:
+        self.kind = kind
+        self.arrival = arrival
+        self.handling = 1
+        # Jobs waiting in or run by the dispatcher / the outbound scheduler
+        self.dispatched = 0
+        self.sending = 0
+        self.ran = 0
+        self.failed = False
+
+    @property
+    def finished(self) -> bool:
+        return not (self.handling or self.dispatched or self.sending)
+
+
+# The update whose handlers are running, so queued jobs can be traced back to it
+_current: ContextVar[Optional[_InFlight]] = ContextVar("replay_update", default=None)
+
+
+class _LeaderJobs:
+    """Collects the leader jobs the handlers register; the replay runs the boost poller itself"""
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Callable[[], Awaitable[None]]] = {}
+
+    def add_job(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        self.jobs[name] = job
+
+
+class Replay:
+    """A Bot stand-in wired to the stubs, plus the bookkeeping for the report"""
+
+    def __init__(self, storage: AsyncRedisStorage, client: StubTelegramClient,
+                 bot_api: BotAPIClient, telegram: StubBotAPI) -> None:
+        self.telegram = telegram
+        self.bot = SimpleNamespace(
+            storage=storage, client=client, bot_api=bot_api, recorder=None, leader=_LeaderJobs(),
+            me=types.User(id=BOT_ID, bot=True, username="replay_bot"), sender=OutboundScheduler(),
+        )
+        self.bot.onboarding = ChannelOnboarding(self.bot)
+        self.chat = ChatEventHandler(self.bot)
+        # Always apply in-process; the receiver/worker split is not measured here
+        self.chat.queue_work = False
+        self.commands = CommandHandler(self.bot)
+        # A cached Document, so replies never upload or rewrite bot:start_video
+        self.commands.start_video.use_media(types.InputDocument(id=4242, access_hash=4242, file_reference=b"ref"))
+        # As the bot: block applies backpressure through sequential_updates
+        self.sequential = Config.DISPATCH_OVERFLOW == "block"
+        self.latencies: Dict[str, List[float]] = {kind: [] for kind in KINDS}
+        self.errors: Dict[str, int] = {kind: 0 for kind in KINDS}
+        self.dropped: Dict[str, int] = {kind: 0 for kind in KINDS}
+        self.channels: Set[int] = set()
+        self.users: Set[int] = set()
+        self.boost_ids: Set[str] = set()
+        self.update_ids: Set[int] = set()
+        self._in_flight: Set[_InFlight] = set()
+        self._deliveries: Set[asyncio.Future] = set()
+        self._boost_arrivals: Dict[int, Deque[float]] = {}
+        self._boosts_left = 0
+        self._poller: Optional[asyncio.Task] = None
+        self._saved_offset: Optional[str] = None
+        self._trace_jobs()
+
+    def _trace_jobs(self) -> None:
+        """Wrap the dispatcher, the sender and boost ingestion to see when each update is done"""
+        dispatcher, sender = self.chat.dispatcher, self.bot.sender
+        dispatch, send = dispatcher.submit, sender.submit
+        ingest = self.chat._ingest_boost_updates
+
+        async def submit_job(key: Any, name: str, run: Callable[[], Awaitable[object]]) -> bool:
+            flight = _current.get()
+            if flight is None:
+                return await dispatch(key, name, run)
+            flight.dispatched += 1
+            accepted = await dispatch(key, name, self._traced(flight, "dispatched", run))
+            if not accepted:
+                self._release(flight, "dispatched")
+            return accepted
+
+        def submit_send(chat_id: int, run: Callable[[], Awaitable[object]], **kwargs: Any) -> bool:
+            flight = _current.get()
+            if flight is None:
+                return send(chat_id, run, **kwargs)
+            flight.sending += 1
+            # A flood wait re-queues the same job, so it is not finished yet
+            queued = send(chat_id, self._traced(flight, "sending", run, retried=FloodWaitError), **kwargs)
+            if not queued:
+                self._release(flight, "sending")
+            return queued
+
+        async def ingest_boosts(updates: List[dict], offset: Optional[int] = None) -> None:
+            try:
+                await ingest(updates, offset=offset)
+            except Exception:
+                # The poller fetches and applies the batch again
+                self.errors["boost"] += 1
+                raise
+            now = time.perf_counter()
+            for upd in updates:
+                arrivals = self._boost_arrivals.get(upd.get("update_id"))
+                if arrivals:
+                    self.latencies["boost"].append(now - arrivals.popleft())
+                    self._boosts_left -= 1
+
+        dispatcher.submit = submit_job
+        sender.submit = submit_send
+        self.chat._ingest_boost_updates = ingest_boosts
+
+    def _traced(self, flight: _InFlight, stage: str, run: Callable[[], Awaitable[object]],
+                retried: Tuple[Type[BaseException], ...] = ()) -> Callable[[], Awaitable[None]]:
+        async def traced() -> None:
+            try:
+                await run()
+            except retried:
+                raise
+            except BaseException:
+                flight.failed = True
+                self._release(flight, stage)
+                raise
+            flight.ran += 1
+            self._release(flight, stage)
+        return traced
+
+    def _release(self, flight: _InFlight, stage: str) -> None:
+        setattr(flight, stage, getattr(flight, stage) - 1)
+        if flight.finished and flight in self._in_flight:
+            self._in_flight.discard(flight)
+            if flight.failed:
+                self.errors[flight.kind] += 1
+            elif flight.ran:
+                self.latencies[flight.kind].append(time.perf_counter() - flight.arrival)
+            else:
+                # Dropped by the dispatcher or coalesced by the sender
+                self.dropped[flight.kind] += 1
+
+    async def start(self) -> None:
+        """Register the handlers and start the sender and the boost poller"""
+        # The replay's update ids must not be confirmed away by an earlier run's offset
+        self._saved_offset = await self.bot.storage.redis_client.get(BOOST_OFFSET_KEY)
+        await self.bot.storage.redis_client.delete(BOOST_OFFSET_KEY)
+        await self.chat.register()
+        await self.commands.register()
+        self.bot.sender.start()
+        self._poller = asyncio.ensure_future(self.bot.leader.jobs["boost-poller"]())
+
+    async def stop(self) -> None:
+        self.commands.stop()
+        await self.chat.stop(timeout=1)
+        await self.bot.sender.stop(timeout=0)
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+        for delivery in list(self._deliveries):
+            delivery.cancel()
+        await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+    def _remember(self, record: Dict[str, Any]) -> None:
+        """Note the keys a record touches so cleanup() can delete them"""
+        if record["kind"] == "boost":
+            update = record["update"]
+            payload = update.get("chat_boost") or update.get("removed_chat_boost") or {}
+            self.channels.add(self.chat._normalize_channel_id(payload.get("chat", {}).get("id", 0)))
+            boost = payload.get("boost", payload)
+            self.boost_ids.add(str(boost.get("boost_id")))
+            user_id = ((boost.get("source") or {}).get("user") or {}).get("id")
+            if user_id is not None:
+                self.users.add(user_id)
+            self.update_ids.add(update["update_id"])
+        elif record["kind"] != "start":
+            self.channels.add(record["chat_id"])
+            if record.get("actor_id"):
+                self.users.add(record["actor_id"])
+
+    async def _deliver(self, flight: _InFlight, update: types.TypeUpdate,
+                       users: List[types.User], chats: List[types.Channel]) -> None:
+        _current.set(flight)
+        try:
+            await self.bot.client.dispatch_update(update, users, chats)
+        except Exception as e:
+            flight.failed = True
+            logger.debug(f"Handlers for {flight.kind} raised: {str(e)}")
+        finally:
+            self._release(flight, "handling")
+
+    def _arrive(self, record: Dict[str, Any], arrival: float, seq: int) -> Optional[asyncio.Future]:
+        """Hand one record to the stub Telegram; returns the handler task for Telethon updates"""
+        self._remember(record)
+        if record["kind"] == "boost":
+            update = record["update"]
+            self._boost_arrivals.setdefault(update["update_id"], deque()).append(arrival)
+            self._boosts_left += 1
+            self.telegram.push_update(update)
+            return None
+        flight = _InFlight(record["kind"], arrival)
+        self._in_flight.add(flight)
+        delivery = asyncio.ensure_future(self._deliver(flight, *_telethon_update(record, seq)))
+        self._deliveries.add(delivery)
+        delivery.add_done_callback(self._deliveries.discard)
+        return delivery
+
+    async def run(self, records: List[Dict[str, Any]], rate: float, speed: float, drain_timeout: float) -> float:
+        """Deliver every record on schedule and wait until all are handled; returns the elapsed wall time"""
+        records = [r for r in records if r["kind"] != "boost" or "update_id" in r["update"]]
+        first_ts = records[0]["ts"] if records else 0.0
+        seq = itertools.count(1)
+        started = time.perf_counter()
+        for i, record in enumerate(records):
+            if speed > 0:
+                due = started + (record["ts"] - first_ts) / speed
+            elif rate > 0:
+                due = started + i / rate
+            else:
+                due = started
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Latency counts from arrival, so backpressure on the feed shows up in it
+            delivery = self._arrive(record, max(due, started), next(seq))
+            if delivery is not None and self.sequential:
+                await delivery
+            elif i % 100 == 99:
+                # Let handlers run between arrivals, as the network would
+                await asyncio.sleep(0)
+        await self._drain(time.perf_counter() + drain_timeout)
+        return time.perf_counter() - started
+
+    async def _drain(self, deadline: float) -> None:
+        dispatcher = self.chat.dispatcher
+        while (self._in_flight or self._boosts_left > 0) and time.perf_counter() < deadline:
+            if not self._deliveries and not dispatcher.depth and not dispatcher.running:
+                # Whatever still waits on the dispatcher was dropped by drop_oldest
+                for flight in list(self._in_flight):
+                    if flight.dispatched:
+                        flight.dispatched = 1
+                        self._release(flight, "dispatched")
+            await asyncio.sleep(0.01)
+        for flight in self._in_flight:
+            logger.warning(f"{flight.kind} update not finished after the drain timeout")
+            self.dropped[flight.kind] += 1
+        if self._boosts_left > 0:
+            logger.warning(f"{self._boosts_left} boost updates not applied after the drain timeout")
+            self.dropped["boost"] += self._boosts_left
+
+    async def cleanup(self) -> None:
+        """Delete what the replay wrote under the channels, users and boosts it touched"""
+        client = self.bot.storage.redis_client
+        for channel_id in self.channels:
+            self.users.update(int(uid) for uid in await client.smembers(f"channel:{channel_id}:users"))
+        keys = [f"channel:{cid}:{suffix}" for cid in self.channels for suffix in ("users", "info", "boosts")]
+        keys += [f"user:{uid}:channels" for uid in self.users]
+        keys += [f"boost:{bid}" for bid in self.boost_ids]
+        pipe = client.pipeline(transaction=False)
+        for start in range(0, len(keys), 1000):
+            pipe.delete(*keys[start:start + 1000])
+        if self.channels:
+            pipe.srem("boosts:channels", *self.channels)
+        if self.update_ids:
+            pipe.zrem("bot:boost_updates:seen", *self.update_ids)
+        if self._saved_offset is not None:
+            pipe.set(BOOST_OFFSET_KEY, self._saved_offset)
+        else:
+            pipe.delete(BOOST_OFFSET_KEY)
+        await pipe.execute()
+
+
+async def _main(args: argparse.Namespace) -> int:
+    records = _load(args.input) if args.input else _synthetic(args.synthetic, args.channels)
+    if not records:
+        print("No updates to replay")
+        return 1
+
+    # Boosts always come from the stub over getUpdates
+    Config.BOOST_UPDATES_MODE = "polling"
+    if args.dispatch_overflow:
+        Config.DISPATCH_OVERFLOW = args.dispatch_overflow
+    if args.dispatch_concurrency:
+        Config.DISPATCH_CONCURRENCY = args.dispatch_concurrency
+    if args.send_rate:
+        Config.SEND_GLOBAL_RATE = args.send_rate
+
+    storage = _create_storage(args.fake_redis)
+    stub_api = StubBotAPI(latency=args.api_latency_ms / 1000)
+    await stub_api.start()
+    bot_api = BotAPIClient(base_url=stub_api.url)
+    replay = Replay(storage, StubTelegramClient(latency=args.mtproto_latency_ms / 1000), bot_api, stub_api)
+
+    calls_before = _storage_calls()
+    errors_before = _handler_errors()
+    commands_before = await _commands_processed(storage)
+    try:
+        await replay.start()
+        elapsed = await replay.run(records, args.rate, args.speed, args.drain_timeout)
+        await replay.stop()
+        # The poller keeps polling while idle; only count what the updates cost
+        calls = _storage_calls() - calls_before
+        handler_errors = _handler_errors() - errors_before
+        commands_after = await _commands_processed(storage)
+    finally:
+        await replay.cleanup()
+        await bot_api.close()
+        await stub_api.stop()
+        await storage.close()
+
+    total = len(records)
+    throughput = total / elapsed if elapsed else 0.0
+    print(f"{'kind':<12} {'events':>8} {'dropped':>8} {'errors':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for kind in KINDS:
+        values = replay.latencies[kind]
+        if values or replay.errors[kind] or replay.dropped[kind]:
+            print(f"{kind:<12} {len(values):>8} {replay.dropped[kind]:>8} {replay.errors[kind]:>8} "
+                  f"{_percentile(values, 50) * 1000:>10.1f} {_percentile(values, 99) * 1000:>10.1f}")
+    all_latencies = [v for values in replay.latencies.values() for v in values]
+    p99_ms = _percentile(all_latencies, 99) * 1000
+    print(f"{total} events in {elapsed:.2f}s: {throughput:.0f} events/s, p99 {p99_ms:.1f} ms "
+          f"(dispatch {Config.DISPATCH_OVERFLOW}, concurrency {Config.DISPATCH_CONCURRENCY})")
+    print(f"storage calls/event: {calls / total:.2f}")
+    if commands_before is not None and commands_after is not None:
+        # -1: the INFO call itself
+        print(f"redis commands/event: {(commands_after - commands_before - 1) / total:.2f}")
+    else:
+        print("redis commands/event: n/a")
+    print(f"handler errors: {handler_errors:.0f}")
+    print(f"bot api calls: {stub_api.calls}, mtproto calls: {replay.bot.client.calls}")
+
+    failed = False
+    if args.min_throughput and throughput < args.min_throughput:
+        print(f"FAIL: throughput {throughput:.0f} events/s below {args.min_throughput:.0f}")
+        failed = True
+    if args.max_p99_ms and p99_ms > args.max_p99_ms:
+        print(f"FAIL: p99 {p99_ms:.1f} ms above {args.max_p99_ms:.1f}")
+        failed = True
+    if sum(replay.errors.values()) or handler_errors:
+        print(f"FAIL: {sum(replay.errors.values())} events raised, {handler_errors:.0f} handler errors")
+        failed = True
+    return 1 if failed else 0
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replay")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL capture written with RECORD_UPDATES_PATH")
+    source.add_argument("--synthetic", type=int, help="Generate this many synthetic updates")
+    parser.add_argument("--channels", type=int, default=200, help="Channels the synthetic updates spread over")
+    parser.add_argument("--rate", type=float, default=0, help="Arrival rate in events/s (0: as fast as possible)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Replay recorded timestamps at this multiple of real time (overrides --rate)")
+    parser.add_argument("--dispatch-overflow", choices=("block", "drop_oldest", "reject"),
+                        help="Override DISPATCH_OVERFLOW")
+    parser.add_argument("--dispatch-concurrency", type=int, help="Override DISPATCH_CONCURRENCY")
+    parser.add_argument("--send-rate", type=float, help="Override SEND_GLOBAL_RATE (messages/s)")
+    parser.add_argument("--drain-timeout", type=float, default=60,
+                        help="Seconds to wait for queued work after the last arrival")
+    parser.add_argument("--api-latency-ms", type=float, default=50, help="Stub Bot API response time")
+    parser.add_argument("--mtproto-latency-ms", type=float, default=50, help="Stub Telethon call time")
+    parser.add_argument("--fake-redis", action="store_true", help="Use fakeredis instead of REDIS_*")
+    parser.add_argument("--min-throughput", type=float, default=0, help="Fail below this many events/s")
+    parser.add_argument("--max-p99-ms", type=float, default=0, help="Fail when overall p99 exceeds this")
+    parser.add_argument("--verbose", action="store_true", help="Keep the handlers' INFO logging")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,261 @@
+"""Stand-ins for Telegram used by the replay benchmark.
+
+``StubBotAPI`` is a local aiohttp server speaking the few Bot API methods
+the handlers and the boost poller call; ``BotAPIClient(base_url=stub.url)``
+talks to it over real HTTP. ``StubTelegramClient`` implements the Telethon
+client methods the handlers use, answers them in memory and runs registered
+event handlers for the updates it is given. Both can add a fixed latency to
+approximate Telegram round trips.
+"""
+import asyncio
+import inspect
+import itertools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+from telethon import events, utils
+from telethon.events.common import EventCommon
+from telethon.tl import types
+
+BOT_ID = 7000000000
+
+
+class StubBotAPI:
+    """Local Bot API server: getChat, invite links, getFile and getUpdates"""
+
+    # Long polls return empty after this long so shutdown never waits on one
+    POLL_WAIT = 1.0
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.calls: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        # Updates not yet confirmed by a getUpdates offset past them
+        self._updates: List[Dict[str, Any]] = []
+        self._new_updates = asyncio.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 picks a free port; read back the real one
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if method == "getUpdates":
+            result = await self._get_updates(params)
+        else:
+            result = self._result(method, params)
+        if result is None:
+            return web.json_response({"ok": False, "error_code": 400, "description": f"stub: no {method}"})
+        return web.json_response({"ok": True, "result": result})
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        chat_id = params.get("chat_id")
+        if method == "getChat":
+            return {
+                "id": chat_id,
+                "type": "channel",
+                "title": f"Channel {chat_id}",
+                "invite_link": f"https://t.me/+stub{abs(chat_id)}",
+                "photo": {"small_file_id": f"small-{chat_id}", "big_file_id": f"big-{chat_id}"},
+            }
+        if method in ("createChatInviteLink", "exportChatInviteLink"):
+            link = f"https://t.me/+stub{abs(chat_id)}"
+            return {"invite_link": link} if method == "createChatInviteLink" else link
+        if method == "getFile":
+            return {"file_id": params.get("file_id"), "file_path": f"photos/{params.get('file_id')}.jpg"}
+        if method == "deleteWebhook":
+            return True
+        return None
+
+    def push_update(self, update: Dict[str, Any]) -> None:
+        """Make ``update`` available to getUpdates"""
+        self._updates.append(update)
+        self._new_updates.set()
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # As Telegram does: an offset confirms every update before it
+        offset = params.get("offset", 0)
+        self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), min(params.get("timeout", 0), self.POLL_WAIT))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:params.get("limit", 100)]
+
+
+class _Participant:
+    """What iter_participants yields: the user id plus the participant role"""
+
+    def __init__(self, user_id: int, creator: bool) -> None:
+        self.id = user_id
+        self.participant = (
+            types.ChannelParticipantCreator(user_id=user_id, admin_rights=types.ChatAdminRights())
+            if creator else
+            types.ChannelParticipantAdmin(
+                user_id=user_id, promoted_by=user_id, date=None, admin_rights=types.ChatAdminRights(),
+            )
+        )
+
+
+class _CachedEntity:
+    """An entity as the client's cache hands it to events"""
+
+    def __init__(self, input_peer: Any) -> None:
+        self.input_peer = input_peer
+
+    def _as_input_peer(self) -> Any:
+        return self.input_peer
+
+
+class _EntityMap:
+    """The stub's entity cache: input peers of every user and chat seen in a dispatched update.
+
+    Events fall back to ``client._mb_entity_cache.get(id)`` for entities
+    an update did not carry; ``None`` there means "unknown".
+    """
+
+    def __init__(self, self_id: int) -> None:
+        self.self_id = self_id
+        self._peers: Dict[int, Any] = {}
+
+    def get(self, entity_id: int) -> Optional[_CachedEntity]:
+        peer = self._peers.get(entity_id)
+        return _CachedEntity(peer) if peer is not None else None
+
+    def extend(self, entities: Iterable[Any]) -> None:
+        for entity in entities:
+            if getattr(entity, "access_hash", None) is not None:
+                self._peers[entity.id] = utils.get_input_peer(entity)
+
+
+class StubTelegramClient:
+    """In-memory subset of TelegramClient used by the chat and command handlers"""
+
+    def __init__(self, latency: float = 0.0, admins_per_channel: int = 3) -> None:
+        self.latency = latency
+        self.admins_per_channel = admins_per_channel
+        self.calls: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        # What the event builders read from a real client
+        self._self_id = BOT_ID
+        self._mb_entity_cache = _EntityMap(BOT_ID)
+        self._event_builders: List[Tuple[Any, Any]] = []
+
+    async def _rpc(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def is_connected(self) -> bool:
+        return True
+
+    def build_reply_markup(self, buttons: Any) -> Any:
+        return None
+
+    def add_event_handler(self, callback: Any, event: Any = None) -> None:
+        if event is None:
+            event = events.Raw()
+        elif isinstance(event, type):
+            event = event()
+        self._event_builders.append((event, callback))
+
+    def remove_event_handler(self, callback: Any, event: Any = None) -> int:
+        kept = [
+            (builder, cb) for builder, cb in self._event_builders
+            if cb != callback or (event is not None and not isinstance(builder, event))
+        ]
+        removed = len(self._event_builders) - len(kept)
+        self._event_builders = kept
+        return removed
+
+    async def dispatch_update(self, update: types.TypeUpdate,
+                              users: Iterable[types.User] = (), chats: Iterable[types.Channel] = ()) -> None:
+        """Run the registered handlers for ``update`` as TelegramClient._dispatch_update does.
+
+        ``users`` and ``chats`` are the entities Telegram sends along with
+        the update. Unlike Telethon, a handler's exception propagates.
+        """
+        update._entities = {utils.get_peer_id(x): x for x in itertools.chain(users, chats)}
+        self._mb_entity_cache.extend(update._entities.values())
+        built: Dict[type, Any] = {}
+        for builder, callback in list(self._event_builders):
+            kind = type(builder)
+            if kind not in built:
+                event = built[kind] = builder.build(update, None, self._self_id)
+                if isinstance(event, EventCommon):
+                    event.original_update = update
+                    event._entities = update._entities
+                    event._set_client(self)
+                elif event:
+                    event._client = self
+            event = built[kind]
+            if not event:
+                continue
+            if not builder.resolved:
+                await builder.resolve(self)
+            matched = builder.filter(event)
+            if inspect.isawaitable(matched):
+                matched = await matched
+            if not matched:
+                continue
+            try:
+                await callback(event)
+            except events.StopPropagation:
+                break
+
+    async def get_me(self) -> types.User:
+        return types.User(id=BOT_ID, bot=True, username="replay_bot")
+
+    async def get_entity(self, peer: Any) -> types.Channel:
+        await self._rpc("get_entity")
+        # InputChannel/PeerChannel carry the raw id; a bare int is a -100 Bot API id
+        channel_id = getattr(peer, "channel_id", None)
+        if channel_id is None:
+            channel_id = int(str(peer)[4:]) if str(peer).startswith("-100") else abs(peer)
+        return types.Channel(
+            id=channel_id, title=f"Channel {channel_id}", photo=types.ChatPhotoEmpty(), date=None,
+            access_hash=1, username=None, broadcast=True,
+        )
+
+    async def iter_participants(self, chat: Any, filter: Any = None):
+        await self._rpc("iter_participants")
+        base = abs(chat.id) * 10
+        for i in range(self.admins_per_channel):
+            yield _Participant(base + i, creator=i == 0)
+
+    async def upload_file(self, path: str) -> types.InputFile:
+        await self._rpc("upload_file")
+        return types.InputFile(id=next(self._ids), parts=1, name=path, md5_checksum="")
+
+    async def send_message(self, chat_id: int, message: str, **kwargs: Any) -> types.Message:
+        await self._rpc("send_message")
+        document = types.Document(
+            id=4242, access_hash=4242, file_reference=b"ref", date=None,
+            mime_type="video/mp4", size=1, dc_id=2, attributes=[],
+        )
+        return types.Message(
+            id=next(self._ids), peer_id=types.PeerUser(chat_id), date=None, message=message,
+            media=types.MessageMediaDocument(document=document),
+        )
@@ -1,3 +1,4 @@
+import asyncio
 from loguru import logger
 from src.bot import Bot
 import sys
@@ -10,11 +11,10 @@ if __name__ == "__main__":
         logger.remove()
         logger.add(sys.stdout, level="INFO")
         
-        # Start health server
+        # Probes answer from the start: live while starting, ready once handlers are registered
         start_health_server(Config.HEALTH_PORT)
 
-        # Start bot
-        bot = Bot()
-        bot.run()
+        # Start bot; SIGTERM/SIGINT trigger a graceful shutdown
+        asyncio.run(Bot().run())
     except Exception as e:
-        logger.exception(f"Bot crashed: {str(e)}") 
\ No newline at end of file
+        logger.exception(f"Bot crashed: {str(e)}")
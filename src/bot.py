@@ -1,49 +1,225 @@
+import asyncio
+import signal
 from telethon import TelegramClient
-from telethon.sessions import StringSession
+from telethon.tl.types import User
 from loguru import logger
-from typing import Optional
+from typing import Coroutine, List, Optional
 
 from .config import Config
-from .storage import RedisStorage
+from .storage import AsyncRedisStorage
+from .session import RedisSession
+from .bot_api import BotAPIClient
+from .onboarding import ChannelOnboarding
+from .photos import PhotoApiServer, PhotoUrlResolver
+from .reconciler import ChannelReconciler
+from .leader import LeaderElection
+from .lifecycle import Deadline, inflight
+from .metrics import monitor_event_loop_lag, track_queue_depth
+from .health import HealthMonitor, health
+from .recorder import UpdateRecorder
+from .sender import OutboundScheduler
+from .worker import ChannelWorker
 from .handlers import ChatEventHandler, CommandHandler
 
 class Bot:
     def __init__(self) -> None:
-        """Initialize bot instance"""
-        self.storage: RedisStorage = RedisStorage()
+        """Initialize bot instance; nothing here touches the network"""
+        self.storage: AsyncRedisStorage = AsyncRedisStorage()
+        self.bot_api: BotAPIClient = BotAPIClient()
+        self.role = Config.BOT_ROLE
+        if self.role == "worker" and not Config.WORK_CONSUMER:
+            # A per-pod default (the hostname) would leave a new session behind on every reschedule
+            raise RuntimeError("BOT_ROLE=worker requires a stable WORK_CONSUMER, e.g. the StatefulSet pod name")
+        # Workers log in with their own session and take no updates from Telegram
+        self.session_name = Config.WORK_CONSUMER if self.role == "worker" else None
+        self.session: Optional[RedisSession] = None
+        self.client: Optional[TelegramClient] = None
+        self.sender: OutboundScheduler = OutboundScheduler()
+        self.photos: PhotoUrlResolver = PhotoUrlResolver(self)
+        self.photo_api: Optional[PhotoApiServer] = None
+        self.leader: LeaderElection = LeaderElection(self.storage)
+        # Capture of incoming updates for benchmarks/replay.py (off unless configured)
+        self.recorder: Optional[UpdateRecorder] = (
+            UpdateRecorder(Config.RECORD_UPDATES_PATH) if Config.RECORD_UPDATES_PATH else None
+        )
+        # Created in start(), once the Telegram client exists
+        self.onboarding: Optional[ChannelOnboarding] = None
+        self.reconciler: Optional[ChannelReconciler] = None
+        self.chat_handler: Optional[ChatEventHandler] = None
+        self.command_handler: Optional[CommandHandler] = None
+        self.worker: Optional[ChannelWorker] = None
+        # Bot identity never changes; resolved in start() and on reconnect
+        self.me: Optional[User] = None
+        self._leader_task: Optional[asyncio.Task] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        # Background loops that hold no work of their own; cancelled last
+        self._tasks: List[asyncio.Task] = []
+
+    def _spawn(self, coro: Coroutine) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.append(task)
+        return task
+
+    async def refresh_identity(self) -> User:
+        """Resolve the bot's own user (id, username) via get_me"""
+        self.me = await self.client.get_me()
+        logger.info(f"Bot identity resolved: @{self.me.username} ({self.me.id})")
+        return self.me
+
+    async def _watch_reconnects(self, interval: float = 5.0) -> None:
+        """Refresh the cached identity after the client reconnects"""
+        was_connected = self.client.is_connected()
+        while True:
+            await asyncio.sleep(interval)
+            connected = self.client.is_connected()
+            if connected and not was_connected:
+                try:
+                    await self.refresh_identity()
+                except Exception as e:
+                    logger.warning(f"Failed to refresh bot identity after reconnect: {str(e)}")
+                    connected = False
+            was_connected = connected
+
+    async def _flush_session_periodically(self) -> None:
+        """Persist new entities and update states every SESSION_FLUSH_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(Config.SESSION_FLUSH_INTERVAL)
+            try:
+                await self.session.flush(self.storage, self.session_name)
+            except Exception as e:
+                logger.warning(f"Failed to persist session cache: {str(e)}")
 
-        existing_session = self.storage.get_bot_session()
-        session = StringSession(existing_session) if existing_session else StringSession()
+    async def _connect_telegram(self) -> None:
+        """Log in with the session, entity cache and update state kept in Redis"""
+        existing_session, (entities, update_states) = await asyncio.gather(
+            self.storage.get_bot_session(self.session_name),
+            self.storage.get_session_cache(self.session_name),
+        )
+        # Access hashes and update state from the previous run: no re-resolving
+        # entities after a deploy, and updates missed while down are caught up
+        self.session = RedisSession(existing_session, entities, update_states)
+        logger.info(f"Loaded {len(entities)} cached entities and {len(update_states)} update states")
 
-        self.client: TelegramClient = TelegramClient(
-            session,
+        self.client = TelegramClient(
+            self.session,
             Config.API_ID,
-            Config.API_HASH
-        ).start(bot_token=Config.BOT_TOKEN)
+            Config.API_HASH,
+            receive_updates=self.role != "worker",
+            catch_up=self.role != "worker",
+            # Handlers waiting on a full dispatcher hold back the update loop instead of piling up as tasks
+            sequential_updates=Config.DISPATCH_OVERFLOW == "block",
+        )
+        await self.client.start(bot_token=Config.BOT_TOKEN)
 
         if not existing_session:
             try:
-                self.storage.save_bot_session(self.client.session.save())
+                await self.storage.save_bot_session(self.session.save(), self.session_name)
                 logger.info("Bot StringSession saved to Redis")
             except Exception as e:
                 logger.error(f"Failed to save bot session: {str(e)}")
-        self.chat_handler: Optional[ChatEventHandler] = None
-        self.command_handler: Optional[CommandHandler] = None
 
-    async def setup(self) -> None:
-        """Setup bot handlers and initialize components"""
+    async def start(self) -> None:
+        """Connect to Redis and Telegram, then initialize components and register handlers"""
+        await self._connect_telegram()
+        await self.refresh_identity()
+        self.onboarding = ChannelOnboarding(self)
+        self.reconciler = ChannelReconciler(self)
+
+        self._spawn(self._watch_reconnects())
+        self._spawn(monitor_event_loop_lag())
+        self._spawn(self._flush_session_periodically())
+        track_queue_depth("onboarding_inflight", lambda: self.onboarding.inflight)
+
         self.chat_handler = ChatEventHandler(self)
+        if self.role == "worker":
+            # Channel work only; update intake runs in the receiver
+            self.worker = ChannelWorker(self, self.chat_handler)
+            self._worker_task = asyncio.ensure_future(self.worker.run())
+            logger.info("Bot worker started")
+            return
+
+        self.sender.start()
+        if Config.PHOTO_API_TOKEN:
+            self.photo_api = PhotoApiServer(self.photos)
+            await self.photo_api.start()
+        track_queue_depth("outbound", lambda: self.sender.depth)
         self.command_handler = CommandHandler(self)
-        
+
+        # Upload (or load) the /start video before users ask for it
+        await self.command_handler.start_video.warm()
+        self._spawn(self.command_handler.start_video.watch_updates())
         await self.chat_handler.register()
         await self.command_handler.register()
-        
+
+        if Config.RECONCILE_ENABLED:
+            self.leader.add_job("reconciler", self.reconciler.run)
+        # Singleton jobs start once this replica wins the leader lease
+        self._leader_task = asyncio.ensure_future(self.leader.run())
+
         logger.info("Bot handlers registered successfully")
 
-    def run(self) -> None:
-        """Run the bot"""
+    async def shutdown(self) -> None:
+        """Stop intake, drain in-flight work within SHUTDOWN_TIMEOUT, then close connections"""
+        health.ready = False
+        health.draining = True
+        deadline = Deadline(Config.SHUTDOWN_TIMEOUT)
+        logger.info(f"Shutting down (up to {Config.SHUTDOWN_TIMEOUT:.0f}s)...")
+
+        # 1. No new work: commands, updates, polling, partition rebalancing
+        if self.command_handler is not None:
+            self.command_handler.stop()
+        if self.photo_api is not None:
+            await self.photo_api.stop()
+        for task in (self._worker_task, self._leader_task):
+            if task is not None:
+                # The leader hands its lease over; the poller's batch is shielded
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        # 2. Finish what was already accepted
+        if self.chat_handler is not None:
+            await self.chat_handler.stop(deadline.remaining())
+        if self.worker is not None:
+            await self.worker.stop(deadline.remaining())
+        if not await inflight.wait_idle(deadline.remaining()):
+            logger.warning(f"{inflight.count} handlers still running at shutdown")
+        await self.sender.stop(deadline.remaining())
+
+        # 3. Background loops, then persist and close
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.bot_api.close()
+        if self.client is not None:
+            # Disconnecting writes the final pts/qts into the session; flush after it,
+            # or the next start catches up from a stale state and replays handled updates
+            await self.client.disconnect()
+        if self.session is not None:
+            try:
+                await self.session.flush(self.storage, self.session_name)
+            except Exception as e:
+                logger.warning(f"Failed to persist session cache on shutdown: {str(e)}")
+        await self.storage.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        logger.info("Bot stopped")
+
+    async def run(self) -> None:
+        """Run until SIGTERM/SIGINT or disconnection, then shut down gracefully"""
         logger.info("Starting bot...")
-        
-        with self.client:
-            self.client.loop.run_until_complete(self.setup())
-            self.client.run_until_disconnected() 
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+        # Liveness works from the first moment; readiness waits for start()
+        self._spawn(HealthMonitor(self).run())
+        try:
+            await self.start()
+            health.ready = True
+            logger.info("Bot is ready")
+            stopped = asyncio.ensure_future(stop.wait())
+            await asyncio.wait([stopped, self.client.disconnected], return_when=asyncio.FIRST_COMPLETED)
+            stopped.cancel()
+        finally:
+            await self.shutdown()
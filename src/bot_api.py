@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from loguru import logger
+
+from .config import Config
+from .metrics import BOT_API_ERRORS, BOT_API_LATENCY
+
+
+class BotAPIError(Exception):
+    """Bot API call returned ok=false (after retries, if retryable)"""
+
+    def __init__(self, method: str, description: str, error_code: Optional[int] = None,
+                 parameters: Optional[Dict] = None) -> None:
+        super().__init__(f"{method} failed ({error_code}): {description}")
+        self.method = method
+        self.description = description
+        self.error_code = error_code
+        self.parameters = parameters or {}
+
+
+class BotAPIClient:
+    """Shared async Telegram Bot API client.
+
+    Keeps one aiohttp session with a keep-alive connection pool for the
+    lifetime of the bot. Flood limits (429) are retried after Telegram's
+    ``retry_after`` and 5xx responses (JSON or not) with exponential
+    backoff. Network errors and timeouts are retried only for calls made
+    with ``idempotent=True``: a request that timed out may still have been
+    applied, and repeating e.g. createChatInviteLink would create a second
+    link. ``base_url`` can point at a local stub server.
+    """
+
+    def __init__(self,
+                 token: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None,
+                 pool_size: Optional[int] = None) -> None:
+        self.token = token or Config.BOT_TOKEN
+        self.base_url = (base_url or Config.BOT_API_URL).rstrip("/")
+        self.timeout = timeout if timeout is not None else Config.BOT_API_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else Config.BOT_API_MAX_RETRIES
+        self.pool_size = pool_size or Config.BOT_API_POOL_SIZE
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the HTTP session lazily so it binds to the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session and its connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None, idempotent: bool = False) -> Any:
+        """Call a Bot API method and return its ``result``"""
+        started = time.perf_counter()
+        try:
+            return await self._call(method, params, timeout, idempotent)
+        except BotAPIError as e:
+            BOT_API_ERRORS.labels(method, str(e.error_code)).inc()
+            raise
+        except Exception:
+            BOT_API_ERRORS.labels(method, "network").inc()
+            raise
+        finally:
+            BOT_API_LATENCY.labels(method).observe(time.perf_counter() - started)
+
+    async def _call(self, method: str, params: Optional[Dict[str, Any]],
+                    timeout: Optional[float], idempotent: bool) -> Any:
+        """One logical call, with retries"""
+        url = f"{self.base_url}/bot{self.token}/{method}"
+        request_timeout = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeout)
+        attempt = 0
+        while True:
+            try:
+                async with self._get_session().post(url, json=params or {}, timeout=request_timeout) as resp:
+                    status = resp.status
+                    body = await resp.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning(f"Bot API {method} network error: {e!r}, retrying in {delay}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                data = json.loads(body)
+            except ValueError:
+                # A proxy error page rather than Telegram's JSON: classify it by HTTP status
+                data = {"ok": False, "error_code": status, "description": f"non-JSON response: {body[:200]!r}"}
+
+            if data.get("ok"):
+                return data.get("result")
+
+            error_code = data.get("error_code")
+            parameters = data.get("parameters") or {}
+            retryable = error_code == 429 or (error_code is not None and error_code >= 500)
+            if not retryable or attempt >= self.max_retries:
+                raise BotAPIError(method, data.get("description", ""), error_code, parameters)
+
+            if error_code == 429:
+                delay = int(parameters.get("retry_after", 1))
+            else:
+                delay = min(2 ** attempt, 30)
+            logger.warning(f"Bot API {method} returned {error_code}, retrying in {delay}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_chat(self, chat_id: int) -> Dict:
+        """getChat: full chat info including invite_link and photo file ids"""
+        return await self.call("getChat", {"chat_id": chat_id}, idempotent=True)
+
+    async def create_chat_invite_link(self, chat_id: int) -> Dict:
+        """createChatInviteLink: returns a ChatInviteLink object"""
+        return await self.call("createChatInviteLink", {"chat_id": chat_id})
+
+    async def export_chat_invite_link(self, chat_id: int) -> str:
+        """exportChatInviteLink: returns the new primary invite link"""
+        return await self.call("exportChatInviteLink", {"chat_id": chat_id})
+
+    async def get_file(self, file_id: str) -> Dict:
+        """getFile: returns a File object with a temporary file_path"""
+        return await self.call("getFile", {"file_id": file_id}, idempotent=True)
+
+    def file_url(self, file_path: str) -> str:
+        """Build a download URL for a file_path returned by getFile"""
+        return f"{self.base_url}/file/bot{self.token}/{file_path}"
+
+    async def get_updates(self, offset: int, timeout: int,
+                          allowed_updates: Optional[List[str]] = None) -> List[Dict]:
+        """Long-poll getUpdates; the HTTP timeout is padded past the poll timeout"""
+        params: Dict[str, Any] = {"offset": offset, "timeout": timeout}
+        if allowed_updates is not None:
+            params["allowed_updates"] = allowed_updates
+        return await self.call("getUpdates", params, timeout=timeout + self.timeout, idempotent=True)
+
+    async def set_webhook(self, url: str, secret_token: Optional[str] = None,
+                          allowed_updates: Optional[List[str]] = None) -> bool:
+        """setWebhook: deliver updates to ``url`` instead of getUpdates"""
+        params: Dict[str, Any] = {"url": url}
+        if secret_token:
+            params["secret_token"] = secret_token
+        if allowed_updates is not None:
+            params["allowed_updates"] = allowed_updates
+        return await self.call("setWebhook", params, idempotent=True)
+
+    async def delete_webhook(self) -> bool:
+        """deleteWebhook: required before getUpdates can be used again"""
+        return await self.call("deleteWebhook", {"drop_pending_updates": False}, idempotent=True)
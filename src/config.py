@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,7 +11,103 @@ class Config:
     REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
     REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
     REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 5))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
     
+    # Bot API HTTP client
+    BOT_API_URL = os.getenv('BOT_API_URL', 'https://api.telegram.org')
+    BOT_API_TIMEOUT = float(os.getenv('BOT_API_TIMEOUT', 10))
+    BOT_API_MAX_RETRIES = int(os.getenv('BOT_API_MAX_RETRIES', 3))
+    BOT_API_POOL_SIZE = int(os.getenv('BOT_API_POOL_SIZE', 20))
+
+    # Channel onboarding: skip repeat joins of the same channel within this many seconds
+    ONBOARDING_DEDUPE_WINDOW = float(os.getenv('ONBOARDING_DEDUPE_WINDOW', 60))
+
+    # Channel photo URLs: getFile paths are cached below Telegram's 1h link lifetime
+    PHOTO_URL_TTL = int(os.getenv('PHOTO_URL_TTL', 3000))
+    PHOTO_URL_CACHE_SIZE = int(os.getenv('PHOTO_URL_CACHE_SIZE', 10000))
+    # Read endpoint serving resolved photo URLs to the backend (off without a token)
+    PHOTO_API_PORT = int(os.getenv('PHOTO_API_PORT', 8082))
+    PHOTO_API_TOKEN = os.getenv('PHOTO_API_TOKEN', '')
+
+    # Periodic admin/metadata reconciliation of known channels
+    RECONCILE_ENABLED = os.getenv('RECONCILE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RECONCILE_INTERVAL = int(os.getenv('RECONCILE_INTERVAL', 21600))
+    RECONCILE_PAGE_SIZE = int(os.getenv('RECONCILE_PAGE_SIZE', 100))
+    RECONCILE_CONCURRENCY = int(os.getenv('RECONCILE_CONCURRENCY', 4))
+    RECONCILE_RATE = float(os.getenv('RECONCILE_RATE', 2))
+
+    # Boost updates: how long applied update IDs are remembered for dedupe (seconds)
+    BOOST_DEDUPE_TTL = int(os.getenv('BOOST_DEDUPE_TTL', 86400))
+
+    # Expired boosts sweeper: seconds between passes and channels per round trip
+    BOOST_SWEEP_INTERVAL = int(os.getenv('BOOST_SWEEP_INTERVAL', 600))
+    BOOST_SWEEP_BATCH_SIZE = int(os.getenv('BOOST_SWEEP_BATCH_SIZE', 200))
+
+    # Boost updates ingestion: "polling" (getUpdates) or "webhook"
+    BOOST_UPDATES_MODE = os.getenv('BOOST_UPDATES_MODE', 'polling')
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram/boosts')
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8081))
+    WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+    WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000))
+    WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', 100))
+
+    # bot:events lifecycle stream: approximate length cap and age-based trimming (seconds)
+    EVENTS_STREAM_MAXLEN = int(os.getenv('EVENTS_STREAM_MAXLEN', 1000000))
+    EVENTS_RETENTION = int(os.getenv('EVENTS_RETENTION', 7 * 86400))
+
+    # Outbound messages: Telegram allows ~30 msg/s overall and ~1 msg/s per chat
+    SEND_WORKERS = int(os.getenv('SEND_WORKERS', 8))
+    SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', 25))
+    SEND_PER_CHAT_RATE = float(os.getenv('SEND_PER_CHAT_RATE', 1))
+    SEND_COALESCE_WINDOW = float(os.getenv('SEND_COALESCE_WINDOW', 10))
+    SEND_MAX_ATTEMPTS = int(os.getenv('SEND_MAX_ATTEMPTS', 5))
+    SEND_MAX_TRACKED_CHATS = int(os.getenv('SEND_MAX_TRACKED_CHATS', 10000))
+
+    # Leader election: only the lease holder polls getUpdates and runs periodic jobs.
+    # A dead leader is replaced within LEADER_LEASE_TTL + LEADER_RENEW_INTERVAL seconds.
+    INSTANCE_ID = os.getenv('INSTANCE_ID', f"{socket.gethostname()}-{os.getpid()}")
+    LEADER_LEASE_TTL = float(os.getenv('LEADER_LEASE_TTL', 15))
+    LEADER_RENEW_INTERVAL = float(os.getenv('LEADER_RENEW_INTERVAL', 5))
+
+    # Telethon entity cache and update state are written to Redis this often (seconds)
+    SESSION_FLUSH_INTERVAL = float(os.getenv('SESSION_FLUSH_INTERVAL', 5))
+
+    # Process role: "all" (single process), "receiver" (Telegram intake only) or "worker"
+    BOT_ROLE = os.getenv('BOT_ROLE', 'all')
+
+    # Channel work streams between receiver and workers, partitioned by channel id.
+    # WORK_PARTITIONS must be the same on every instance; WORK_CONSUMER unique per worker
+    # and stable across restarts (it keys the worker's Telegram session), so no hostname default.
+    WORK_PARTITIONS = int(os.getenv('WORK_PARTITIONS', 16))
+    WORK_CONSUMER = os.getenv('WORK_CONSUMER', '')
+    WORK_LEASE_TTL = float(os.getenv('WORK_LEASE_TTL', 30))
+    WORK_BATCH_SIZE = int(os.getenv('WORK_BATCH_SIZE', 50))
+    WORK_STREAM_MAXLEN = int(os.getenv('WORK_STREAM_MAXLEN', 100000))
+
+    # Health probes: results are computed on the bot loop and cached for the probe thread
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 5))
+    HEALTH_REDIS_TIMEOUT = float(os.getenv('HEALTH_REDIS_TIMEOUT', 1))
+    HEALTH_LOOP_STALL = float(os.getenv('HEALTH_LOOP_STALL', 30))
+    HEALTH_BOOST_STALL = float(os.getenv('HEALTH_BOOST_STALL', 180))
+    HEALTH_STARTUP_GRACE = float(os.getenv('HEALTH_STARTUP_GRACE', 300))
+
+    # Update dispatch: channel handlers run in order per channel, at most DISPATCH_CONCURRENCY at once
+    DISPATCH_CONCURRENCY = int(os.getenv('DISPATCH_CONCURRENCY', 16))
+    DISPATCH_MAX_PENDING = int(os.getenv('DISPATCH_MAX_PENDING', 10000))
+    DISPATCH_MAX_PER_CHANNEL = int(os.getenv('DISPATCH_MAX_PER_CHANNEL', 100))
+    # When full: drop_oldest (the channel's oldest waiting update), reject, or block
+    # (Telethon then dispatches updates sequentially so the wait holds back the update loop)
+    DISPATCH_OVERFLOW = os.getenv('DISPATCH_OVERFLOW', 'drop_oldest')
+
+    # Graceful shutdown: seconds to drain in-flight work after SIGTERM (keep below the orchestrator's grace period)
+    SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 25))
+
+    # Append incoming updates to this JSONL file for benchmarks/replay.py (empty: off)
+    RECORD_UPDATES_PATH = os.getenv('RECORD_UPDATES_PATH', '')
+
     # App configuration
     APP_URL = os.getenv('APP_URL', 'https://t.me/stage_give_bot?startapp')
     HEALTH_PORT = int(os.getenv('HEALTH_PORT', 8080))
\ No newline at end of file
@@ -0,0 +1,143 @@
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Optional
+from collections import deque
+from dataclasses import dataclass
+import asyncio
+import time
+
+from loguru import logger
+
+from .config import Config
+from .metrics import DISPATCH_DROPPED, DISPATCH_WAIT, HANDLER_ERRORS, HANDLER_LATENCY
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "reject")
+
+
+@dataclass
+class _Job:
+    name: str
+    run: Callable[[], Awaitable[object]]
+    queued_at: float
+
+
+class KeyedDispatcher:
+    """Runs update handlers with bounded concurrency, one at a time per key.
+
+    Jobs submitted under the same key (a channel id) run in submission order;
+    jobs for different keys run concurrently, at most ``concurrency`` at once.
+    Waiting jobs are capped at ``max_pending`` in total and ``max_per_key``
+    per key. When a cap is hit, ``overflow`` decides: ``drop_oldest``
+    discards the key's oldest waiting job (or the new one if that key has
+    none waiting), ``reject`` discards the new job and ``block`` makes the
+    submitter wait for room. ``block`` only bounds memory if the caller
+    stops producing while it waits, which is why the bot turns on Telethon's
+    ``sequential_updates`` with it; otherwise every update's handler task
+    would wait here instead.
+    """
+
+    def __init__(self,
+                 concurrency: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 max_per_key: Optional[int] = None,
+                 overflow: Optional[str] = None) -> None:
+        self.concurrency = concurrency or Config.DISPATCH_CONCURRENCY
+        self.max_pending = max_pending or Config.DISPATCH_MAX_PENDING
+        self.max_per_key = max_per_key or Config.DISPATCH_MAX_PER_CHANNEL
+        self.overflow = overflow or Config.DISPATCH_OVERFLOW
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown dispatch overflow policy {self.overflow!r}, expected one of {OVERFLOW_POLICIES}")
+        self._slots = asyncio.Semaphore(self.concurrency)
+        # Waiting jobs per key; the running one has already been taken off
+        self._queues: Dict[Hashable, Deque[_Job]] = {}
+        self._runners: Dict[Hashable, asyncio.Task] = {}
+        self._pending = 0
+        self._running = 0
+        self._room = asyncio.Event()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for their key or a free slot"""
+        return self._pending
+
+    @property
+    def running(self) -> int:
+        """Jobs whose handler is running now"""
+        return self._running
+
+    async def submit(self, key: Hashable, name: str, run: Callable[[], Awaitable[object]]) -> bool:
+        """Queue ``run`` behind earlier jobs for ``key``; False if it was dropped"""
+        while not self._closed:
+            queue = self._queues.get(key)
+            key_full = queue is not None and len(queue) >= self.max_per_key
+            if not key_full and self._pending < self.max_pending:
+                break
+            if self.overflow == "block":
+                self._room.clear()
+                await self._room.wait()
+            elif self.overflow == "drop_oldest" and queue:
+                dropped = queue.popleft()
+                self._pending -= 1
+                DISPATCH_DROPPED.labels(dropped.name, self.overflow).inc()
+                logger.warning(f"Dispatcher full, dropped oldest {dropped.name} for {key}")
+            else:
+                DISPATCH_DROPPED.labels(name, self.overflow).inc()
+                logger.warning(f"Dispatcher full, rejected {name} for {key}")
+                return False
+        if self._closed:
+            DISPATCH_DROPPED.labels(name, "closed").inc()
+            logger.warning(f"Dispatcher stopped, dropped {name} for {key}")
+            return False
+
+        self._queues.setdefault(key, deque()).append(_Job(name, run, time.perf_counter()))
+        self._pending += 1
+        if key not in self._runners:
+            self._runners[key] = asyncio.ensure_future(self._drain(key))
+        return True
+
+    async def stop(self, timeout: float) -> None:
+        """Let queued jobs finish for up to ``timeout`` seconds, then cancel the rest"""
+        deadline = time.monotonic() + timeout
+        # Runners can still be added by handlers that were blocked on submit
+        while self._runners and time.monotonic() < deadline:
+            await asyncio.wait(list(self._runners.values()), timeout=deadline - time.monotonic())
+        self._closed = True
+        self._room.set()
+        runners = list(self._runners.values())
+        if runners:
+            logger.warning(f"Cancelling {self._running} running and {self._pending} queued updates on shutdown")
+            for task in runners:
+                task.cancel()
+            await asyncio.gather(*runners, return_exceptions=True)
+
+    async def _drain(self, key: Hashable) -> None:
+        """Run the key's jobs one after another, each holding a global slot"""
+        queue = self._queues[key]
+        try:
+            while True:
+                async with self._slots:
+                    # drop_oldest may have emptied the queue while this waited
+                    if not queue:
+                        break
+                    job = queue.popleft()
+                    # Counted as pending until it holds a slot, so the caps bound every job
+                    self._pending -= 1
+                    self._room.set()
+                    await self._run(job)
+        finally:
+            self._queues.pop(key, None)
+            self._runners.pop(key, None)
+
+    async def _run(self, job: _Job) -> None:
+        started = time.perf_counter()
+        DISPATCH_WAIT.labels(job.name).observe(started - job.queued_at)
+        self._running += 1
+        try:
+            await job.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            HANDLER_ERRORS.labels(job.name).inc()
+            logger.error(f"Error in {job.name} handler: {str(e)}")
+        finally:
+            self._running -= 1
+            HANDLER_LATENCY.labels(job.name).observe(time.perf_counter() - started)
@@ -1,28 +1,45 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import asyncio
 from telethon import events
-from telethon.tl.types import User, Channel, ChannelParticipantAdmin, ChannelParticipantCreator
-from telethon.tl.types import UpdateChannelParticipant, PeerChannel
-from telethon.tl.types import ChannelParticipantsAdmins
+from telethon.tl.types import User, Channel
+from telethon.tl.types import UpdateChannelParticipant
 from loguru import logger
-import json
-from urllib.request import urlopen
-from urllib.parse import urlencode
 from ..config import Config
+from ..dispatcher import KeyedDispatcher
+from ..health import health
+from ..lifecycle import inflight
+from ..metrics import (
+    BOOST_OFFSET_COMMITTED, HANDLER_ERRORS, HANDLER_LATENCY, observe_boost_batch, timed, track_queue_depth,
+)
+from ..models import BotEvent, BoostChange, ChannelEvent
+from ..webhook import BoostWebhookServer
 
 if TYPE_CHECKING:
     from ..bot import Bot
 
+BOOST_ALLOWED_UPDATES = ["chat_boost", "removed_chat_boost"]
+
 
 class ChatEventHandler:
     def __init__(self, bot: "Bot") -> None:
         self.bot = bot
         self.client = bot.client
         self.storage = bot.storage
+        self.bot_api = bot.bot_api
+        self.onboarding = bot.onboarding
+        # Receiver role: hand channel work to the workers via Redis Streams
+        self.queue_work = Config.BOT_ROLE == "receiver"
         self._boost_updates_offset = 0
+        # Batch the poller is applying; shutdown waits for it instead of cutting it off
+        self._boost_batch: Optional[asyncio.Task] = None
+        self.boost_webhook: Optional[BoostWebhookServer] = None
+        # Join/kick work runs here: in order per channel, with bounded concurrency
+        self.dispatcher = KeyedDispatcher()
 
     async def register(self) -> None:
         """Register all chat event handlers"""
+        track_queue_depth("dispatch", lambda: self.dispatcher.depth)
+        track_queue_depth("dispatch_running", lambda: self.dispatcher.running)
         self.client.add_event_handler(
             self._handle_chat_action,
             events.ChatAction
@@ -30,118 +47,70 @@ class ChatEventHandler:
         self.client.add_event_handler(
             self._handle_new_event,
         )
-        # Start background polling of Bot API updates for chat boost events
-        try:
-            self.client.loop.create_task(self._poll_bot_boost_updates())
-        except Exception as e:
-            logger.warning(f"Failed to start boost updates polling: {str(e)}")
-        
+        # Receive Bot API chat boost events via webhook or, on the leader only, polling.
+        # A webhook that cannot start fails startup: running without boost ingestion is not ready
+        if Config.BOOST_UPDATES_MODE == "webhook":
+            await self._start_boost_webhook()
+        else:
+            self.bot.leader.add_job("boost-poller", self._poll_bot_boost_updates)
+        self.bot.leader.add_job("boost-sweeper", self._sweep_expired_boosts)
+
+    async def stop(self, timeout: float) -> None:
+        """Stop intake and finish queued channel updates and boost batches already taken from Telegram"""
+        self.client.remove_event_handler(self._handle_chat_action)
+        self.client.remove_event_handler(self._handle_new_event)
+        # Both drain within the same timeout
+        await asyncio.gather(self.dispatcher.stop(timeout), self._finish_boost_ingest(timeout))
+
+    async def _finish_boost_ingest(self, timeout: float) -> None:
+        if self.boost_webhook is not None:
+            await self.boost_webhook.stop(timeout)
+        if self._boost_batch is not None and not self._boost_batch.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._boost_batch), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Boost batch still running at shutdown; it will be fetched again")
+            except Exception:
+                pass
+
+    async def _start_boost_webhook(self) -> None:
+        """Start the webhook listener and point Telegram at it"""
+        if not Config.WEBHOOK_URL:
+            raise RuntimeError("BOOST_UPDATES_MODE=webhook requires WEBHOOK_URL")
+        if not Config.WEBHOOK_SECRET:
+            raise RuntimeError("BOOST_UPDATES_MODE=webhook requires WEBHOOK_SECRET")
+        self.boost_webhook = BoostWebhookServer(self._ingest_boost_updates)
+        await self.boost_webhook.start()
+        track_queue_depth("boost_webhook", self.boost_webhook.queue.qsize)
+        await self.bot_api.set_webhook(
+            Config.WEBHOOK_URL.rstrip("/") + Config.WEBHOOK_PATH,
+            secret_token=Config.WEBHOOK_SECRET,
+            allowed_updates=BOOST_ALLOWED_UPDATES,
+        )
+
+    @inflight.track
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "new_event")
     async def _handle_new_event(self, event) -> None:
         """Handle new event"""
         logger.info(f"New event: {event}")
         try:
             # Handle the case when the bot is re-added to a channel after being removed
             if isinstance(event, UpdateChannelParticipant):
-                me = await self.client.get_me()
+                me = self.bot.me
                 new_participant = getattr(event, 'new_participant', None)
                 new_participant_user_id = getattr(new_participant, 'user_id', None)
 
                 if new_participant_user_id == me.id:
                     # Bot was (re)added to the channel
-                    channel: Channel = await self.client.get_entity(PeerChannel(event.channel_id))
-                    chat_id = self._normalize_channel_id(channel.id)
+                    chat_id = self._normalize_channel_id(event.channel_id)
                     actor_id = getattr(event, 'actor_id', None)
-
-                    # Save channel basic info
-                    self.storage.save_channel_title(chat_id, channel.title)
-                    self.storage.save_channel_username(chat_id, channel.username or "")
-
-                    # Save URL: public t.me for public channels; invite for private
-                    url_to_save = ""
-                    if channel.username:
-                        url_to_save = f"https://t.me/{channel.username}"
-                    else:
-                        try:
-                            base = f"https://api.telegram.org/bot{Config.BOT_TOKEN}"
-                            # 1) Try to get primary invite via getChat
-                            get_chat_qs = urlencode({"chat_id": chat_id})
-                            with urlopen(f"{base}/getChat?{get_chat_qs}") as resp:
-                                chat_data = json.loads(resp.read().decode("utf-8"))
-                            invite_link = chat_data.get("result", {}).get("invite_link") if chat_data.get("ok") else None
-                            if invite_link:
-                                url_to_save = invite_link
-                            else:
-                                # 2) Create a new invite link
-                                create_qs = urlencode({"chat_id": chat_id})
-                                with urlopen(f"{base}/createChatInviteLink?{create_qs}") as resp2:
-                                    create_data = json.loads(resp2.read().decode("utf-8"))
-                                if create_data.get("ok") and create_data.get("result", {}).get("invite_link"):
-                                    url_to_save = create_data["result"]["invite_link"]
-                                else:
-                                    # 3) Fallback to exportChatInviteLink
-                                    export_qs = urlencode({"chat_id": chat_id})
-                                    with urlopen(f"{base}/exportChatInviteLink?{export_qs}") as resp3:
-                                        export_data = json.loads(resp3.read().decode("utf-8"))
-                                    if export_data.get("ok") and export_data.get("result"):
-                                        url_to_save = export_data["result"]
-                                    else:
-                                        raise RuntimeError({
-                                            "getChat": chat_data,
-                                            "createChatInviteLink": create_data,
-                                            "exportChatInviteLink": export_data,
-                                        })
-                        except Exception as e:
-                            logger.warning(f"Failed to export invite link for channel {chat_id}: {str(e)}")
-                            url_to_save = ""
-                    self.storage.save_channel_url(chat_id, url_to_save)
-                    if url_to_save:
-                        logger.info(f"Saved invite URL for channel {chat_id}")
-
-                    # Fetch and save channel avatar URLs (if any)
-                    try:
-                        bot_token = Config.BOT_TOKEN
-                        if bot_token:
-                            base = f"https://api.telegram.org/bot{bot_token}"
-                            get_chat_qs = urlencode({"chat_id": chat_id})
-                            with urlopen(f"{base}/getChat?{get_chat_qs}") as resp:
-                                data = json.loads(resp.read().decode("utf-8"))
-                            if data.get("ok") and data["result"].get("photo"):
-                                photo = data["result"]["photo"]
-                                small_id = photo.get("small_file_id")
-                                big_id = photo.get("big_file_id")
-                                small_url = ""
-                                big_url = ""
-                                if small_id:
-                                    qs = urlencode({"file_id": small_id})
-                                    with urlopen(f"{base}/getFile?{qs}") as f1:
-                                        f1d = json.loads(f1.read().decode("utf-8"))
-                                    if f1d.get("ok") and f1d["result"].get("file_path"):
-                                        small_url = f"https://api.telegram.org/file/bot{bot_token}/{f1d['result']['file_path']}"
-                                if big_id:
-                                    qs = urlencode({"file_id": big_id})
-                                    with urlopen(f"{base}/getFile?{qs}") as f2:
-                                        f2d = json.loads(f2.read().decode("utf-8"))
-                                    if f2d.get("ok") and f2d["result"].get("file_path"):
-                                        big_url = f"https://api.telegram.org/file/bot{bot_token}/{f2d['result']['file_path']}"
-
-                                if small_url:
-                                    self.storage.save_channel_photo_small_url(chat_id, small_url)
-                                if big_url:
-                                    self.storage.save_channel_photo_big_url(chat_id, big_url)
-                    except Exception as e:
-                        logger.warning(f"Failed to fetch channel photo URLs for {chat_id}: {str(e)}")
-
-                    # Save admins as channel owners in storage
-                    admins = await self._get_channel_admins(channel)
-                    for admin_id in admins:
-                        self.storage.add_channel_for_user(admin_id, chat_id)
-                        logger.info(f"Added channel {chat_id} for admin {admin_id}")
-
-                    # Also attribute channel to the actor who re-added the bot (if available)
-                    if actor_id:
-                        self.storage.add_channel_for_user(actor_id, chat_id)
-                    logger.info(f"Bot was (re)added to channel {chat_id} ({channel.title}) by user {actor_id}")
+                    if self.bot.recorder is not None:
+                        self.bot.recorder.record("bot_added", event, chat_id=chat_id, actor_id=actor_id)
+                    await self.dispatcher.submit(
+                        chat_id, "bot_added", lambda: self._dispatch_bot_added(chat_id, actor_id),
+                    )
         except Exception as e:
+            HANDLER_ERRORS.labels("new_event").inc()
             logger.error(f"Error in new event handler: {str(e)}")
 
     def _normalize_channel_id(self, channel_id: int) -> int:
@@ -151,135 +120,38 @@ class ChatEventHandler:
             return int(f'-100{str_id}')
         return channel_id
 
+    @inflight.track
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "chat_action")
     async def _handle_chat_action(self, event: events.ChatAction.Event) -> None:
         """Handle bot being added to or removed from a chat"""
         logger.info(f"Chat action event: {event}")
         try:
-            me = await self.client.get_me()
+            me = self.bot.me
             if event.user_added:
                 await self._handle_bot_added(event, me)
             elif event.user_kicked:
                 await self._handle_bot_kicked(event, me)
 
         except Exception as e:
+            HANDLER_ERRORS.labels("chat_action").inc()
             logger.error(f"Error in chat action handler: {str(e)}")
 
-    async def _get_channel_admins(self, chat: Channel) -> list[int]:
-        """Get list of channel admin IDs"""
-        try:
-            admins = []
-            async for participant in self.client.iter_participants(
-                chat,
-                filter=ChannelParticipantsAdmins
-            ):
-                if isinstance(participant.participant, (ChannelParticipantAdmin, ChannelParticipantCreator)):
-                    admins.append(participant.id)
-            return admins
-        except Exception as e:
-            logger.error(f"Error getting channel admins: {str(e)}")
-            return []
-
     async def _handle_bot_added(self, event: events.ChatAction.Event, me: User) -> None:
         """Handle bot being added to a channel"""
         try:
             if not event.action_message:
                 new_participant = event.original_update.new_participant
                 if new_participant and new_participant.user_id == me.id:
-                    chat: Channel = await event.get_chat()
-                    chat_id = self._normalize_channel_id(chat.id)
+                    chat_id = self._normalize_channel_id(event.chat_id)
                     user_id = event.added_by.id
-
-                    # Сохраняем информацию о канале
-                    self.storage.save_channel_title(chat_id, chat.title)
-                    self.storage.save_channel_username(chat_id, chat.username or "")
-
-                    # Сохраняем URL: публичный t.me для public, инвайт для private
-                    url_to_save = ""
-                    if chat.username:
-                        url_to_save = f"https://t.me/{chat.username}"
-                    else:
-                        try:
-                            base = f"https://api.telegram.org/bot{Config.BOT_TOKEN}"
-                            # 1) Пытаемся получить текущую primary invite ссылку через getChat
-                            get_chat_qs = urlencode({"chat_id": chat_id})
-                            with urlopen(f"{base}/getChat?{get_chat_qs}") as resp:
-                                chat_data = json.loads(resp.read().decode("utf-8"))
-                            invite_link = chat_data.get("result", {}).get("invite_link") if chat_data.get("ok") else None
-                            if invite_link:
-                                url_to_save = invite_link
-                            else:
-                                # 2) Если нет — создаём новую через createChatInviteLink (современный метод)
-                                create_qs = urlencode({"chat_id": chat_id})
-                                with urlopen(f"{base}/createChatInviteLink?{create_qs}") as resp2:
-                                    create_data = json.loads(resp2.read().decode("utf-8"))
-                                if create_data.get("ok") and create_data.get("result", {}).get("invite_link"):
-                                    url_to_save = create_data["result"]["invite_link"]
-                                else:
-                                    # 3) На крайний случай пробуем exportChatInviteLink (устаревший для SG/каналов)
-                                    export_qs = urlencode({"chat_id": chat_id})
-                                    with urlopen(f"{base}/exportChatInviteLink?{export_qs}") as resp3:
-                                        export_data = json.loads(resp3.read().decode("utf-8"))
-                                    if export_data.get("ok") and export_data.get("result"):
-                                        url_to_save = export_data["result"]
-                                    else:
-                                        raise RuntimeError({
-                                            "getChat": chat_data,
-                                            "createChatInviteLink": create_data,
-                                            "exportChatInviteLink": export_data,
-                                        })
-                        except Exception as e:
-                            logger.warning(f"Failed to export invite link for channel {chat_id}: {str(e)}")
-                            url_to_save = ""
-                    self.storage.save_channel_url(chat_id, url_to_save)
-                    if url_to_save:
-                        logger.info(f"Saved invite URL for channel {chat_id}")
-
-                    # Получаем URL аватара канала из Bot API (если есть)
-                    try:
-                        bot_token = Config.BOT_TOKEN
-                        if bot_token:
-                            base = f"https://api.telegram.org/bot{bot_token}"
-                            # getChat -> photo file_ids
-                            get_chat_qs = urlencode({"chat_id": chat_id})
-                            with urlopen(f"{base}/getChat?{get_chat_qs}") as resp:
-                                data = json.loads(resp.read().decode("utf-8"))
-                            if data.get("ok") and data["result"].get("photo"):
-                                photo = data["result"]["photo"]
-                                small_id = photo.get("small_file_id")
-                                big_id = photo.get("big_file_id")
-                                small_url = ""
-                                big_url = ""
-                                if small_id:
-                                    qs = urlencode({"file_id": small_id})
-                                    with urlopen(f"{base}/getFile?{qs}") as f1:
-                                        f1d = json.loads(f1.read().decode("utf-8"))
-                                    if f1d.get("ok") and f1d["result"].get("file_path"):
-                                        small_url = f"https://api.telegram.org/file/bot{bot_token}/{f1d['result']['file_path']}"
-                                if big_id:
-                                    qs = urlencode({"file_id": big_id})
-                                    with urlopen(f"{base}/getFile?{qs}") as f2:
-                                        f2d = json.loads(f2.read().decode("utf-8"))
-                                    if f2d.get("ok") and f2d["result"].get("file_path"):
-                                        big_url = f"https://api.telegram.org/file/bot{bot_token}/{f2d['result']['file_path']}"
-
-                                if small_url:
-                                    self.storage.save_channel_photo_small_url(chat_id, small_url)
-                                if big_url:
-                                    self.storage.save_channel_photo_big_url(chat_id, big_url)
-                    except Exception as e:
-                        # Возможны ошибки сети/доступа; просто логируем
-                        logger.warning(f"Failed to fetch channel photo URLs for {chat_id}: {str(e)}")
-                    
-                    # Получаем и сохраняем администраторов
-                    admins = await self._get_channel_admins(chat)
-                    for admin_id in admins:
-                        self.storage.add_channel_for_user(admin_id, chat_id)
-                        logger.info(f"Added channel {chat_id} for admin {admin_id}")
-                    
-                    self.storage.add_channel_for_user(user_id, chat_id)
-                    logger.info(f"Bot was added to channel {chat_id} ({chat.title}) by user {user_id}")
+                    if self.bot.recorder is not None:
+                        self.bot.recorder.record("bot_added", event.original_update, chat_id=chat_id, actor_id=user_id)
+                    await self.dispatcher.submit(
+                        chat_id, "bot_added", lambda: self._dispatch_bot_added(chat_id, user_id),
+                    )
 
         except Exception as e:
+            HANDLER_ERRORS.labels("chat_action").inc()
             logger.error(f"Error handling bot addition: {str(e)}")
 
     async def _handle_bot_kicked(self, event: events.ChatAction.Event, me: User) -> None:
@@ -288,54 +160,175 @@ class ChatEventHandler:
             if event.user_id == me.id:
                 chat_id = self._normalize_channel_id(event.chat_id)
                 kicked_by = event.original_update.actor_id
-                
-                users = self.storage.get_users_with_channel(chat_id)
-                for user_id in users:
-                    self.storage.remove_channel_for_user(user_id, chat_id)
-
-                # Push event to Redis Stream
-                self.storage.publish_bot_removed(chat_id)
-
-                logger.info(f"Bot was removed from channel {chat_id} by user {kicked_by}")
+                if self.bot.recorder is not None:
+                    self.bot.recorder.record("bot_removed", event.original_update, chat_id=chat_id, actor_id=kicked_by)
+                await self.dispatcher.submit(chat_id, "bot_removed", lambda: self._dispatch(
+                    ChannelEvent(ChannelEvent.BOT_REMOVED, chat_id, actor_id=kicked_by),
+                ))
 
         except Exception as e:
-            logger.error(f"Error handling bot removal: {str(e)}") 
+            HANDLER_ERRORS.labels("chat_action").inc()
+            logger.error(f"Error handling bot removal: {str(e)}")
+
+    async def _dispatch_bot_added(self, chat_id: int, actor_id: Optional[int]) -> None:
+        """Queue or run onboarding for a channel the bot was added to"""
+        if self.queue_work:
+            # The update put the channel into the session cache, so this is local
+            input_channel = await self.client.get_input_entity(chat_id)
+            await self._dispatch(ChannelEvent(
+                ChannelEvent.BOT_ADDED, chat_id, actor_id=actor_id,
+                access_hash=getattr(input_channel, 'access_hash', None),
+            ))
+        else:
+            channel: Channel = await self.client.get_entity(chat_id)
+            await self.process_event(ChannelEvent(ChannelEvent.BOT_ADDED, chat_id, actor_id=actor_id), channel)
+
+    async def _dispatch(self, event: ChannelEvent) -> None:
+        """Queue the event for the workers (receiver role) or process it here"""
+        if self.queue_work:
+            await self.storage.enqueue_channel_events([event], Config.WORK_PARTITIONS)
+            logger.info(f"Queued {event.type} for channel {event.channel_id}")
+        else:
+            await self.process_event(event)
+
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "channel_event")
+    async def process_event(self, event: ChannelEvent, channel: Optional[Channel] = None) -> None:
+        """Run the onboarding, removal or boost logic for one channel event.
+
+        Errors propagate; workers use them to decide whether to retry.
+        """
+        if event.type == ChannelEvent.BOT_ADDED:
+            if channel is None:
+                channel = await self.onboarding.resolve_channel(event.channel_id, event.access_hash)
+            await self.onboarding.onboard(channel, event.channel_id, event.actor_id)
+        elif event.type == ChannelEvent.BOT_REMOVED:
+            # The owners are about to be wiped; a re-add must not be deduped against them
+            self.onboarding.forget(event.channel_id)
+            owners = await self.storage.remove_channel_for_all_users(event.channel_id)
+
+            # Push event to Redis Stream
+            await self.storage.publish_events([BotEvent(
+                BotEvent.BOT_REMOVED, event.channel_id, actor_id=event.actor_id, removed=owners,
+            )])
+
+            logger.info(f"Bot was removed from channel {event.channel_id} by user {event.actor_id}")
+        elif event.type == ChannelEvent.BOOST_UPDATES:
+            await self._apply_boost_updates(event.updates)
+        else:
+            logger.warning(f"Unknown channel event type {event.type} for channel {event.channel_id}")
 
     async def _poll_bot_boost_updates(self) -> None:
         """Continuously poll Bot API for chat boost updates and handle them."""
-        base = f"https://api.telegram.org/bot{Config.BOT_TOKEN}"
+        # A freshly started poller counts as progress for readiness
+        health.mark_boost_progress()
+        started = False
         while True:
             try:
-                qs = urlencode({
-                    "timeout": 50,
-                    "offset": self._boost_updates_offset,
-                    "allowed_updates": json.dumps(["chat_boost", "removed_chat_boost"]),
-                })
-                # Run blocking urlopen in a thread to avoid blocking the event loop
-                def _fetch():
-                    with urlopen(f"{base}/getUpdates?{qs}") as resp:
-                        return json.loads(resp.read().decode("utf-8"))
-
-                data = await asyncio.get_running_loop().run_in_executor(None, _fetch)
-
-                if not data.get("ok"):
-                    await asyncio.sleep(2)
+                if not started:
+                    # getUpdates is rejected while a webhook is set
+                    await self.bot_api.delete_webhook()
+                    # Resume from the offset committed with the last applied batch
+                    self._boost_updates_offset = await self.storage.get_boost_updates_offset()
+                    started = True
+
+                updates = await self.bot_api.get_updates(
+                    offset=self._boost_updates_offset,
+                    timeout=50,
+                    allowed_updates=BOOST_ALLOWED_UPDATES,
+                )
+                health.mark_boost_progress()
+                if not updates:
                     continue
 
-                for upd in data.get("result", []):
-                    self._boost_updates_offset = max(self._boost_updates_offset, upd.get("update_id", 0) + 1)
-
-                    if "chat_boost" in upd:
-                        await self._handle_chat_boost_update(upd["chat_boost"])
-                    elif "removed_chat_boost" in upd:
-                        await self._handle_removed_chat_boost_update(upd["removed_chat_boost"])
-
+                # The offset is committed in the same transaction as the batch;
+                # a failed batch is fetched and applied again.
+                offset = max(upd.get("update_id", 0) for upd in updates) + 1
+                self._boost_batch = asyncio.ensure_future(self._ingest_boost_updates(updates, offset=offset))
+                # Shielded: losing leadership or shutting down stops polling, not a batch in flight
+                await asyncio.shield(self._boost_batch)
+                self._boost_updates_offset = max(self._boost_updates_offset, offset)
+                BOOST_OFFSET_COMMITTED.set_to_current_time()
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.warning(f"Error polling chat boost updates: {str(e)}")
                 await asyncio.sleep(3)
 
-    async def _handle_chat_boost_update(self, chat_boost: dict) -> None:
-        """Handle Bot API chat_boost update payload."""
+    async def _sweep_expired_boosts(self) -> None:
+        """Periodically trim expired boosts (natural expiry sends no update)."""
+        while True:
+            await asyncio.sleep(Config.BOOST_SWEEP_INTERVAL)
+            try:
+                removed = await self.storage.sweep_expired_boosts(batch_size=Config.BOOST_SWEEP_BATCH_SIZE)
+                if removed:
+                    logger.info(f"Swept {removed} expired chat boosts")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error sweeping expired chat boosts: {str(e)}")
+
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "boost_ingest")
+    async def _ingest_boost_updates(self, updates: List[dict], offset: Optional[int] = None) -> None:
+        """Apply boost updates here, or queue them per channel for the workers"""
+        observe_boost_batch(updates)
+        if self.bot.recorder is not None:
+            for upd in updates:
+                self.bot.recorder.record("boost", update=upd)
+        if not self.queue_work:
+            await self._apply_boost_updates(updates, offset=offset)
+            return
+        by_channel: Dict[int, List[dict]] = {}
+        for upd in updates:
+            payload = upd.get("chat_boost") or upd.get("removed_chat_boost") or {}
+            chat_id = (payload.get("chat") or {}).get("id")
+            if chat_id is None:
+                logger.warning(f"Boost update {upd.get('update_id')} has no chat, dropping")
+                continue
+            by_channel.setdefault(self._normalize_channel_id(chat_id), []).append(upd)
+        # The offset commits with the enqueue, so a failed batch is fetched again
+        await self.storage.enqueue_channel_events(
+            (ChannelEvent(ChannelEvent.BOOST_UPDATES, chat_id, updates=batch) for chat_id, batch in by_channel.items()),
+            Config.WORK_PARTITIONS,
+            offset=offset,
+        )
+
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "boost_apply")
+    async def _apply_boost_updates(self, updates: List[dict], offset: Optional[int] = None) -> None:
+        """Apply a batch of Bot API updates as one Redis transaction.
+
+        Updates already applied within BOOST_DEDUPE_TTL are skipped, and
+        updates for the same (channel, user) are collapsed so only the final
+        state is written. ``offset`` is committed together with the batch.
+        """
+        unseen = await self.storage.filter_unseen_boost_updates(
+            upd["update_id"] for upd in updates if "update_id" in upd
+        )
+        latest: Dict[Tuple[int, int], BoostChange] = {}
+        applied: List[int] = []
+        for upd in sorted(updates, key=lambda u: u.get("update_id", 0)):
+            update_id = upd.get("update_id")
+            if update_id is not None:
+                if update_id not in unseen:
+                    logger.debug(f"Skipping already applied boost update {update_id}")
+                    continue
+                applied.append(update_id)
+            change = None
+            if "chat_boost" in upd:
+                change = self._parse_chat_boost_update(upd["chat_boost"])
+            elif "removed_chat_boost" in upd:
+                change = self._parse_removed_chat_boost_update(upd["removed_chat_boost"])
+            if change is not None:
+                latest.pop((change.channel_id, change.user_id), None)
+                latest[(change.channel_id, change.user_id)] = change
+
+        await self.storage.apply_boost_changes(latest.values(), update_ids=applied, offset=offset)
+        for change in latest.values():
+            verb = "received" if change.added else "removed"
+            logger.info(f"Chat boost {verb} for chat {change.channel_id} from user {change.user_id} (boost_id={change.boost_id})")
+
+    def _parse_chat_boost_update(self, chat_boost: dict) -> Optional[BoostChange]:
+        """Parse Bot API chat_boost update payload."""
         try:
             chat = chat_boost.get("chat", {})
             boost = chat_boost.get("boost", {})
@@ -352,20 +345,23 @@ class ChatEventHandler:
 
             if not boost_id or user_id is None or norm_chat_id is None:
                 logger.warning(f"chat_boost missing identifiers: boost_id={boost_id}, user_id={user_id}, chat_id={norm_chat_id}")
-                return
-
-            # Добавляем пользователя в список пробустивших канал
-            self.storage.add_channel_boost_user(norm_chat_id, int(user_id))
-            
-            # Опционально сохраняем детальную информацию о бусте
-            # self.storage.save_chat_boost_details(norm_chat_id, str(boost_id), int(user_id), add_date, expire_date, chat_boost)
-
-            logger.info(f"Chat boost received for chat {norm_chat_id} from user {user_id} (boost_id={boost_id})")
+                return None
+
+            return BoostChange(
+                added=True,
+                channel_id=norm_chat_id,
+                user_id=int(user_id),
+                boost_id=str(boost_id),
+                add_date=add_date,
+                expire_date=expire_date,
+                payload=chat_boost,
+            )
         except Exception as e:
-            logger.error(f"Failed to handle chat_boost update: {str(e)}")
+            logger.error(f"Failed to parse chat_boost update: {str(e)}")
+            return None
 
-    async def _handle_removed_chat_boost_update(self, removed: dict) -> None:
-        """Handle Bot API removed_chat_boost update payload."""
+    def _parse_removed_chat_boost_update(self, removed: dict) -> Optional[BoostChange]:
+        """Parse Bot API removed_chat_boost update payload."""
         try:
             chat = removed.get("chat", {})
             chat_id = chat.get("id")
@@ -379,14 +375,16 @@ class ChatEventHandler:
 
             if not boost_id or user_id is None or norm_chat_id is None:
                 logger.warning(f"removed_chat_boost missing identifiers: boost_id={boost_id}, user_id={user_id}, chat_id={norm_chat_id}")
-                return
-
-            # Удаляем пользователя из списка пробустивших канал
-            self.storage.remove_channel_boost_user(norm_chat_id, int(user_id))
-            
-            # Опционально обновляем детальную информацию о бусте
-            self.storage.remove_chat_boost_details(str(boost_id), remove_date, removed)
-
-            logger.info(f"Chat boost removed in chat {norm_chat_id} for user {user_id} (boost_id={boost_id})")
+                return None
+
+            return BoostChange(
+                added=False,
+                channel_id=norm_chat_id,
+                user_id=int(user_id),
+                boost_id=str(boost_id),
+                remove_date=remove_date,
+                payload=removed,
+            )
         except Exception as e:
-            logger.error(f"Failed to handle removed_chat_boost update: {str(e)}")
\ No newline at end of file
+            logger.error(f"Failed to parse removed_chat_boost update: {str(e)}")
+            return None
@@ -1,18 +1,46 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING
 from telethon import events, Button, types
+from telethon.errors import FloodWaitError
+from telethon.extensions import html
 from loguru import logger
-import os
 
 if TYPE_CHECKING:
     from ..bot import Bot
 
 from ..config import Config
+from ..lifecycle import inflight
+from ..metrics import HANDLER_ERRORS, HANDLER_LATENCY, timed
+from ..start_video import StartMedia, StartVideo, is_stale_media_error
+
+START_TEXT = (
+    "<b>Giveaway bot</b>\n\n"
+    "What I can do:\n"
+    "🎁 Create and manage giveaways inside Telegram.\n"
+    "👥 Let users join by completing simple tasks or meeting conditions.\n"
+    "🏆 Pick winners automatically and distribute rewards.\n"
+    "📊 Track participation and performance in real time.\n\n"
+    "Built by independent developers for "
+    "<a href='https://tools.tg/'>Telegram Tools</a>.\n\n"
+    "Open source for the community:\n"
+    "<a href='https://github.com/OpenBuilders/giveaway-tool-backend'>Github repository</a>"
+)
+
+START_VIDEO_ATTRIBUTES = [
+    types.DocumentAttributeVideo(duration=0, w=0, h=0, supports_streaming=True)
+]
+
 
 class CommandHandler:
     def __init__(self, bot: "Bot") -> None:
         self.bot = bot
         self.client = bot.client
-        self.video_path = "media/Giveaway.mp4"
+        self.start_video = StartVideo(bot, "media/Giveaway.mp4")
+        # The /start payload never changes: parse HTML and build markup once
+        self._start_text, self._start_entities = html.parse(START_TEXT)
+        self._start_markup = self.client.build_reply_markup([
+            [Button.url("Create Giveaway", Config.APP_URL)],
+            [Button.url("Explore Other Apps", "https://tools.tg/")],
+        ])
 
     async def register(self) -> None:
         """Register all command handlers"""
@@ -21,150 +49,53 @@ class CommandHandler:
             events.NewMessage(pattern='/start')
         )
 
-    async def _upload_and_cache_video(self) -> Optional[types.InputFile]:
-        """Загрузить видео из media и сохранить в кэш"""
-        try:
-            if not os.path.exists(self.video_path):
-                logger.error(f"Video file not found: {self.video_path}")
-                return None
-            
-            logger.info(f"Uploading {self.video_path} to Telegram servers...")
-            uploaded = await self.client.upload_file(self.video_path)
-            
-            data = {
-                "id": uploaded.id,
-                "parts": uploaded.parts,
-                "name": uploaded.name,
-                "type": "input_file"
-            }
-            if hasattr(uploaded, 'md5_checksum'):
-                data['md5'] = uploaded.md5_checksum
-            
-            self.bot.storage.save_start_video(data)
-            logger.info("Video uploaded and cached successfully")
-            
-            if hasattr(uploaded, 'md5_checksum'):
-                return types.InputFile(
-                    id=uploaded.id,
-                    parts=uploaded.parts,
-                    name=uploaded.name,
-                    md5_checksum=uploaded.md5_checksum
-                )
-            else:
-                return types.InputFileBig(
-                    id=uploaded.id,
-                    parts=uploaded.parts,
-                    name=uploaded.name
-                )
-        except Exception as e:
-            logger.error(f"Failed to upload and cache video: {e}")
-            return None
+    def stop(self) -> None:
+        """Stop taking commands"""
+        self.client.remove_event_handler(self._start_command)
 
+    @inflight.track
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "start_command")
     async def _start_command(self, event: events.NewMessage.Event) -> None:
         """Handle /start command"""
+        chat_id = event.chat_id
+        if self.bot.recorder is not None:
+            self.bot.recorder.record("start", event.message, chat_id=chat_id)
+        queued = self.bot.sender.submit(
+            chat_id,
+            lambda: self._send_start_reply(chat_id),
+            coalesce_key=("start", chat_id),
+        )
+        if not queued:
+            logger.info(f"Coalesced repeated /start from chat {chat_id}")
+
+    @timed(HANDLER_LATENCY, HANDLER_ERRORS, "start_reply")
+    async def _send_start_reply(self, chat_id: int) -> None:
+        """Send the /start reply; FloodWaitError is left to the scheduler"""
+        file_to_send = await self.start_video.get()
         try:
-            text = (
-                "<b>Giveaway bot</b>\n\n"
-                "What I can do:\n"
-                "🎁 Create and manage giveaways inside Telegram.\n"
-                "👥 Let users join by completing simple tasks or meeting conditions.\n"
-                "🏆 Pick winners automatically and distribute rewards.\n"
-                "📊 Track participation and performance in real time.\n\n"
-                "Built by independent developers for "
-                "<a href='https://tools.tg/'>Telegram Tools</a>.\n\n"
-                "Open source for the community:\n"
-                "<a href='https://github.com/OpenBuilders/giveaway-tool-backend'>Github repository</a>"
-            )
+            message = await self._send_start(chat_id, file_to_send)
+        except FloodWaitError:
+            raise
+        except Exception as send_error:
+            # Only a media error is a cache problem. A blocked user or a timeout must not
+            # drop the shared Document and make every instance upload the video again
+            if isinstance(file_to_send, str) or not is_stale_media_error(send_error):
+                raise
+            logger.warning(f"Failed to send cached video: {send_error}, uploading from media")
+            await self.start_video.invalidate(file_to_send)
+            file_to_send = await self.start_video.get()
+            message = await self._send_start(chat_id, file_to_send)
 
-            buttons = [
-                [Button.url("Create Giveaway", Config.APP_URL)],
-                [Button.url("Explore Other Apps", "https://tools.tg/")],
-            ]
+        if not isinstance(file_to_send, types.InputDocument):
+            await self.start_video.remember_sent(message)
 
-            file_to_send = None
-            use_cached = False
-            
-            # Пытаемся использовать кэш
-            cached_video = self.bot.storage.get_start_video()
-            if cached_video:
-                try:
-                    if cached_video.get('type') == 'input_file':
-                        if 'md5' in cached_video:
-                            file_to_send = types.InputFile(
-                                id=cached_video['id'],
-                                parts=cached_video['parts'],
-                                name=cached_video['name'],
-                                md5_checksum=cached_video['md5']
-                            )
-                        else:
-                            file_to_send = types.InputFileBig(
-                                id=cached_video['id'],
-                                parts=cached_video['parts'],
-                                name=cached_video['name']
-                            )
-                        use_cached = True
-                        logger.info("Using cached video")
-                except Exception as e:
-                    logger.warning(f"Failed to reconstruct cached video: {e}, will upload from media")
-                    # Очищаем невалидный кэш
-                    self.bot.storage.delete_start_video()
-            
-            # Если кэша нет, загружаем из media
-            if not file_to_send:
-                logger.info("No cache found, uploading video from media")
-                file_to_send = await self._upload_and_cache_video()
-            
-            # Если не удалось загрузить, используем путь к файлу напрямую
-            if not file_to_send:
-                if os.path.exists(self.video_path):
-                    file_to_send = self.video_path
-                    logger.info("Using video file path directly")
-                else:
-                    logger.error(f"Video file not found: {self.video_path}")
-                    raise FileNotFoundError(f"Video file not found: {self.video_path}")
-            
-            try:
-                await self.client.send_message(
-                    event.chat_id,
-                    text,
-                    buttons=buttons,
-                    parse_mode="HTML",
-                    file=file_to_send,
-                    attributes=[
-                        types.DocumentAttributeVideo(
-                            duration=0, w=0, h=0, supports_streaming=True
-                        )
-                    ],
-                )
-            except Exception as send_error:
-                # Если кэшированное видео не работает, загружаем заново из media
-                if use_cached:
-                    logger.warning(f"Failed to send cached video: {send_error}, uploading from media")
-                    # Очищаем невалидный кэш
-                    self.bot.storage.delete_start_video()
-                    # Загружаем и кэшируем заново
-                    file_to_send = await self._upload_and_cache_video()
-                    if not file_to_send:
-                        if os.path.exists(self.video_path):
-                            file_to_send = self.video_path
-                        else:
-                            raise FileNotFoundError(f"Video file not found: {self.video_path}")
-                    
-                    # Повторная попытка отправки
-                    await self.client.send_message(
-                        event.chat_id,
-                        text,
-                        buttons=buttons,
-                        parse_mode="HTML",
-                        file=file_to_send,
-                        attributes=[
-                            types.DocumentAttributeVideo(
-                                duration=0, w=0, h=0, supports_streaming=True
-                            )
-                        ],
-                    )
-                else:
-                    # Если это уже была попытка с файлом из media, пробрасываем ошибку дальше
-                    raise
-        except Exception as e:
-            logger.error(f"Error handling start command: {str(e)}") 
\ No newline at end of file
+    async def _send_start(self, chat_id: int, file: StartMedia) -> types.Message:
+        """Send the precomputed /start message with the video attached"""
+        return await self.client.send_message(
+            chat_id,
+            self._start_text,
+            formatting_entities=self._start_entities,
+            buttons=self._start_markup,
+            file=file,
+            attributes=START_VIDEO_ATTRIBUTES,
+        )
@@ -1,18 +1,142 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import asyncio
 import threading
+import time
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
+from loguru import logger
+
+from .config import Config
+from .metrics import render
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class HealthState:
+    """Probe results shared between the bot's event loop and the health thread.
+
+    The loop writes (heartbeat, cached check results); probe requests only
+    read, so a probe never touches Redis or Telegram itself.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self.heartbeat_at: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.checks: Dict[str, bool] = {}
+        self.boost_progress_at: Optional[float] = None
+        # Set once handlers are registered; cleared again when shutdown starts
+        self.ready = False
+        self.draining = False
+
+    def mark_boost_progress(self) -> None:
+        """Called by the boost poller whenever getUpdates returns"""
+        self.boost_progress_at = time.monotonic()
+
+    def liveness(self) -> Tuple[bool, List[str]]:
+        """Live while the event loop keeps beating (or the bot is still starting)"""
+        now = time.monotonic()
+        if self.heartbeat_at is None:
+            starting = now - self.started_at < Config.HEALTH_STARTUP_GRACE
+            return starting, ["event_loop starting" if starting else "event_loop never started"]
+        stalled_for = now - self.heartbeat_at
+        if stalled_for > Config.HEALTH_LOOP_STALL:
+            return False, [f"event_loop stalled for {stalled_for:.0f}s"]
+        return True, ["event_loop ok"]
+
+    def readiness(self) -> Tuple[bool, List[str]]:
+        """Ready when the loop is live and the last (fresh) checks all passed"""
+        live, lines = self.liveness()
+        if self.draining:
+            return False, lines + ["shutting down"]
+        if not self.ready:
+            return False, lines + ["starting"]
+        if self.checked_at is None:
+            return False, lines + ["checks pending"]
+        if time.monotonic() - self.checked_at > 3 * Config.HEALTH_CHECK_INTERVAL + Config.HEALTH_REDIS_TIMEOUT:
+            return False, lines + ["checks stale"]
+        lines = lines + [f"{name} {'ok' if ok else 'failing'}" for name, ok in self.checks.items()]
+        return live and self.heartbeat_at is not None and all(self.checks.values()), lines
+
+
+health = HealthState()
+
+
+class HealthMonitor:
+    """Runs on the bot's loop: beats the heartbeat and refreshes cached checks"""
+
+    def __init__(self, bot: "Bot") -> None:
+        self.bot = bot
+
+    async def run(self) -> None:
+        await asyncio.gather(self._beat(), self._check_periodically())
+
+    async def _beat(self) -> None:
+        while True:
+            health.heartbeat_at = time.monotonic()
+            await asyncio.sleep(1)
+
+    async def _check_periodically(self) -> None:
+        while True:
+            try:
+                health.checks = await self._run_checks()
+                health.checked_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Health checks failed: {str(e)}")
+            await asyncio.sleep(Config.HEALTH_CHECK_INTERVAL)
+
+    async def _run_checks(self) -> Dict[str, bool]:
+        checks = {
+            "telegram": self.bot.client is not None and self.bot.client.is_connected(),
+            "redis": await self._redis_ok(),
+        }
+        if self._polls_boosts():
+            progress_at = health.boost_progress_at
+            checks["boost_poller"] = (
+                progress_at is not None and time.monotonic() - progress_at < Config.HEALTH_BOOST_STALL
+            )
+        return checks
+
+    async def _redis_ok(self) -> bool:
+        try:
+            return await asyncio.wait_for(self.bot.storage.ping(), Config.HEALTH_REDIS_TIMEOUT)
+        except Exception:
+            return False
+
+    def _polls_boosts(self) -> bool:
+        """Only the leader of a polling-mode intake instance runs the poller"""
+        return (
+            self.bot.role != "worker"
+            and Config.BOOST_UPDATES_MODE != "webhook"
+            and self.bot.leader.is_leader
+        )
+
 
 class _HealthHandler(BaseHTTPRequestHandler):
     def do_GET(self):
-        if self.path in ('/', '/healthz', '/livez', '/readyz'):
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(b'OK')
+        if self.path == '/metrics':
+            body, content_type = render()
+            self._respond(200, body, content_type)
+        elif self.path in ('/', '/healthz', '/livez'):
+            self._respond_probe(*health.liveness())
+        elif self.path == '/readyz':
+            self._respond_probe(*health.readiness())
         else:
             self.send_response(404)
             self.end_headers()
 
+    def _respond_probe(self, ok: bool, lines: List[str]) -> None:
+        self._respond(200 if ok else 503, ("\n".join(lines) + "\n").encode(), 'text/plain')
+
+    def _respond(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.end_headers()
+        self.wfile.write(body)
+
     # Silence default request logging to stderr
     def log_message(self, format, *args):  # type: ignore[override]
         return
@@ -24,5 +148,3 @@ def start_health_server(port: int) -> threading.Thread:
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     return thread
-
-
@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+
+from loguru import logger
+
+from .config import Config
+
+if TYPE_CHECKING:
+    from .storage import AsyncRedisStorage
+
+LEADER_KEY = "bot:leader"
+
+
+class LeaderElection:
+    """Redis lease that picks one replica to run singleton jobs.
+
+    Jobs registered with :meth:`add_job` (the getUpdates poller, sweepers,
+    the reconciler) run only while this instance holds ``bot:leader``. The
+    lease is renewed every ``renew_interval`` seconds; followers try to
+    take it just as often, so a dead leader is replaced within
+    ``ttl + renew_interval``. A leader that cannot reach Redis steps down
+    before its lease could have passed to someone else.
+    """
+
+    def __init__(self, storage: "AsyncRedisStorage",
+                 owner: Optional[str] = None,
+                 ttl: Optional[float] = None,
+                 renew_interval: Optional[float] = None) -> None:
+        self.storage = storage
+        self.owner = owner or Config.INSTANCE_ID
+        self.ttl = ttl or Config.LEADER_LEASE_TTL
+        self.renew_interval = renew_interval or Config.LEADER_RENEW_INTERVAL
+        if self.renew_interval >= self.ttl:
+            logger.warning(
+                f"LEADER_RENEW_INTERVAL ({self.renew_interval}s) should be well below "
+                f"LEADER_LEASE_TTL ({self.ttl}s)"
+            )
+        self._jobs: Dict[str, Callable[[], Awaitable[None]]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._leading = False
+        # Monotonic time until which the lease is known to be ours
+        self._valid_until = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leading
+
+    def add_job(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        """Run ``job()`` while this instance is the leader (restarted on each election)"""
+        self._jobs[name] = job
+
+    async def run(self) -> None:
+        """Campaign for and renew the lease forever"""
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    held = await self.storage.acquire_lease(LEADER_KEY, self.owner, self.ttl)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Leader lease renewal failed: {str(e)}")
+                    # Keep leading only while the lease cannot have expired yet
+                    held = time.monotonic() < self._valid_until
+                else:
+                    if held:
+                        self._valid_until = started + self.ttl
+
+                if held and not self._leading:
+                    self._start_jobs()
+                elif not held and self._leading:
+                    self._valid_until = 0.0
+                    await self._stop_jobs("lost the leader lease")
+                await asyncio.sleep(self.renew_interval)
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """Stop leader jobs and hand the lease over right away"""
+        if self._leading:
+            await self._stop_jobs("shutting down")
+            self._valid_until = 0.0
+            try:
+                await self.storage.release_lease(LEADER_KEY, self.owner)
+            except Exception as e:
+                logger.warning(f"Failed to release leader lease: {str(e)}")
+
+    def _start_jobs(self) -> None:
+        logger.info(f"{self.owner} became leader, starting {', '.join(self._jobs) or 'no jobs'}")
+        self._leading = True
+        for name, job in self._jobs.items():
+            self._running[name] = asyncio.ensure_future(self._supervise(name, job))
+
+    async def _stop_jobs(self, reason: str) -> None:
+        logger.info(f"{self.owner} stepping down as leader: {reason}")
+        self._leading = False
+        tasks = list(self._running.values())
+        self._running = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _supervise(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        """Restart a leader job that exits or crashes while we still lead"""
+        while True:
+            try:
+                await job()
+                logger.warning(f"Leader job {name} exited, restarting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leader job {name} crashed: {str(e)}, restarting")
+            await asyncio.sleep(self.renew_interval)
@@ -0,0 +1,55 @@
+from typing import Any, Callable, TypeVar
+import asyncio
+import functools
+import time
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class InflightTracker:
+    """Counts running update handlers so shutdown can wait for them to finish"""
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def track(self, func: F) -> F:
+        """Decorator for coroutine handlers whose work must not be cut off"""
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            self._count += 1
+            self._idle.clear()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._count -= 1
+                if not self._count:
+                    self._idle.set()
+        return wrapper  # type: ignore[return-value]
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for running handlers; False if some are left"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), max(timeout, 0))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+inflight = InflightTracker()
+
+
+class Deadline:
+    """A fixed point in time shared by every shutdown step"""
+
+    def __init__(self, seconds: float) -> None:
+        self.at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
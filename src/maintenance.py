@@ -0,0 +1,245 @@
+"""One-off maintenance commands for the Redis data layout.
+
+Run from the project root, e.g.:
+
+    python -m src.maintenance backfill-channel-users --batch-size 500
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List, Set
+
+from loguru import logger
+from redis import Redis
+
+from .storage import WORKER_SESSIONS_SEEN_KEY, RedisStorage, _session_cache_keys, _session_key
+
+
+def _backfill_channel_users_batch(client: Redis, keys: List[str]) -> int:
+    """Copy one batch of user:{id}:channels sets into channel:{id}:users"""
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.smembers(key)
+    members = pipe.execute()
+
+    owners: Dict[str, Set[str]] = {}
+    for key, channels in zip(keys, members):
+        user_id = key.split(":")[1]
+        for channel_id in channels:
+            owners.setdefault(channel_id, set()).add(user_id)
+
+    pipe = client.pipeline(transaction=False)
+    for channel_id, user_ids in owners.items():
+        pipe.sadd(f"channel:{channel_id}:users", *user_ids)
+    pipe.execute()
+    return sum(len(user_ids) for user_ids in owners.values())
+
+
+def backfill_channel_users(storage: RedisStorage, batch_size: int = 500) -> int:
+    """Build the channel -> owners reverse index from existing user keys.
+
+    Streams keys with SCAN so memory stays bounded by ``batch_size``;
+    SADD is idempotent, so the command can be re-run or interrupted safely.
+    """
+    client = storage.redis_client
+    total = 0
+    batch: List[str] = []
+    for key in client.scan_iter(match="user:*:channels", count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            total += _backfill_channel_users_batch(client, batch)
+            batch = []
+            logger.info(f"Backfilled {total} channel owner links so far")
+    if batch:
+        total += _backfill_channel_users_batch(client, batch)
+    return total
+
+
+# Per-field keys written before channel metadata moved into one hash.
+# Photo URLs are dropped rather than moved: they expired and embedded the
+# bot token; onboarding and the reconciler store photo file_ids instead,
+# and readers get fresh URLs from the bot's photo endpoint (src/photos.py).
+LEGACY_CHANNEL_FIELDS = ("title", "username", "url", "photo_small_url", "photo_big_url")
+MIGRATED_CHANNEL_FIELDS = ("title", "username", "url")
+
+
+def _migrate_channel_records_batch(client: Redis, channel_ids: List[str]) -> int:
+    """Move one batch of legacy channel:{id}:<field> keys into channel:{id}:info"""
+    pipe = client.pipeline(transaction=False)
+    for channel_id in channel_ids:
+        pipe.mget([f"channel:{channel_id}:{name}" for name in MIGRATED_CHANNEL_FIELDS])
+    values = pipe.execute()
+
+    pipe = client.pipeline(transaction=False)
+    for channel_id, row in zip(channel_ids, values):
+        info_key = f"channel:{channel_id}:info"
+        for name, value in zip(MIGRATED_CHANNEL_FIELDS, row):
+            if value is not None:
+                # HSETNX: never clobber a field the bot already wrote to the hash
+                pipe.hsetnx(info_key, name, value)
+        pipe.hdel(info_key, "photo_small_url", "photo_big_url")
+        pipe.delete(*(f"channel:{channel_id}:{name}" for name in LEGACY_CHANNEL_FIELDS))
+    pipe.execute()
+    return len(channel_ids)
+
+
+def migrate_channel_records(storage: RedisStorage, batch_size: int = 500) -> int:
+    """Move per-field channel metadata keys into one hash per channel.
+
+    Safe while the bot is running: readers fall back to the legacy keys
+    until a channel is moved, and fields written by the bot in the
+    meantime win over the legacy values. Streams with SCAN, so it can be
+    interrupted and re-run.
+    """
+    client = storage.redis_client
+    legacy_suffixes = tuple(f":{name}" for name in LEGACY_CHANNEL_FIELDS)
+    total = 0
+    batch: List[str] = []
+    seen: Set[str] = set()
+    for key in client.scan_iter(match="channel:*", count=batch_size):
+        if not key.endswith(legacy_suffixes):
+            continue
+        channel_id = key.split(":")[1]
+        if channel_id in seen:
+            continue
+        seen.add(channel_id)
+        batch.append(channel_id)
+        if len(batch) >= batch_size:
+            total += _migrate_channel_records_batch(client, batch)
+            batch = []
+            seen.clear()
+            logger.info(f"Migrated {total} channel records so far")
+    if batch:
+        total += _migrate_channel_records_batch(client, batch)
+    return total
+
+
+def migrate_boost_index(storage: RedisStorage, legacy_ttl: int, batch_size: int = 500) -> int:
+    """Move legacy channel:{id}:boost_users sets into channel:{id}:boosts ZSETs.
+
+    The legacy sets carry no expiry, so members are scored ``legacy_ttl``
+    seconds from now; ZADD NX keeps expiries the bot already recorded.
+    """
+    client = storage.redis_client
+    expire_at = time.time() + legacy_ttl
+    total = 0
+    for key in client.scan_iter(match="channel:*:boost_users", count=batch_size):
+        channel_id = key.split(":")[1]
+        cursor = 0
+        while True:
+            cursor, members = client.sscan(key, cursor, count=batch_size)
+            if members:
+                pipe = client.pipeline(transaction=False)
+                pipe.zadd(f"channel:{channel_id}:boosts", {m: expire_at for m in members}, nx=True)
+                pipe.sadd("boosts:channels", channel_id)
+                pipe.execute()
+                total += len(members)
+            if cursor == 0:
+                break
+        client.delete(key)
+    return total
+
+
+def backfill_known_channels(storage: RedisStorage, batch_size: int = 500) -> int:
+    """Build channels:known from existing channel metadata and owner keys"""
+    client = storage.redis_client
+    suffixes = (":info", ":users", ":title")
+    total = 0
+    batch: Set[str] = set()
+    for key in client.scan_iter(match="channel:*", count=batch_size):
+        if key.endswith(suffixes):
+            batch.add(key.split(":")[1])
+        if len(batch) >= batch_size:
+            total += client.sadd("channels:known", *batch)
+            batch.clear()
+    if batch:
+        total += client.sadd("channels:known", *batch)
+    return total
+
+
+def prune_worker_sessions(storage: RedisStorage, idle: int, batch_size: int = 500) -> List[str]:
+    """Delete Telegram sessions of workers that have not run for ``idle`` seconds.
+
+    Workers record when they last ran in bot:sessions:seen. Sessions left
+    by consumers that never recorded it (written before that existed) are
+    stamped now and pruned by a later run if they stay idle, so a live
+    worker is never logged out. Returns the consumers removed.
+    """
+    client = storage.redis_client
+    seen = client.hgetall(WORKER_SESSIONS_SEEN_KEY)
+    consumers = {key[len("bot:session:"):] for key in client.scan_iter(match="bot:session:*", count=batch_size)}
+    now = int(time.time())
+    unknown = {consumer: now for consumer in consumers if consumer not in seen}
+    if unknown:
+        client.hset(WORKER_SESSIONS_SEEN_KEY, mapping=unknown)
+
+    idle_consumers = [consumer for consumer, at in seen.items() if now - int(at) > idle]
+    for consumer in idle_consumers:
+        pipe = client.pipeline()
+        pipe.delete(_session_key(consumer), *_session_cache_keys(consumer))
+        pipe.hdel(WORKER_SESSIONS_SEEN_KEY, consumer)
+        pipe.execute()
+        logger.info(f"Removed session of idle worker {consumer}")
+    return idle_consumers
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-channel-users",
+        help="Build channel:{id}:users from user:{id}:channels",
+    )
+    backfill.add_argument("--batch-size", type=int, default=500)
+
+    migrate = commands.add_parser(
+        "migrate-channel-records",
+        help="Move channel:{id}:<field> keys into channel:{id}:info hashes",
+    )
+    migrate.add_argument("--batch-size", type=int, default=500)
+
+    boosts = commands.add_parser(
+        "migrate-boost-index",
+        help="Move channel:{id}:boost_users sets into expiring channel:{id}:boosts",
+    )
+    boosts.add_argument("--legacy-ttl-days", type=int, default=30)
+    boosts.add_argument("--batch-size", type=int, default=500)
+
+    known = commands.add_parser(
+        "backfill-known-channels",
+        help="Build channels:known from existing channel keys",
+    )
+    known.add_argument("--batch-size", type=int, default=500)
+
+    sessions = commands.add_parser(
+        "prune-worker-sessions",
+        help="Delete bot:session/entities/update_state keys of workers idle for --idle-days",
+    )
+    sessions.add_argument("--idle-days", type=int, default=7)
+    sessions.add_argument("--batch-size", type=int, default=500)
+
+    args = parser.parse_args(argv)
+    storage = RedisStorage()
+
+    if args.command == "backfill-channel-users":
+        total = backfill_channel_users(storage, batch_size=args.batch_size)
+        logger.info(f"Backfill finished: {total} channel owner links written")
+    elif args.command == "migrate-channel-records":
+        total = migrate_channel_records(storage, batch_size=args.batch_size)
+        logger.info(f"Migration finished: {total} channel records moved")
+    elif args.command == "migrate-boost-index":
+        total = migrate_boost_index(storage, legacy_ttl=args.legacy_ttl_days * 86400,
+                                    batch_size=args.batch_size)
+        logger.info(f"Migration finished: {total} boosts moved")
+    elif args.command == "backfill-known-channels":
+        total = backfill_known_channels(storage, batch_size=args.batch_size)
+        logger.info(f"Backfill finished: {total} channels added to channels:known")
+    elif args.command == "prune-worker-sessions":
+        removed = prune_worker_sessions(storage, idle=args.idle_days * 86400, batch_size=args.batch_size)
+        logger.info(f"Prune finished: {len(removed)} worker sessions removed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,122 @@
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import functools
+import inspect
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Redis calls are sub-millisecond when healthy; the default buckets start at 5ms
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HANDLER_LATENCY = Histogram("bot_handler_seconds", "Update/command handler latency", ["handler"])
+HANDLER_ERRORS = Counter("bot_handler_errors_total", "Handler invocations that failed", ["handler"])
+DISPATCH_WAIT = Histogram(
+    "bot_dispatch_wait_seconds", "Time an update waits in the dispatcher before its handler runs", ["handler"],
+)
+DISPATCH_DROPPED = Counter(
+    "bot_dispatch_dropped_total", "Updates the dispatcher dropped because it was full or stopped", ["handler", "policy"],
+)
+
+REDIS_LATENCY = Histogram("bot_redis_seconds", "Storage call latency", ["method"], buckets=FAST_BUCKETS)
+REDIS_ERRORS = Counter("bot_redis_errors_total", "Storage calls that raised", ["method"])
+
+BOT_API_LATENCY = Histogram("bot_api_seconds", "Bot API call latency including retries", ["method"])
+BOT_API_ERRORS = Counter("bot_api_errors_total", "Bot API calls that failed", ["method", "code"])
+
+BOOST_BATCH_UPDATES = Histogram(
+    "bot_boost_batch_updates", "Boost updates per ingested batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+BOOST_UPDATE_LAG = Histogram(
+    "bot_boost_update_lag_seconds", "Delay between a boost change on Telegram and its ingestion",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+BOOST_OFFSET_COMMITTED = Gauge(
+    "bot_boost_offset_committed_timestamp_seconds", "Unix time the boost poller last advanced its offset",
+)
+
+EVENT_LOOP_LAG = Gauge("bot_event_loop_lag_seconds", "How late the last event loop lag probe woke up")
+QUEUE_DEPTH = Gauge("bot_queue_depth", "Items waiting in in-process queues", ["queue"])
+
+
+def render() -> tuple:
+    """Body and content type for a /metrics response"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def timed(histogram: Histogram, errors: Counter, label: str) -> Callable[[F], F]:
+    """Decorator recording latency and raised exceptions of a function or coroutine"""
+
+    def decorator(func: F) -> F:
+        latency = histogram.labels(label)
+        failures = errors.labels(label)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    failures.inc()
+                    raise
+                finally:
+                    latency.observe(time.perf_counter() - started)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failures.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def instrument_storage(cls: type) -> type:
+    """Class decorator timing every public storage method under its own name"""
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(member):
+            continue
+        if inspect.isasyncgenfunction(member):
+            # Subscriptions live forever; their latency says nothing
+            continue
+        setattr(cls, name, timed(REDIS_LATENCY, REDIS_ERRORS, name)(member))
+    return cls
+
+
+async def monitor_event_loop_lag(interval: float = 1.0) -> None:
+    """Sample event loop lag forever; a saturated loop wakes sleepers late"""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, time.perf_counter() - started - interval))
+
+
+def track_queue_depth(queue: str, depth: Callable[[], float]) -> None:
+    """Report ``depth()`` as bot_queue_depth{queue=...} on every scrape"""
+    QUEUE_DEPTH.labels(queue).set_function(depth)
+
+
+def observe_boost_batch(updates: list, now: Optional[float] = None) -> None:
+    """Record batch size and per-update lag for a batch of boost updates"""
+    BOOST_BATCH_UPDATES.observe(len(updates))
+    now = now if now is not None else time.time()
+    for upd in updates:
+        if "chat_boost" in upd:
+            happened_at = ((upd["chat_boost"] or {}).get("boost") or {}).get("add_date")
+        else:
+            happened_at = (upd.get("removed_chat_boost") or {}).get("remove_date")
+        if happened_at:
+            BOOST_UPDATE_LAG.observe(max(0.0, now - happened_at))
@@ -0,0 +1,174 @@
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Mapping, Optional, Set
+import json
+import time
+
+
+@dataclass
+class ChannelRecord:
+    """Channel metadata stored as one Redis hash at channel:{id}:info"""
+
+    channel_id: int
+    title: str = ""
+    username: str = ""
+    url: str = ""
+    photo_small_file_id: Optional[str] = None
+    photo_big_file_id: Optional[str] = None
+
+    @classmethod
+    def field_names(cls) -> tuple:
+        """Hash field names (everything except the channel id)"""
+        return tuple(f.name for f in fields(cls) if f.name != "channel_id")
+
+    def to_mapping(self) -> Dict[str, str]:
+        """Fields to HSET; None means "unknown, keep the stored value" """
+        return {
+            name: value
+            for name in self.field_names()
+            if (value := getattr(self, name)) is not None
+        }
+
+    @classmethod
+    def from_mapping(cls, channel_id: int, mapping: Mapping[str, str]) -> "ChannelRecord":
+        """Build a record from HGETALL output, ignoring unknown fields"""
+        known = set(cls.field_names())
+        return cls(channel_id=channel_id, **{k: v for k, v in mapping.items() if k in known})
+
+
+@dataclass
+class BoostChange:
+    """A parsed chat_boost (added=True) or removed_chat_boost update"""
+
+    added: bool
+    channel_id: int
+    user_id: int
+    boost_id: str
+    add_date: Optional[int] = None
+    expire_date: Optional[int] = None
+    remove_date: Optional[int] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ChannelDiff:
+    """Changes the reconciler found between Telegram and Redis for one channel"""
+
+    channel_id: int
+    added_owners: Set[int] = field(default_factory=set)
+    removed_owners: Set[int] = field(default_factory=set)
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not (self.added_owners or self.removed_owners or self.metadata)
+
+
+@dataclass
+class ChannelEvent:
+    """A normalized channel event queued for the workers on work:channels:{partition}"""
+
+    type: str
+    channel_id: int
+    actor_id: Optional[int] = None
+    # Access hash seen by the receiver, so workers need not resolve the channel
+    access_hash: Optional[int] = None
+    # Raw Bot API updates for boost_updates events
+    updates: List[Dict[str, Any]] = field(default_factory=list)
+
+    BOT_ADDED = "bot_added"
+    BOT_REMOVED = "bot_removed"
+    BOOST_UPDATES = "boost_updates"
+
+    def to_fields(self) -> Dict[str, str]:
+        """Stream entry fields for XADD"""
+        entry = {"type": self.type, "channel_id": str(self.channel_id)}
+        if self.actor_id is not None:
+            entry["actor_id"] = str(self.actor_id)
+        if self.access_hash is not None:
+            entry["access_hash"] = str(self.access_hash)
+        if self.updates:
+            entry["updates"] = json.dumps(self.updates, ensure_ascii=False)
+        return entry
+
+    @classmethod
+    def from_fields(cls, entry: Mapping[str, str]) -> "ChannelEvent":
+        """Build an event from a stream entry"""
+        actor_id = entry.get("actor_id")
+        access_hash = entry.get("access_hash")
+        return cls(
+            type=entry["type"],
+            channel_id=int(entry["channel_id"]),
+            actor_id=int(actor_id) if actor_id else None,
+            access_hash=int(access_hash) if access_hash else None,
+            updates=json.loads(entry["updates"]) if entry.get("updates") else [],
+        )
+
+
+@dataclass
+class BotEvent:
+    """A channel lifecycle change published on the bot:events stream.
+
+    Entries are flat and self-contained so consumer groups can process
+    them independently: ``v`` (schema version), ``type``, ``channel_id``,
+    ``ts`` (unix ms) and, only when set, ``actor_id``, ``user_id``,
+    ``boost_id``, ``expire_date`` and comma-separated ``added``/``removed``
+    user ids.
+    """
+
+    type: str
+    channel_id: int
+    actor_id: Optional[int] = None
+    user_id: Optional[int] = None
+    boost_id: Optional[str] = None
+    expire_date: Optional[int] = None
+    added: Set[int] = field(default_factory=set)
+    removed: Set[int] = field(default_factory=set)
+    ts: int = field(default_factory=lambda: int(time.time() * 1000))
+
+    VERSION = 1
+    BOT_ADDED = "bot_added"
+    BOT_REMOVED = "bot_removed"
+    ADMINS_CHANGED = "admins_changed"
+    BOOST_ADDED = "boost_added"
+    BOOST_REMOVED = "boost_removed"
+
+    def to_fields(self) -> Dict[str, str]:
+        """Stream entry fields for XADD, omitting empty ones"""
+        entry = {
+            "v": str(self.VERSION),
+            "type": self.type,
+            "channel_id": str(self.channel_id),
+            "ts": str(self.ts),
+        }
+        for name in ("actor_id", "user_id", "boost_id", "expire_date"):
+            value = getattr(self, name)
+            if value is not None:
+                entry[name] = str(value)
+        for name in ("added", "removed"):
+            ids = getattr(self, name)
+            if ids:
+                entry[name] = ",".join(str(uid) for uid in sorted(ids))
+        return entry
+
+    @classmethod
+    def from_fields(cls, entry: Mapping[str, str]) -> "BotEvent":
+        """Parse a stream entry (unversioned entries carry only type and channel_id)"""
+
+        def optional_int(name: str) -> Optional[int]:
+            value = entry.get(name)
+            return int(value) if value else None
+
+        def ids(name: str) -> Set[int]:
+            value = entry.get(name)
+            return {int(uid) for uid in value.split(",")} if value else set()
+
+        return cls(
+            type=entry["type"],
+            channel_id=int(entry["channel_id"]),
+            actor_id=optional_int("actor_id"),
+            user_id=optional_int("user_id"),
+            boost_id=entry.get("boost_id") or None,
+            expire_date=optional_int("expire_date"),
+            added=ids("added"),
+            removed=ids("removed"),
+            ts=optional_int("ts") or 0,
+        )
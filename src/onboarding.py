@@ -0,0 +1,189 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+from collections import OrderedDict
+import asyncio
+import time
+
+from telethon.tl.types import Channel, ChannelParticipantAdmin, ChannelParticipantCreator
+from telethon.tl.types import ChannelParticipantsAdmins, InputChannel, PeerChannel
+from loguru import logger
+
+from .bot_api import BotAPIError
+from .config import Config
+from .models import BotEvent, ChannelRecord
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+def _raw_channel_id(chat_id: int) -> int:
+    """Strip the Bot API -100 prefix to get the MTProto channel id"""
+    str_id = str(chat_id)
+    return int(str_id[4:]) if str_id.startswith('-100') else abs(chat_id)
+
+
+class ChannelOnboarding:
+    """Fetch and store everything we know about a channel the bot joined.
+
+    Both the ChatAction and the raw UpdateChannelParticipant handlers feed
+    into :meth:`onboard`. Concurrent calls for the same channel share one
+    in-flight run, and a channel onboarded less than ``dedupe_window``
+    seconds ago is skipped except for attributing a new actor.
+    """
+
+    def __init__(self, bot: "Bot", dedupe_window: Optional[float] = None) -> None:
+        self.bot = bot
+        self.client = bot.client
+        self.storage = bot.storage
+        self.bot_api = bot.bot_api
+        self.dedupe_window = dedupe_window if dedupe_window is not None else Config.ONBOARDING_DEDUPE_WINDOW
+        self._inflight: Dict[int, "asyncio.Task[Set[int]]"] = {}
+        # chat_id -> (finished_at, user ids already attributed), oldest first
+        self._completed: "OrderedDict[int, Tuple[float, Set[int]]]" = OrderedDict()
+
+    @property
+    def inflight(self) -> int:
+        """Channels currently being onboarded"""
+        return len(self._inflight)
+
+    async def onboard(self, channel: Channel, chat_id: int, actor_id: Optional[int]) -> None:
+        """Onboard a channel once and attribute it to ``actor_id``"""
+        self._forget_expired()
+
+        recent = self._completed.get(chat_id)
+        if recent is not None:
+            logger.info(f"Channel {chat_id} onboarded {time.monotonic() - recent[0]:.1f}s ago, skipping")
+            await self._attribute(chat_id, actor_id, recent[1])
+            return
+
+        task = self._inflight.get(chat_id)
+        first = task is None
+        if first:
+            task = asyncio.ensure_future(self._run(channel, chat_id))
+            self._inflight[chat_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(chat_id, None))
+        else:
+            logger.info(f"Channel {chat_id} onboarding already in flight, joining it")
+
+        # Shield so one cancelled caller does not abort the shared run
+        attributed = await asyncio.shield(task)
+        await self._attribute(chat_id, actor_id, attributed)
+        if first:
+            # Joined callers saw the same addition; publish it once
+            await self.storage.publish_events([BotEvent(
+                BotEvent.BOT_ADDED, chat_id, actor_id=actor_id, added=set(attributed),
+            )])
+        logger.info(f"Bot was added to channel {chat_id} ({channel.title}) by user {actor_id}")
+
+    async def _run(self, channel: Channel, chat_id: int) -> Set[int]:
+        """Fetch metadata and admins, persist them, return attributed user IDs"""
+        # getChat (invite link + avatar) and admin iteration are independent
+        chat_info, admins = await asyncio.gather(
+            self.get_chat_info(chat_id),
+            self.fetch_admins(channel),
+        )
+
+        # Save URL: public t.me for public channels; invite for private
+        url_to_save = await self.resolve_channel_url(chat_id, channel.username, chat_info)
+
+        # One HSET for all metadata. Photos are stored as file_ids and
+        # resolved to URLs lazily on read (see PhotoUrlResolver).
+        photo = (chat_info or {}).get("photo") or {}
+        await self.storage.save_channel(ChannelRecord(
+            channel_id=chat_id,
+            title=channel.title,
+            username=channel.username or "",
+            url=url_to_save,
+            photo_small_file_id=photo.get("small_file_id", "") if chat_info else None,
+            photo_big_file_id=photo.get("big_file_id", "") if chat_info else None,
+        ))
+        if url_to_save:
+            logger.info(f"Saved invite URL for channel {chat_id}")
+
+        # Save admins as channel owners in storage
+        await self.storage.add_channel_for_users(admins, chat_id)
+        logger.info(f"Added channel {chat_id} for admins {admins}")
+
+        attributed = set(admins)
+        self._completed[chat_id] = (time.monotonic(), attributed)
+        return attributed
+
+    async def _attribute(self, chat_id: int, actor_id: Optional[int], attributed: Set[int]) -> None:
+        """Attribute the channel to the actor who added the bot, once"""
+        if not actor_id or actor_id in attributed:
+            return
+        attributed.add(actor_id)
+        await self.storage.add_channel_for_user(actor_id, chat_id)
+
+    def forget(self, chat_id: int) -> None:
+        """Drop the dedupe entry after a kick, so a re-add is onboarded from scratch"""
+        self._completed.pop(chat_id, None)
+
+    def _forget_expired(self) -> None:
+        """Drop dedupe entries older than the window (oldest are first)"""
+        deadline = time.monotonic() - self.dedupe_window
+        while self._completed:
+            chat_id, (finished_at, _) = next(iter(self._completed.items()))
+            if finished_at >= deadline:
+                break
+            self._completed.popitem(last=False)
+
+    async def resolve_channel(self, chat_id: int, access_hash: Optional[int] = None) -> Channel:
+        """Resolve a channel entity, falling back to a zero access hash for bots"""
+        raw_id = _raw_channel_id(chat_id)
+        if access_hash is not None:
+            return await self.client.get_entity(InputChannel(raw_id, access_hash))
+        try:
+            return await self.client.get_entity(PeerChannel(raw_id))
+        except ValueError:
+            # Not in the session's entity cache; bots may use access_hash=0
+            return await self.client.get_entity(InputChannel(raw_id, 0))
+
+    async def fetch_admins(self, chat: Channel) -> List[int]:
+        """Get list of channel admin IDs, empty on failure"""
+        try:
+            return await self.get_admin_ids(chat)
+        except Exception as e:
+            logger.error(f"Error getting channel admins: {str(e)}")
+            return []
+
+    async def get_admin_ids(self, chat) -> List[int]:
+        """Get list of channel admin IDs; errors (e.g. FloodWaitError) propagate"""
+        admins = []
+        async for participant in self.client.iter_participants(
+            chat,
+            filter=ChannelParticipantsAdmins
+        ):
+            if isinstance(participant.participant, (ChannelParticipantAdmin, ChannelParticipantCreator)):
+                admins.append(participant.id)
+        return admins
+
+    async def get_chat_info(self, chat_id: int) -> Optional[dict]:
+        """Fetch Bot API getChat for the channel, None on failure"""
+        try:
+            return await self.bot_api.get_chat(chat_id)
+        except Exception as e:
+            logger.warning(f"Failed to getChat for channel {chat_id}: {str(e)}")
+            return None
+
+    async def resolve_channel_url(self, chat_id: int, username: Optional[str],
+                                   chat_info: Optional[dict]) -> str:
+        """Public t.me link for public channels, an invite link for private ones"""
+        if username:
+            return f"https://t.me/{username}"
+        try:
+            # 1) Primary invite link already returned by getChat
+            invite_link = (chat_info or {}).get("invite_link")
+            if invite_link:
+                return invite_link
+            # 2) Create a new invite link (current method)
+            try:
+                created = await self.bot_api.create_chat_invite_link(chat_id)
+                if created and created.get("invite_link"):
+                    return created["invite_link"]
+            except BotAPIError as create_error:
+                logger.debug(f"createChatInviteLink failed for {chat_id}: {str(create_error)}")
+            # 3) Fallback to exportChatInviteLink (legacy for supergroups/channels)
+            return await self.bot_api.export_chat_invite_link(chat_id) or ""
+        except Exception as e:
+            logger.warning(f"Failed to export invite link for channel {chat_id}: {str(e)}")
+            return ""
@@ -0,0 +1,153 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import hmac
+import time
+
+from aiohttp import web
+from loguru import logger
+
+from .config import Config
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class PhotoUrlResolver:
+    """Resolve channel photo file_ids to download URLs on read.
+
+    Channel records store only photo file_ids. getFile paths are cached in
+    process and in Redis (``file:{file_id}:path``) for ``ttl`` seconds,
+    which must stay below Telegram's one-hour link lifetime. Concurrent
+    misses for the same file_id share one getFile call. URLs are built on
+    the way out, so the bot token is never persisted.
+    """
+
+    def __init__(self, bot: "Bot", ttl: Optional[int] = None) -> None:
+        self.bot_api = bot.bot_api
+        self.storage = bot.storage
+        self.ttl = ttl if ttl is not None else Config.PHOTO_URL_TTL
+        self._cache: Dict[str, Tuple[float, str]] = {}
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    async def resolve(self, file_id: str) -> str:
+        """Download URL for one file_id, empty string if it cannot be resolved"""
+        return (await self.resolve_many([file_id])).get(file_id, "")
+
+    async def resolve_many(self, file_ids: Iterable[str]) -> Dict[str, str]:
+        """Download URLs for many file_ids: memory, then one MGET, then getFile"""
+        now = time.monotonic()
+        paths: Dict[str, str] = {}
+        missing: List[str] = []
+        for file_id in dict.fromkeys(f for f in file_ids if f):
+            cached = self._cache.get(file_id)
+            if cached and cached[0] > now:
+                paths[file_id] = cached[1]
+            else:
+                missing.append(file_id)
+
+        if missing:
+            stored = await self.storage.get_file_paths(missing)
+            for file_id, path in stored.items():
+                self._remember(file_id, path)
+            paths.update(stored)
+            to_fetch = [file_id for file_id in missing if file_id not in stored]
+            fetched = await asyncio.gather(*(self._fetch(file_id) for file_id in to_fetch))
+            paths.update((file_id, path) for file_id, path in zip(to_fetch, fetched) if path)
+
+        return {file_id: self.bot_api.file_url(path) for file_id, path in paths.items()}
+
+    async def get_channel_photo_urls(self, channel_ids: Iterable[int], big: bool = False) -> Dict[int, str]:
+        """Photo URLs for many channels (small by default), skipping channels without a photo"""
+        records = await self.storage.get_channels_bulk(channel_ids)
+        field = "photo_big_file_id" if big else "photo_small_file_id"
+        file_ids = {channel_id: getattr(record, field) for channel_id, record in records.items()}
+        urls = await self.resolve_many(f for f in file_ids.values() if f)
+        return {
+            channel_id: urls[file_id]
+            for channel_id, file_id in file_ids.items()
+            if file_id and file_id in urls
+        }
+
+    def _remember(self, file_id: str, path: str) -> None:
+        self._cache[file_id] = (time.monotonic() + self.ttl, path)
+        if len(self._cache) > Config.PHOTO_URL_CACHE_SIZE:
+            # Expired entries first; otherwise drop the oldest inserted ones
+            now = time.monotonic()
+            for key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[key]
+            while len(self._cache) > Config.PHOTO_URL_CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+
+    async def _fetch(self, file_id: str) -> str:
+        """getFile with single-flight per file_id; returns the file_path or ''"""
+        future = self._inflight.get(file_id)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[file_id] = future
+        path = ""
+        try:
+            result = await self.bot_api.get_file(file_id)
+            path = (result or {}).get("file_path") or ""
+            if path:
+                self._remember(file_id, path)
+                await self.storage.save_file_paths({file_id: path}, self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to resolve file {file_id}: {str(e)}")
+        finally:
+            future.set_result(path)
+            self._inflight.pop(file_id, None)
+        return path
+
+
+class PhotoApiServer:
+    """Read endpoint handing resolved channel photo URLs to the backend.
+
+    ``GET /channels/photos?ids=<id>,<id>&size=small|big`` answers with a JSON
+    object of channel id to URL; channels without a photo are left out. The
+    URLs carry the bot token, so requests must send ``Authorization: Bearer
+    <PHOTO_API_TOKEN>`` and callers must not persist what they get back.
+    """
+
+    PATH = "/channels/photos"
+    MAX_IDS = 500
+
+    def __init__(self,
+                 resolver: PhotoUrlResolver,
+                 host: str = "0.0.0.0",
+                 port: Optional[int] = None,
+                 token: Optional[str] = None) -> None:
+        self.resolver = resolver
+        self.host = host
+        self.port = port if port is not None else Config.PHOTO_API_PORT
+        self.token = token if token is not None else Config.PHOTO_API_TOKEN
+        if not self.token:
+            raise ValueError("Photo API requires a token")
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get(self.PATH, self._handle_photos)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Photo API listening on {self.host}:{self.port}{self.PATH}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_photos(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {self.token}"):
+            return web.Response(status=401)
+        size = request.query.get("size", "small")
+        try:
+            channel_ids = [int(i) for i in request.query.get("ids", "").split(",") if i]
+        except ValueError:
+            return web.Response(status=400, text="ids must be comma-separated integers")
+        if size not in ("small", "big") or len(channel_ids) > self.MAX_IDS:
+            return web.Response(status=400, text=f"size is small or big, at most {self.MAX_IDS} ids")
+        urls = await self.resolver.get_channel_photo_urls(channel_ids, big=size == "big")
+        return web.json_response({str(channel_id): url for channel_id, url in urls.items()})
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Async token bucket with an explicit pause for Telegram flood waits.
+
+    ``rate`` tokens are added per second up to ``capacity``. :meth:`pause`
+    blocks every acquirer until the given number of seconds has passed,
+    which is how a FloodWaitError seen by one caller throttles all of them.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def consume(self) -> None:
+        """Take one token; call only after :meth:`delay` returned 0"""
+        self._tokens -= 1
+
+    def refund(self) -> None:
+        """Give back a token taken by :meth:`acquire` that went unused"""
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+    async def acquire(self) -> None:
+        """Wait for and take one token"""
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self.consume()
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next ``seconds`` seconds"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
@@ -0,0 +1,153 @@
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
+import asyncio
+
+from telethon.errors import ChannelPrivateError, ChatAdminRequiredError, FloodWaitError
+from telethon.tl.types import Channel
+from loguru import logger
+
+from .config import Config
+from .models import ChannelDiff, ChannelRecord
+from .ratelimit import TokenBucket
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+def _is_public_url(url: str) -> bool:
+    """Whether ``url`` is a t.me/<username> link rather than an invite link"""
+    if not url.startswith("https://t.me/"):
+        return False
+    path = url[len("https://t.me/"):]
+    return bool(path) and not path.startswith(("+", "joinchat/"))
+
+
+class ChannelReconciler:
+    """Periodically re-sync channel admins and metadata with Telegram.
+
+    Walks ``channels:known`` in SSCAN pages, fetches admins for a page with
+    bounded concurrency behind a shared rate limiter (paused on
+    FloodWaitError), and writes only the differences. The SSCAN cursor is
+    checkpointed after every page, so a pass resumes after a restart.
+    """
+
+    def __init__(self, bot: "Bot") -> None:
+        self.bot = bot
+        self.client = bot.client
+        self.storage = bot.storage
+        self.onboarding = bot.onboarding
+        self.interval = Config.RECONCILE_INTERVAL
+        self.page_size = Config.RECONCILE_PAGE_SIZE
+        self.limiter = TokenBucket(Config.RECONCILE_RATE)
+        self._semaphore = asyncio.Semaphore(Config.RECONCILE_CONCURRENCY)
+
+    async def run(self) -> None:
+        """Run reconciliation passes forever"""
+        while True:
+            try:
+                await self.run_pass()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Channel reconciliation pass failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def run_pass(self) -> None:
+        """Reconcile every known channel once, resuming from the checkpoint"""
+        cursor = await self.storage.get_reconcile_cursor()
+        if cursor:
+            logger.info(f"Resuming channel reconciliation from cursor {cursor}")
+        while True:
+            next_cursor, channel_ids = await self.storage.scan_known_channels(cursor, count=self.page_size)
+            if channel_ids:
+                await self._reconcile_page(channel_ids)
+            await self.storage.save_reconcile_cursor(next_cursor)
+            cursor = next_cursor
+            if cursor == 0:
+                logger.info("Channel reconciliation pass finished")
+                return
+
+    async def _reconcile_page(self, channel_ids: List[int]) -> None:
+        """Diff one page of channels against Telegram and write the changes"""
+        (records, owners), fetched = await asyncio.gather(
+            asyncio.gather(
+                self.storage.get_channels_bulk(channel_ids),
+                self.storage.get_channel_owners_bulk(channel_ids),
+            ),
+            asyncio.gather(*(self._fetch(channel_id) for channel_id in channel_ids)),
+        )
+
+        diffs = []
+        turned_private = []
+        for channel_id, result in zip(channel_ids, fetched):
+            if result is None:
+                continue
+            channel, admins = result
+            record = records.get(channel_id)
+            diff = self._diff(channel_id, channel, admins, owners.get(channel_id, set()), record)
+            if not channel.username and record is not None and _is_public_url(record.url):
+                turned_private.append(diff)
+            diffs.append(diff)
+
+        # Turned private: the old t.me link is dead. Replace it with an invite link
+        # the way onboarding does, or clear it if none can be made
+        urls = await asyncio.gather(*(self._invite_url(diff.channel_id) for diff in turned_private))
+        for diff, url in zip(turned_private, urls):
+            diff.metadata["url"] = url
+        diffs = [diff for diff in diffs if not diff.is_empty()]
+
+        if diffs:
+            await self.storage.apply_channel_diffs(diffs)
+            for diff in diffs:
+                logger.info(
+                    f"Reconciled channel {diff.channel_id}: +owners {sorted(diff.added_owners)}, "
+                    f"-owners {sorted(diff.removed_owners)}, fields {sorted(diff.metadata)}"
+                )
+
+    def _diff(self, channel_id: int, channel: Channel, admins: Set[int],
+              owners: Set[int], record: Optional[ChannelRecord]) -> ChannelDiff:
+        """Compute owner and metadata changes for one channel"""
+        diff = ChannelDiff(
+            channel_id=channel_id,
+            added_owners=admins - owners,
+            removed_owners=owners - admins,
+        )
+        current = {"title": channel.title, "username": channel.username or ""}
+        if channel.username:
+            current["url"] = f"https://t.me/{channel.username}"
+        for name, value in current.items():
+            if record is None or getattr(record, name) != value:
+                diff.metadata[name] = value
+        return diff
+
+    async def _invite_url(self, channel_id: int) -> str:
+        """Invite link for a channel that lost its username, under the same limits as _fetch"""
+        async with self._semaphore:
+            await self.limiter.acquire()
+            chat_info = await self.onboarding.get_chat_info(channel_id)
+            if not (chat_info or {}).get("invite_link"):
+                # resolve_channel_url falls back to creating or exporting a link
+                await self.limiter.acquire()
+            return await self.onboarding.resolve_channel_url(channel_id, None, chat_info)
+
+    async def _fetch(self, channel_id: int) -> Optional[Tuple[Channel, Set[int]]]:
+        """Fetch the channel entity and its admins, None if it cannot be read now"""
+        async with self._semaphore:
+            for _ in range(3):
+                try:
+                    await self.limiter.acquire()
+                    channel = await self.onboarding.resolve_channel(channel_id)
+                    await self.limiter.acquire()
+                    admins = set(await self.onboarding.get_admin_ids(channel))
+                    # Never wipe owners on an empty (or failed) admin listing
+                    return (channel, admins) if admins else None
+                except FloodWaitError as e:
+                    logger.warning(f"Flood wait {e.seconds}s while reconciling channel {channel_id}")
+                    self.limiter.pause(e.seconds)
+                except (ChannelPrivateError, ChatAdminRequiredError) as e:
+                    logger.info(f"Skipping channel {channel_id} during reconciliation: {str(e)}")
+                    return None
+                except Exception as e:
+                    logger.warning(f"Failed to reconcile channel {channel_id}: {str(e)}")
+                    return None
+            return None
+
@@ -0,0 +1,33 @@
+from typing import Any, Dict
+import json
+import time
+
+from loguru import logger
+
+
+class UpdateRecorder:
+    """Append incoming updates to a JSONL file for benchmarks/replay.py.
+
+    One line per update: ``ts`` (unix time), ``kind`` (bot_added,
+    bot_removed, start or boost) and the fields the replay needs, plus the
+    raw Telethon update as ``raw`` (``to_dict()``) or the Bot API update as
+    ``update``. Enabled with RECORD_UPDATES_PATH; meant for short captures.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Line-buffered so a capture survives the process being killed
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+        logger.info(f"Recording updates to {path}")
+
+    def record(self, kind: str, raw: Any = None, **fields: Any) -> None:
+        entry: Dict[str, Any] = {"ts": time.time(), "kind": kind, **fields}
+        if raw is not None:
+            entry["raw"] = raw.to_dict() if hasattr(raw, "to_dict") else raw
+        try:
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            logger.warning(f"Failed to record {kind} update: {str(e)}")
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,163 @@
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+from dataclasses import dataclass, field
+import asyncio
+import itertools
+import time
+
+from telethon.errors import FloodWaitError
+from loguru import logger
+
+from .config import Config
+from .ratelimit import TokenBucket
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    send: Callable[[], Awaitable[object]] = field(compare=False)
+    coalesce_key: Optional[Hashable] = field(compare=False, default=None)
+    attempts: int = field(compare=False, default=0)
+
+
+class OutboundScheduler:
+    """Priority queue for outgoing messages under Telegram's rate limits.
+
+    A global token bucket caps messages per second across all chats and a
+    per-chat bucket caps each chat; a job whose chat is throttled is
+    re-queued after its delay instead of blocking a worker. FloodWaitError
+    pauses the global bucket and retries the job. Jobs submitted with a
+    ``coalesce_key`` are dropped while an identical job is queued or was
+    sent within ``coalesce_window`` seconds.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 global_rate: Optional[float] = None,
+                 per_chat_rate: Optional[float] = None,
+                 coalesce_window: Optional[float] = None,
+                 max_attempts: Optional[int] = None) -> None:
+        self.workers = workers or Config.SEND_WORKERS
+        self.per_chat_rate = per_chat_rate or Config.SEND_PER_CHAT_RATE
+        self.coalesce_window = coalesce_window if coalesce_window is not None else Config.SEND_COALESCE_WINDOW
+        self.max_attempts = max_attempts or Config.SEND_MAX_ATTEMPTS
+        self._global = TokenBucket(global_rate or Config.SEND_GLOBAL_RATE)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._queue: "asyncio.PriorityQueue[_Job]" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending_keys: Dict[Hashable, int] = {}
+        self._sent_keys: Dict[Hashable, float] = {}
+        self._delayed = 0
+        # Jobs a worker has taken off the queue and not yet finished or re-queued
+        self._active = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting to be sent, including ones delayed by a chat limit"""
+        return self._queue.qsize() + self._delayed
+
+    def start(self) -> None:
+        """Start the sender workers"""
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Give queued and in-flight jobs up to ``timeout`` seconds to go out, then stop"""
+        deadline = time.monotonic() + timeout
+        while (self.depth or self._active) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self.depth or self._active:
+            logger.warning(f"Dropping {self.depth + self._active} outbound messages on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, chat_id: int, send: Callable[[], Awaitable[object]],
+               priority: int = PRIORITY_NORMAL, coalesce_key: Optional[Hashable] = None) -> bool:
+        """Queue ``send`` for ``chat_id``; False if it was coalesced away"""
+        if coalesce_key is not None:
+            sent_at = self._sent_keys.get(coalesce_key)
+            if coalesce_key in self._pending_keys or (
+                sent_at is not None and time.monotonic() - sent_at < self.coalesce_window
+            ):
+                return False
+            self._pending_keys[coalesce_key] = chat_id
+        self._queue.put_nowait(_Job(priority, next(self._seq), chat_id, send, coalesce_key))
+        return True
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= Config.SEND_MAX_TRACKED_CHATS:
+                # Full buckets carry no state worth keeping
+                self._chat_buckets = {
+                    cid: b for cid, b in self._chat_buckets.items() if b.delay() > 0
+                }
+                now = time.monotonic()
+                self._sent_keys = {
+                    key: at for key, at in self._sent_keys.items() if now - at < self.coalesce_window
+                }
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=1)
+        return bucket
+
+    def _requeue_later(self, job: _Job, delay: float) -> None:
+        self._delayed += 1
+
+        def _put() -> None:
+            self._delayed -= 1
+            self._queue.put_nowait(job)
+
+        asyncio.get_running_loop().call_later(delay, _put)
+
+    def _finish(self, job: _Job) -> None:
+        if job.coalesce_key is not None:
+            self._pending_keys.pop(job.coalesce_key, None)
+            self._sent_keys[job.coalesce_key] = time.monotonic()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._active += 1
+            try:
+                await self._process(job)
+            finally:
+                self._active -= 1
+
+    async def _process(self, job: _Job) -> None:
+        """Send one job, or hand it back to the queue for later"""
+        chat_bucket = self._chat_bucket(job.chat_id)
+        chat_delay = chat_bucket.delay()
+        if chat_delay > 0:
+            self._requeue_later(job, chat_delay)
+            return
+
+        await self._global.acquire()
+        # Another worker may have sent to this chat while we waited for the
+        # global token; check and consume with no await in between
+        chat_delay = chat_bucket.delay()
+        if chat_delay > 0:
+            self._global.refund()
+            self._requeue_later(job, chat_delay)
+            return
+        chat_bucket.consume()
+        job.attempts += 1
+        try:
+            await job.send()
+            self._finish(job)
+        except FloodWaitError as e:
+            logger.warning(f"Flood wait {e.seconds}s sending to chat {job.chat_id}")
+            self._global.pause(e.seconds)
+            if job.attempts < self.max_attempts:
+                self._requeue_later(job, e.seconds)
+            else:
+                logger.error(f"Giving up sending to chat {job.chat_id} after {job.attempts} attempts")
+                self._finish(job)
+        except Exception as e:
+            logger.error(f"Failed to send message to chat {job.chat_id}: {str(e)}")
+            self._finish(job)
@@ -0,0 +1,71 @@
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+import datetime
+
+from telethon.sessions import StringSession
+from telethon.tl import types
+from loguru import logger
+
+if TYPE_CHECKING:
+    from .storage import AsyncRedisStorage
+
+# (id, access_hash, username, phone, name), as MemorySession keeps them
+EntityRow = Tuple[int, int, Optional[str], Optional[str], Optional[str]]
+# (pts, qts, date as unix time, seq)
+UpdateStateRow = Tuple[int, int, int, int]
+
+
+class RedisSession(StringSession):
+    """StringSession whose entity cache and update state survive restarts.
+
+    The auth key still round-trips through the session string. Entity rows
+    (access hashes) and update states are loaded from Redis once at startup
+    and kept in memory, as in MemorySession; changes are only marked dirty
+    here and written in batches by :meth:`flush`, so Telethon's synchronous
+    session calls never wait on Redis.
+    """
+
+    def __init__(self, string: Optional[str] = None,
+                 entities: Iterable[EntityRow] = (),
+                 update_states: Optional[Dict[int, UpdateStateRow]] = None) -> None:
+        super().__init__(string)
+        self._entities |= set(entities)
+        for entity_id, (pts, qts, date, seq) in (update_states or {}).items():
+            self._update_states[entity_id] = types.updates.State(
+                pts=pts, qts=qts, seq=seq, unread_count=0,
+                date=datetime.datetime.fromtimestamp(date, tz=datetime.timezone.utc),
+            )
+        self._dirty_entities: Dict[int, EntityRow] = {}
+        self._dirty_states: Dict[int, UpdateStateRow] = {}
+
+    def process_entities(self, tlo) -> None:
+        rows = self._entities_to_rows(tlo)
+        if not rows:
+            return
+        new_rows = set(rows) - self._entities
+        self._entities |= new_rows
+        for row in new_rows:
+            self._dirty_entities[row[0]] = row
+
+    def set_update_state(self, entity_id: int, state) -> None:
+        super().set_update_state(entity_id, state)
+        date = state.date.timestamp() if isinstance(state.date, datetime.datetime) else state.date
+        self._dirty_states[entity_id] = (state.pts, state.qts, int(date or 0), state.seq)
+
+    async def flush(self, storage: "AsyncRedisStorage", consumer: Optional[str] = None) -> int:
+        """Write entities and update states changed since the last flush; returns rows written"""
+        entities, states = self._dirty_entities, self._dirty_states
+        if not entities and not states:
+            return 0
+        self._dirty_entities, self._dirty_states = {}, {}
+        try:
+            await storage.save_session_cache(entities, states, consumer)
+        except BaseException:
+            # Keep them for the next flush unless newer values arrived meanwhile
+            # (also when cancelled: shutdown flushes once more)
+            for entity_id, row in entities.items():
+                self._dirty_entities.setdefault(entity_id, row)
+            for entity_id, row in states.items():
+                self._dirty_states.setdefault(entity_id, row)
+            raise
+        logger.debug(f"Persisted {len(entities)} session entities and {len(states)} update states")
+        return len(entities) + len(states)
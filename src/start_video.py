@@ -0,0 +1,171 @@
+from typing import TYPE_CHECKING, Optional, Union
+import asyncio
+import os
+
+from telethon import errors, types
+from loguru import logger
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+StartMedia = Union[types.InputDocument, types.InputFile, types.InputFileBig, str]
+
+# Errors that mean the media itself is unusable (expired reference, lost upload parts)
+STALE_MEDIA_ERRORS = (
+    errors.FileReferenceExpiredError,
+    errors.FileReferenceInvalidError,
+    errors.FileReferenceEmptyError,
+    errors.FilerefUpgradeNeededError,
+    errors.MediaEmptyError,
+    errors.MediaInvalidError,
+    errors.FileIdInvalidError,
+)
+
+
+def is_stale_media_error(error: Exception) -> bool:
+    """True if a send failed because of the media, not the chat, network or limits"""
+    if isinstance(error, STALE_MEDIA_ERRORS):
+        return True
+    if not isinstance(error, errors.RPCError):
+        return False
+    # FilePart*/FileId* errors, and FILE_PART_*/FILE_ID_* ones Telethon has no class for
+    return (
+        type(error).__name__.startswith(("FilePart", "FileId"))
+        or str(error.message).startswith(("FILE_PART", "FILE_ID"))
+    )
+
+
+class StartVideo:
+    """The /start video, uploaded at most once and then reused server-side.
+
+    Preference order: the Document (id, access_hash, file_reference) saved
+    after the first successful send, then a fresh upload shared by all
+    concurrent callers, then the local file path as a last resort. The
+    chosen media is held in memory; :meth:`watch_updates` drops it when
+    another instance publishes a new bot:start_video version.
+    """
+
+    def __init__(self, bot: "Bot", path: str = "media/Giveaway.mp4") -> None:
+        self.client = bot.client
+        self.storage = bot.storage
+        self.path = path
+        self._media: Optional[StartMedia] = None
+        # Last bot:start_video:version this instance has seen
+        self._version: Optional[int] = None
+        self._upload: Optional["asyncio.Task[Optional[StartMedia]]"] = None
+
+    def use_media(self, media: StartMedia) -> None:
+        """Send ``media`` from now on without loading or uploading anything (e.g. a known Document)"""
+        self._media = media
+
+    async def warm(self) -> None:
+        """Load the cached Document or upload the video before the first /start"""
+        try:
+            await self.get()
+        except Exception as e:
+            logger.error(f"Failed to prepare start video: {e}")
+
+    async def get(self) -> StartMedia:
+        """Media to pass as ``file=`` when sending the /start message"""
+        if self._media is not None:
+            return self._media
+
+        cached = await self.storage.get_start_video()
+        if cached and cached.get("type") == "document":
+            try:
+                self._media = types.InputDocument(
+                    id=int(cached["id"]),
+                    access_hash=int(cached["access_hash"]),
+                    file_reference=bytes.fromhex(cached["file_reference"]),
+                )
+                logger.info("Using cached start video document")
+                return self._media
+            except Exception as e:
+                logger.warning(f"Failed to reconstruct cached video: {e}, will upload from media")
+                await self._set_version(await self.storage.delete_start_video())
+
+        if self._upload is None or self._upload.done():
+            self._upload = asyncio.ensure_future(self._upload_file())
+        # Shield so a cancelled /start does not abort the shared upload
+        uploaded = await asyncio.shield(self._upload)
+        if uploaded is not None:
+            return uploaded
+
+        if os.path.exists(self.path):
+            logger.info("Using video file path directly")
+            return self.path
+        raise FileNotFoundError(f"Video file not found: {self.path}")
+
+    async def _upload_file(self) -> Optional[StartMedia]:
+        """Upload the video to Telegram; the result is only valid until first send"""
+        if not os.path.exists(self.path):
+            logger.error(f"Video file not found: {self.path}")
+            return None
+        try:
+            logger.info(f"Uploading {self.path} to Telegram servers...")
+            uploaded = await self.client.upload_file(self.path)
+            logger.info("Video uploaded successfully")
+            self._media = uploaded
+            return uploaded
+        except Exception as e:
+            logger.error(f"Failed to upload video: {e}")
+            return None
+
+    async def remember_sent(self, message: types.Message) -> None:
+        """Keep the Document from a sent message so later sends skip the upload"""
+        if isinstance(self._media, types.InputDocument):
+            # A concurrent send already stored one
+            return
+        document = getattr(getattr(message, "media", None), "document", None)
+        if not isinstance(document, types.Document):
+            return
+        self._media = types.InputDocument(
+            id=document.id,
+            access_hash=document.access_hash,
+            file_reference=document.file_reference,
+        )
+        await self._set_version(await self.storage.save_start_video({
+            "type": "document",
+            "id": document.id,
+            "access_hash": document.access_hash,
+            "file_reference": document.file_reference.hex(),
+        }))
+        logger.info("Start video document cached for reuse")
+
+    async def invalidate(self, media: StartMedia) -> None:
+        """Forget ``media`` after a failed send (unless it was already replaced)"""
+        if self._media is not media:
+            return
+        self._media = None
+        if isinstance(media, types.InputDocument):
+            await self._set_version(await self.storage.delete_start_video())
+
+    async def _set_version(self, version: int) -> None:
+        """Record our own change before announcing it, so its echo is not taken for another instance's"""
+        self._version = version
+        await self.storage.publish_start_video_version(version)
+
+    async def watch_updates(self) -> None:
+        """Drop the in-memory media when another instance refreshes the video"""
+        delay = 1
+        while True:
+            try:
+                # Catch up on versions published while we were not subscribed
+                self._apply_version(await self.storage.get_start_video_version())
+                async for version in self.storage.iter_start_video_updates():
+                    delay = 1
+                    self._apply_version(version)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Start video updates subscription failed: {e}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _apply_version(self, version: int) -> None:
+        if version == self._version:
+            return
+        if self._version is not None and self._media is not None:
+            logger.info(f"Start video changed on another instance (version {version}), reloading")
+            self._media = None
+        self._version = version
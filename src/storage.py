@@ -1,9 +1,197 @@
-from typing import Set, Optional, Dict
+from typing import Set, Optional, Dict, AsyncIterator, Iterable, Iterator, List, Tuple
+from itertools import islice
 from redis import Redis
+from redis.exceptions import ResponseError
+from redis.asyncio import BlockingConnectionPool, ConnectionPool as AsyncConnectionPool, Redis as AsyncRedis
 from .config import Config
+from .metrics import instrument_storage
+from .models import BotEvent, BoostChange, ChannelDiff, ChannelEvent, ChannelRecord
 import json
+import time
 
+def _chunks(items: Iterable[int], size: int) -> Iterator[List[int]]:
+    """Yield lists of at most ``size`` items without materializing the input"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _set_bits(bitmap: bytearray, offset: int, flags: Iterable[bool]) -> None:
+    """Append flags to an LSB-first bitmap starting at bit ``offset``"""
+    for i, flag in enumerate(flags, start=offset):
+        if i // 8 >= len(bitmap):
+            bitmap.append(0)
+        if flag:
+            bitmap[i // 8] |= 1 << (i % 8)
+
+
+def _boost_score(expire_date: Optional[int]) -> float:
+    """Sorted-set score for a boost: its expiry, or +inf when unknown"""
+    return float(expire_date) if expire_date else float("inf")
+
+
+def _boosts_key(channel_id: int) -> str:
+    return f"channel:{channel_id}:boosts"
+
+
+def _owners_key(channel_id: int) -> str:
+    return f"channel:{channel_id}:users"
+
+
+def _info_key(channel_id: int) -> str:
+    return f"channel:{channel_id}:info"
+
+
+def _user_channels_key(user_id: int) -> str:
+    return f"user:{user_id}:channels"
+
+
+def _boost_active(score: Optional[float], now: float) -> bool:
+    """Whether a boost score (its expiry) is still in the future"""
+    return score is not None and score > now
+
+
+def _select_boosters(user_ids: List[int], scores: List[Optional[float]], now: float) -> List[int]:
+    """The users whose ZMSCORE reply is an unexpired boost, in input order"""
+    return [uid for uid, score in zip(user_ids, scores) if _boost_active(score, now)]
+
+
+def _select_owners(user_ids: List[int], flags: List[int]) -> List[int]:
+    """The users whose SMISMEMBER reply says they own the channel, in input order"""
+    return [uid for uid, flag in zip(user_ids, flags) if flag]
+
+
+def _queue_boost_scores(pipe, channel_ids: List[int], user_ids: List[int]) -> None:
+    """Queue one ZMSCORE per channel for a chunk of users on a sync or asyncio pipeline"""
+    for channel_id in channel_ids:
+        pipe.zmscore(_boosts_key(channel_id), user_ids)
+
+
+def _set_booster_bits(bitmaps: Dict[int, bytearray], channel_ids: List[int], results: List[List[Optional[float]]],
+                      offset: int, now: float) -> None:
+    """Append the replies of _queue_boost_scores to each channel's bitmap"""
+    for channel_id, scores in zip(channel_ids, results):
+        _set_bits(bitmaps[channel_id], offset, (_boost_active(score, now) for score in scores))
+
+
+def _queue_events(pipe, events: Iterable[BotEvent]) -> None:
+    """Queue XADDs to bot:events, capped by length and trimmed by age, on a pipeline"""
+    queued = False
+    for event in events:
+        pipe.xadd("bot:events", event.to_fields(), maxlen=Config.EVENTS_STREAM_MAXLEN, approximate=True)
+        queued = True
+    if queued:
+        # XADD takes MAXLEN or MINID, not both; age-based trimming goes separately
+        min_id = int((time.time() - Config.EVENTS_RETENTION) * 1000)
+        pipe.xtrim("bot:events", minid=min_id, approximate=True)
+
+
+def _queue_boost_changes(pipe, changes: Iterable[BoostChange]) -> None:
+    """Queue boost membership/detail writes and their events on a sync or asyncio pipeline"""
+    events = []
+    for change in changes:
+        key = _boosts_key(change.channel_id)
+        events.append(BotEvent(
+            type=BotEvent.BOOST_ADDED if change.added else BotEvent.BOOST_REMOVED,
+            channel_id=change.channel_id,
+            user_id=change.user_id,
+            boost_id=change.boost_id,
+            expire_date=change.expire_date if change.added else None,
+        ))
+        if change.added:
+            # GT: a shorter overlapping boost never shortens a longer one
+            pipe.zadd(key, {str(change.user_id): _boost_score(change.expire_date)}, gt=True)
+            pipe.sadd("boosts:channels", change.channel_id)
+        else:
+            pipe.zrem(key, change.user_id)
+            pipe.hset(f"boost:{change.boost_id}", mapping={
+                "remove_date": change.remove_date if change.remove_date is not None else "",
+                "status": "removed",
+                "raw_removed": json.dumps(change.payload, ensure_ascii=False),
+            })
+    _queue_events(pipe, events)
+
+
+def _queue_boost_commit(pipe, update_ids: Iterable[int], offset: Optional[int]) -> None:
+    """Queue dedupe bookkeeping and the poller offset commit on a pipeline"""
+    now = time.time()
+    update_ids = list(update_ids)
+    if update_ids:
+        pipe.zadd("bot:boost_updates:seen", {str(uid): now for uid in update_ids})
+    pipe.zremrangebyscore("bot:boost_updates:seen", "-inf", now - Config.BOOST_DEDUPE_TTL)
+    if offset is not None:
+        pipe.set("bot:boost_updates:offset", offset)
+
+
+WORK_GROUP = "workers"
+
+# Take the lease if it is free, or extend it if we already hold it
+_ACQUIRE_LEASE = """
+local owner = redis.call('GET', KEYS[1])
+if owner == false or owner == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Drop the lease only if we still hold it
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def work_partition(channel_id: int, partitions: int) -> int:
+    """Partition (stream) a channel's events go to; stable for a given partition count"""
+    return abs(channel_id) % partitions
+
+
+def _work_stream(partition: int) -> str:
+    return f"work:channels:{partition}"
+
+
+def _session_key(consumer: Optional[str]) -> str:
+    return f"bot:session:{consumer}" if consumer else "bot:session"
+
+
+def _session_cache_keys(consumer: Optional[str]) -> Tuple[str, str]:
+    """Entity and update state hashes backing a RedisSession"""
+    suffix = f":{consumer}" if consumer else ""
+    return f"bot:entities{suffix}", f"bot:update_state{suffix}"
+
+
+# Worker consumer -> unix time it last ran; read by prune-worker-sessions
+WORKER_SESSIONS_SEEN_KEY = "bot:sessions:seen"
+
+
+def _parse_session_cache(entities: Dict[str, str], states: Dict[str, str]) -> Tuple[List[tuple], Dict[int, tuple]]:
+    return (
+        [(int(entity_id), *json.loads(row)) for entity_id, row in entities.items()],
+        {int(entity_id): tuple(json.loads(row)) for entity_id, row in states.items()},
+    )
+
+
+def _queue_session_cache(pipe, entities: Dict[int, tuple], states: Dict[int, tuple],
+                         consumer: Optional[str]) -> None:
+    entities_key, states_key = _session_cache_keys(consumer)
+    if entities:
+        # Row without the id: (access_hash, username, phone, name)
+        pipe.hset(entities_key, mapping={entity_id: json.dumps(row[1:]) for entity_id, row in entities.items()})
+    if states:
+        pipe.hset(states_key, mapping={entity_id: json.dumps(row) for entity_id, row in states.items()})
+
+
+@instrument_storage
 class RedisStorage:
+    """Blocking client for the maintenance CLI and the eligibility benchmark.
+
+    The bot itself only uses AsyncRedisStorage; this class keeps just what
+    those scripts call, built from the same helpers so the two never diverge.
+    """
+
     def __init__(self) -> None:
         """Initialize Redis connection"""
         self.redis_client: Redis = Redis(
@@ -13,123 +201,416 @@ class RedisStorage:
             decode_responses=True
         )
 
-    def get_bot_session(self) -> Optional[str]:
-        """Get StringSession for the bot from Redis"""
-        return self.redis_client.get("bot:session")
+    # ---- Bulk eligibility checks for the giveaway backend ----
+    def has_channel_boost_user(self, channel_id: int, user_id: int) -> bool:
+        """Проверить, есть ли у пользователя неистекший буст канала."""
+        return _boost_active(self.redis_client.zscore(_boosts_key(channel_id), int(user_id)), time.time())
+
+    def filter_boosters(self, channel_id: int, user_ids: Iterable[int], chunk_size: int = 1000) -> List[int]:
+        """Return the users with an unexpired boost of the channel, in input order (see AsyncRedisStorage)"""
+        key = _boosts_key(channel_id)
+        now = time.time()
+        boosters: List[int] = []
+        for chunk in _chunks(user_ids, chunk_size):
+            boosters.extend(_select_boosters(chunk, self.redis_client.zmscore(key, chunk), now))
+        return boosters
+
+    def boosters_across_channels(self, channel_ids: Iterable[int], user_ids: Iterable[int],
+                                 chunk_size: int = 1000) -> Dict[int, bytearray]:
+        """Check boosts of many users across many channels (see AsyncRedisStorage)"""
+        channel_ids = list(channel_ids)
+        now = time.time()
+        bitmaps: Dict[int, bytearray] = {channel_id: bytearray() for channel_id in channel_ids}
+        offset = 0
+        for chunk in _chunks(user_ids, chunk_size):
+            pipe = self.redis_client.pipeline(transaction=False)
+            _queue_boost_scores(pipe, channel_ids, chunk)
+            _set_booster_bits(bitmaps, channel_ids, pipe.execute(), offset, now)
+            offset += len(chunk)
+        return bitmaps
+
+    def filter_channel_owners(self, channel_id: int, user_ids: Iterable[int], chunk_size: int = 1000) -> List[int]:
+        """Return the users who have the channel in their list, in input order"""
+        key = _owners_key(channel_id)
+        owners: List[int] = []
+        for chunk in _chunks(user_ids, chunk_size):
+            owners.extend(_select_owners(chunk, self.redis_client.smismember(key, chunk)))
+        return owners
+
+def create_connection_pool() -> AsyncConnectionPool:
+    """Create the shared asyncio connection pool configured from Config.
+
+    The pool blocks (up to the socket timeout) instead of failing when all
+    connections are checked out, so update bursts queue for a connection.
+    """
+    return BlockingConnectionPool(
+        host=Config.REDIS_HOST,
+        port=Config.REDIS_PORT,
+        db=Config.REDIS_DB,
+        max_connections=Config.REDIS_MAX_CONNECTIONS,
+        timeout=Config.REDIS_SOCKET_TIMEOUT,
+        socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
+        decode_responses=True
+    )
+
+
+@instrument_storage
+class AsyncRedisStorage:
+    """Non-blocking Redis storage used by the bot, its workers and handlers.
+
+    All instances created without an explicit pool share one connection
+    pool per process.
+    """
+
+    _shared_pool: Optional[AsyncConnectionPool] = None
+
+    def __init__(self, pool: Optional[AsyncConnectionPool] = None) -> None:
+        """Initialize Redis connection on top of a (shared) connection pool"""
+        if pool is None:
+            if AsyncRedisStorage._shared_pool is None:
+                AsyncRedisStorage._shared_pool = create_connection_pool()
+            pool = AsyncRedisStorage._shared_pool
+        self.pool: AsyncConnectionPool = pool
+        self.redis_client: AsyncRedis = AsyncRedis(connection_pool=pool)
+        self._acquire_lease = self.redis_client.register_script(_ACQUIRE_LEASE)
+        self._release_lease = self.redis_client.register_script(_RELEASE_LEASE)
+
+    async def ping(self) -> bool:
+        """Check Redis connectivity"""
+        return bool(await self.redis_client.ping())
+
+    async def close(self) -> None:
+        """Close the client and disconnect the pool"""
+        await self.redis_client.aclose()
+        await self.pool.disconnect()
+
+    async def get_bot_session(self, consumer: Optional[str] = None) -> Optional[str]:
+        """Get StringSession for the bot (or for one worker consumer) from Redis"""
+        return await self.redis_client.get(_session_key(consumer))
 
-    def save_bot_session(self, session: str) -> None:
-        """Save StringSession for the bot to Redis"""
-        self.redis_client.set("bot:session", session)
+    async def save_bot_session(self, session: str, consumer: Optional[str] = None) -> None:
+        """Save StringSession for the bot (or for one worker consumer) to Redis"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.set(_session_key(consumer), session)
+        if consumer:
+            pipe.hset(WORKER_SESSIONS_SEEN_KEY, consumer, int(time.time()))
+        await pipe.execute()
 
-    def add_channel_for_user(self, user_id: int, channel_id: int) -> None:
-        """Add channel to user's channel list"""
-        key = f"user:{user_id}:channels"
-        self.redis_client.sadd(key, channel_id)
+    async def get_session_cache(self, consumer: Optional[str] = None) -> Tuple[List[tuple], Dict[int, tuple]]:
+        """Load persisted Telethon entity rows and update states (see RedisSession)"""
+        entities_key, states_key = _session_cache_keys(consumer)
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(entities_key)
+        pipe.hgetall(states_key)
+        entities, states = await pipe.execute()
+        return _parse_session_cache(entities, states)
 
-    def remove_channel_for_user(self, user_id: int, channel_id: int) -> None:
-        """Remove channel from user's channel list"""
-        key = f"user:{user_id}:channels"
-        self.redis_client.srem(key, channel_id)
+    async def save_session_cache(self, entities: Dict[int, tuple], states: Dict[int, tuple],
+                                 consumer: Optional[str] = None) -> None:
+        """Persist changed Telethon entity rows and update states"""
+        if not entities and not states:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        _queue_session_cache(pipe, entities, states, consumer)
+        await pipe.execute()
 
-    def get_user_channels(self, user_id: int) -> Set[int]:
+    async def add_channel_for_user(self, user_id: int, channel_id: int) -> None:
+        """Add channel to user's channel list and user to channel's owner index"""
+        pipe = self.redis_client.pipeline()
+        pipe.sadd(_user_channels_key(user_id), channel_id)
+        pipe.sadd(_owners_key(channel_id), user_id)
+        await pipe.execute()
+
+    async def add_channel_for_users(self, user_ids: Iterable[int], channel_id: int) -> None:
+        """Add channel to several users' lists in a single MULTI"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        pipe = self.redis_client.pipeline()
+        for user_id in user_ids:
+            pipe.sadd(_user_channels_key(user_id), channel_id)
+        pipe.sadd(_owners_key(channel_id), *user_ids)
+        await pipe.execute()
+
+    async def remove_channel_for_user(self, user_id: int, channel_id: int) -> None:
+        """Remove channel from user's channel list and user from channel's owner index"""
+        pipe = self.redis_client.pipeline()
+        pipe.srem(_user_channels_key(user_id), channel_id)
+        pipe.srem(_owners_key(channel_id), user_id)
+        await pipe.execute()
+
+    async def get_user_channels(self, user_id: int) -> Set[int]:
         """Get list of channels for a user"""
-        key = f"user:{user_id}:channels"
-        channels = self.redis_client.smembers(key)
+        key = _user_channels_key(user_id)
+        channels = await self.redis_client.smembers(key)
         return {int(channel) for channel in channels}
 
-    def get_users_with_channel(self, channel_id: int) -> Set[int]:
+    async def get_users_with_channel(self, channel_id: int) -> Set[int]:
         """Get all users who have this channel in their list"""
-        pattern = "user:*:channels"
-        users: Set[int] = set()
-        
-        for key in self.redis_client.scan_iter(match=pattern):
-            user_id = int(key.split(":")[1])
-            if str(channel_id) in self.redis_client.smembers(key):
-                users.add(user_id)
-                
+        key = _owners_key(channel_id)
+        return {int(user) for user in await self.redis_client.smembers(key)}
+
+    async def remove_channel_for_all_users(self, channel_id: int, batch_size: int = 500) -> Set[int]:
+        """Remove channel from every owner's list, return the affected user IDs.
+
+        Owners are read from the reverse index in one lookup, then detached
+        in pipelined batches of ``batch_size`` SREMs.
+        """
+        index_key = _owners_key(channel_id)
+        users = await self.get_users_with_channel(channel_id)
+        user_ids = list(users)
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            pipe = self.redis_client.pipeline()
+            for user_id in batch:
+                pipe.srem(_user_channels_key(user_id), channel_id)
+            # Only drop the owners we saw, so concurrent additions survive
+            pipe.srem(index_key, *batch)
+            await pipe.execute()
+        await self.redis_client.srem("channels:known", channel_id)
         return users
 
-    def save_channel_title(self, channel_id: int, title: str) -> None:
-        """Save channel title to Redis"""
-        key = f"channel:{channel_id}:title"
-        self.redis_client.set(key, title)
-
-    def get_channel_title(self, channel_id: int) -> Optional[str]:
-        """Get channel title from Redis"""
-        key = f"channel:{channel_id}:title"
-        return self.redis_client.get(key)
-
-    def save_channel_username(self, channel_id: int, username: str) -> None:
-        """Save channel username to Redis"""
-        key = f"channel:{channel_id}:username"
-        self.redis_client.set(key, username)
-
-    def get_channel_username(self, channel_id: int) -> Optional[str]:
-        """Get channel username from Redis"""
-        key = f"channel:{channel_id}:username"
-        return self.redis_client.get(key) 
-
-    def save_channel_url(self, channel_id: int, url: str) -> None:
-        """Save channel URL (public t.me link or private invite) to Redis"""
-        key = f"channel:{channel_id}:url"
-        self.redis_client.set(key, url)
-
-    def get_channel_url(self, channel_id: int) -> Optional[str]:
-        """Get channel URL (public t.me link or private invite) from Redis"""
-        key = f"channel:{channel_id}:url"
-        return self.redis_client.get(key)
-
-    def save_channel_photo_small_url(self, channel_id: int, url: str) -> None:
-        """Save small profile photo URL for the channel to Redis"""
-        key = f"channel:{channel_id}:photo_small_url"
-        self.redis_client.set(key, url)
-
-    def get_channel_photo_small_url(self, channel_id: int) -> Optional[str]:
-        """Get small profile photo URL for the channel from Redis"""
-        key = f"channel:{channel_id}:photo_small_url"
-        return self.redis_client.get(key)
-
-    def save_channel_photo_big_url(self, channel_id: int, url: str) -> None:
-        """Save big profile photo URL for the channel to Redis"""
-        key = f"channel:{channel_id}:photo_big_url"
-        self.redis_client.set(key, url)
-
-    def get_channel_photo_big_url(self, channel_id: int) -> Optional[str]:
-        """Get big profile photo URL for the channel from Redis"""
-        key = f"channel:{channel_id}:photo_big_url"
-        return self.redis_client.get(key)
-
-    # ---- Chat boosts - упрощенная структура с хранением по ключу канала ----
-    def add_channel_boost_user(self, channel_id: int, user_id: int) -> None:
+    # ---- Channel metadata: one hash per channel ----
+    async def save_channel(self, record: ChannelRecord) -> None:
+        """Save channel metadata with a single HSET"""
+        mapping = record.to_mapping()
+        if mapping:
+            pipe = self.redis_client.pipeline()
+            pipe.hset(_info_key(record.channel_id), mapping=mapping)
+            pipe.sadd("channels:known", record.channel_id)
+            await pipe.execute()
+
+    async def get_channel(self, channel_id: int) -> Optional[ChannelRecord]:
+        """Get channel metadata with a single HGETALL"""
+        return (await self.get_channels_bulk([channel_id])).get(channel_id)
+
+    async def get_channels_bulk(self, channel_ids: Iterable[int]) -> Dict[int, ChannelRecord]:
+        """Get metadata for many channels in one pipelined round trip.
+
+        Channels not yet moved by the migration are read from the legacy
+        per-field keys with one extra pipelined MGET round trip. That
+        includes hashes the reconciler created with only the fields it
+        changed: fields missing from the hash are filled in from the
+        legacy keys, and the hash wins wherever both exist.
+        """
+        names = ("title", "username", "url")
+        channel_ids = list(channel_ids)
+        pipe = self.redis_client.pipeline(transaction=False)
+        for channel_id in channel_ids:
+            pipe.hgetall(_info_key(channel_id))
+        mappings = dict(zip(channel_ids, await pipe.execute()))
+        partial = [
+            channel_id for channel_id, mapping in mappings.items()
+            if any(name not in mapping for name in names)
+        ]
+
+        if partial:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for channel_id in partial:
+                pipe.mget([f"channel:{channel_id}:{name}" for name in names])
+            for channel_id, values in zip(partial, await pipe.execute()):
+                legacy = {name: value for name, value in zip(names, values) if value is not None}
+                mappings[channel_id] = {**legacy, **mappings[channel_id]}
+        return {
+            channel_id: ChannelRecord.from_mapping(channel_id, mapping)
+            for channel_id, mapping in mappings.items()
+            if mapping
+        }
+
+    async def get_user_channels_with_metadata(self, user_id: int) -> Dict[int, ChannelRecord]:
+        """Get a user's channels together with their metadata"""
+        return await self.get_channels_bulk(await self.get_user_channels(user_id))
+
+    async def get_file_paths(self, file_ids: Iterable[str]) -> Dict[str, str]:
+        """Get cached getFile paths for many file_ids with one MGET"""
+        file_ids = list(file_ids)
+        if not file_ids:
+            return {}
+        paths = await self.redis_client.mget([f"file:{file_id}:path" for file_id in file_ids])
+        return {file_id: path for file_id, path in zip(file_ids, paths) if path}
+
+    async def save_file_paths(self, paths: Dict[str, str], ttl: int) -> None:
+        """Cache getFile paths; they expire before Telegram's download links do"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for file_id, path in paths.items():
+            pipe.set(f"file:{file_id}:path", path, ex=ttl)
+        await pipe.execute()
+
+    # ---- Admin/metadata reconciliation ----
+    async def scan_known_channels(self, cursor: int, count: int = 100) -> Tuple[int, List[int]]:
+        """One SSCAN page over channels the bot is in"""
+        cursor, members = await self.redis_client.sscan("channels:known", cursor, count=count)
+        return int(cursor), [int(m) for m in members]
+
+    async def get_channel_owners_bulk(self, channel_ids: Iterable[int]) -> Dict[int, Set[int]]:
+        """Get owners of many channels in one pipelined round trip"""
+        channel_ids = list(channel_ids)
+        pipe = self.redis_client.pipeline(transaction=False)
+        for channel_id in channel_ids:
+            pipe.smembers(_owners_key(channel_id))
+        return {
+            channel_id: {int(user) for user in users}
+            for channel_id, users in zip(channel_ids, await pipe.execute())
+        }
+
+    async def apply_channel_diffs(self, diffs: Iterable[ChannelDiff]) -> None:
+        """Write only the changed owners and metadata fields, plus admins_changed events, in one MULTI"""
+        diffs = list(diffs)
+        pipe = self.redis_client.pipeline()
+        for diff in diffs:
+            channel_id = diff.channel_id
+            for user_id in diff.added_owners:
+                pipe.sadd(_user_channels_key(user_id), channel_id)
+            for user_id in diff.removed_owners:
+                pipe.srem(_user_channels_key(user_id), channel_id)
+            if diff.added_owners:
+                pipe.sadd(_owners_key(channel_id), *diff.added_owners)
+            if diff.removed_owners:
+                pipe.srem(_owners_key(channel_id), *diff.removed_owners)
+            if diff.metadata:
+                pipe.hset(_info_key(channel_id), mapping=diff.metadata)
+        _queue_events(pipe, (
+            BotEvent(BotEvent.ADMINS_CHANGED, diff.channel_id, added=diff.added_owners, removed=diff.removed_owners)
+            for diff in diffs
+            if diff.added_owners or diff.removed_owners
+        ))
+        await pipe.execute()
+
+    async def get_reconcile_cursor(self) -> int:
+        """Get the SSCAN cursor the reconciler checkpointed"""
+        cursor = await self.redis_client.get("reconciler:cursor")
+        return int(cursor) if cursor else 0
+
+    async def save_reconcile_cursor(self, cursor: int) -> None:
+        """Checkpoint the reconciler's SSCAN cursor"""
+        await self.redis_client.set("reconciler:cursor", cursor)
+
+    # ---- Chat boosts: channel:{id}:boosts is a ZSET user_id -> expire_date ----
+    async def add_channel_boost_user(self, channel_id: int, user_id: int, expire_date: Optional[int] = None) -> None:
         """Добавить пользователя в список тех, кто пробустил канал.
         
-        Структура: channel:{channel_id}:boost_users содержит Set user_id
+        Структура: channel:{channel_id}:boosts - ZSET user_id со score = expire_date
         """
-        key = f"channel:{channel_id}:boost_users"
-        self.redis_client.sadd(key, int(user_id))
+        pipe = self.redis_client.pipeline()
+        pipe.zadd(_boosts_key(channel_id), {str(int(user_id)): _boost_score(expire_date)}, gt=True)
+        pipe.sadd("boosts:channels", channel_id)
+        await pipe.execute()
 
-    def remove_channel_boost_user(self, channel_id: int, user_id: int) -> None:
+    async def remove_channel_boost_user(self, channel_id: int, user_id: int) -> None:
         """Удалить пользователя из списка тех, кто пробустил канал."""
-        key = f"channel:{channel_id}:boost_users"
-        self.redis_client.srem(key, int(user_id))
+        key = _boosts_key(channel_id)
+        await self.redis_client.zrem(key, int(user_id))
 
-    def has_channel_boost_user(self, channel_id: int, user_id: int) -> bool:
-        """Проверить, есть ли пользователь в списке пробустивших канал."""
-        key = f"channel:{channel_id}:boost_users"
-        return bool(self.redis_client.sismember(key, int(user_id)))
-
-    def get_channel_boost_users(self, channel_id: int) -> Set[int]:
-        """Получить всех пользователей, которые пробустили канал."""
-        key = f"channel:{channel_id}:boost_users"
-        members = self.redis_client.smembers(key)
+    async def has_channel_boost_user(self, channel_id: int, user_id: int) -> bool:
+        """Проверить, есть ли у пользователя неистекший буст канала."""
+        return _boost_active(await self.redis_client.zscore(_boosts_key(channel_id), int(user_id)), time.time())
+
+    async def get_channel_boost_users(self, channel_id: int) -> Set[int]:
+        """Получить всех пользователей с неистекшим бустом канала."""
+        key = _boosts_key(channel_id)
+        members = await self.redis_client.zrangebyscore(key, f"({time.time()}", "+inf")
         return {int(uid) for uid in members}
-    
+
+    async def sweep_expired_boosts(self, batch_size: int = 200) -> int:
+        """Trim expired boosts, ``batch_size`` channels per pipelined round trip.
+
+        Reads already ignore expired members; this only reclaims memory.
+        Returns the number of removed boosts.
+        """
+        removed = 0
+        cursor = 0
+        now = time.time()
+        while True:
+            cursor, channel_ids = await self.redis_client.sscan("boosts:channels", cursor, count=batch_size)
+            if channel_ids:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for channel_id in channel_ids:
+                    key = _boosts_key(channel_id)
+                    pipe.zremrangebyscore(key, "-inf", now)
+                    pipe.zcard(key)
+                results = await pipe.execute()
+                removed += sum(results[0::2])
+                # A later boost re-adds the channel to the index
+                empty = [cid for cid, size in zip(channel_ids, results[1::2]) if size == 0]
+                if empty:
+                    await self.redis_client.srem("boosts:channels", *empty)
+            if cursor == 0:
+                return removed
+
+    # ---- Bulk eligibility checks for the giveaway backend ----
+    async def filter_boosters(self, channel_id: int, user_ids: Iterable[int], chunk_size: int = 1000) -> List[int]:
+        """Return the users with an unexpired boost of the channel, in input order.
+
+        Uses one ZMSCORE per ``chunk_size`` users, so memory per round trip
+        stays bounded however large ``user_ids`` is.
+        """
+        key = _boosts_key(channel_id)
+        now = time.time()
+        boosters: List[int] = []
+        for chunk in _chunks(user_ids, chunk_size):
+            boosters.extend(_select_boosters(chunk, await self.redis_client.zmscore(key, chunk), now))
+        return boosters
+
+    async def boosters_across_channels(self, channel_ids: Iterable[int], user_ids: Iterable[int],
+                                 chunk_size: int = 1000) -> Dict[int, bytearray]:
+        """Check boosts of many users across many channels.
+
+        Returns a bitmap per channel: bit ``i`` (byte ``i // 8``, mask
+        ``1 << (i % 8)``) is set when ``user_ids[i]`` has an unexpired boost.
+        Each chunk of users is checked against all channels in one pipeline.
+        """
+        channel_ids = list(channel_ids)
+        now = time.time()
+        bitmaps: Dict[int, bytearray] = {channel_id: bytearray() for channel_id in channel_ids}
+        offset = 0
+        for chunk in _chunks(user_ids, chunk_size):
+            pipe = self.redis_client.pipeline(transaction=False)
+            _queue_boost_scores(pipe, channel_ids, chunk)
+            _set_booster_bits(bitmaps, channel_ids, await pipe.execute(), offset, now)
+            offset += len(chunk)
+        return bitmaps
+
+    async def filter_channel_owners(self, channel_id: int, user_ids: Iterable[int], chunk_size: int = 1000) -> List[int]:
+        """Return the users who have the channel in their list, in input order"""
+        key = _owners_key(channel_id)
+        owners: List[int] = []
+        for chunk in _chunks(user_ids, chunk_size):
+            owners.extend(_select_owners(chunk, await self.redis_client.smismember(key, chunk)))
+        return owners
+
+    async def get_boost_updates_offset(self) -> int:
+        """Get the committed getUpdates offset for the boost poller"""
+        offset = await self.redis_client.get("bot:boost_updates:offset")
+        return int(offset) if offset else 0
+
+    async def filter_unseen_boost_updates(self, update_ids: Iterable[int]) -> Set[int]:
+        """Return the update IDs that were not applied within the dedupe TTL"""
+        update_ids = list(update_ids)
+        if not update_ids:
+            return set()
+        scores = await self.redis_client.zmscore("bot:boost_updates:seen", update_ids)
+        return {uid for uid, score in zip(update_ids, scores) if score is None}
+
+    async def apply_boost_changes(self, changes: Iterable[BoostChange], update_ids: Iterable[int] = (),
+                            offset: Optional[int] = None) -> None:
+        """Apply a batch of boost changes atomically in one MULTI/EXEC.
+
+        The applied update IDs are recorded in the dedupe set and the poller
+        offset is committed in the same transaction.
+        """
+        pipe = self.redis_client.pipeline()
+        _queue_boost_changes(pipe, changes)
+        _queue_boost_commit(pipe, update_ids, offset)
+        await pipe.execute()
+
     # ---- Детальная информация о бустах (опционально, для истории) ----
-    def save_chat_boost_details(self, channel_id: int, boost_id: str, user_id: int,
+    async def save_chat_boost_details(self, channel_id: int, boost_id: str, user_id: int,
                                  add_date: Optional[int], expire_date: Optional[int], payload: Dict) -> None:
         """Сохранить детальную информацию о бусте (опционально)."""
         boost_key = f"boost:{boost_id}"
-        self.redis_client.hset(boost_key, mapping={
+        await self.redis_client.hset(boost_key, mapping={
             "channel_id": channel_id,
             "user_id": user_id,
             "add_date": add_date if add_date is not None else "",
@@ -138,7 +619,7 @@ class RedisStorage:
             "raw": json.dumps(payload, ensure_ascii=False),
         })
 
-    def remove_chat_boost_details(self, boost_id: str, remove_date: Optional[int], payload: Dict) -> None:
+    async def remove_chat_boost_details(self, boost_id: str, remove_date: Optional[int], payload: Dict) -> None:
         """Обновить информацию о бусте как удаленном (опционально)."""
         boost_key = f"boost:{boost_id}"
         mapping = {
@@ -146,27 +627,153 @@ class RedisStorage:
             "status": "removed",
             "raw_removed": json.dumps(payload, ensure_ascii=False),
         }
-        self.redis_client.hset(boost_key, mapping=mapping)
-
-    def publish_bot_removed(self, channel_id: int) -> None:
-        """Publish event about bot removal from a channel to Redis Stream."""
-        stream_key = "bot:events"
-        event = {
-            "type": "bot_removed",
-            "channel_id": str(channel_id)
-        }
-        # xadd returns the ID of the added entry, but we don't need it here
-        self.redis_client.xadd(stream_key, event)
+        await self.redis_client.hset(boost_key, mapping=mapping)
+
+    async def publish_events(self, events: Iterable[BotEvent]) -> None:
+        """Publish lifecycle events to the bot:events stream in one pipelined batch"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        _queue_events(pipe, events)
+        await pipe.execute()
+
+    async def save_start_video(self, data: Dict) -> int:
+        """Save start video data to Redis and bump its version.
 
-    def save_start_video(self, data: Dict) -> None:
-        """Save start video data to Redis"""
-        self.redis_client.set("bot:start_video", json.dumps(data))
+        Returns the new start video version; the caller records it, then
+        announces it with :meth:`publish_start_video_version`.
+        """
+        pipe = self.redis_client.pipeline()
+        pipe.set("bot:start_video", json.dumps(data))
+        pipe.incr("bot:start_video:version")
+        return (await pipe.execute())[1]
 
-    def get_start_video(self) -> Optional[Dict]:
+    async def get_start_video(self) -> Optional[Dict]:
         """Get start video data from Redis"""
-        data = self.redis_client.get("bot:start_video")
+        data = await self.redis_client.get("bot:start_video")
         return json.loads(data) if data else None
 
-    def delete_start_video(self) -> None:
-        """Delete start video cache from Redis"""
-        self.redis_client.delete("bot:start_video")
+    async def get_start_video_version(self) -> int:
+        """Get the start video version, bumped on every save/delete"""
+        version = await self.redis_client.get("bot:start_video:version")
+        return int(version) if version else 0
+
+    async def delete_start_video(self) -> int:
+        """Delete start video cache from Redis and bump its version (publish it separately)"""
+        pipe = self.redis_client.pipeline()
+        pipe.delete("bot:start_video")
+        pipe.incr("bot:start_video:version")
+        return (await pipe.execute())[1]
+
+    async def publish_start_video_version(self, version: int) -> None:
+        """Tell other instances the start video changed"""
+        await self.redis_client.publish("bot:start_video:updates", version)
+
+    async def iter_start_video_updates(self) -> AsyncIterator[int]:
+        """Yield start video versions published by any instance"""
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe("bot:start_video:updates")
+        try:
+            async for message in pubsub.listen():
+                yield int(message["data"])
+        finally:
+            await pubsub.reset()
+
+    # ---- Leases (leader election, work partitions) ----
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the lease at ``key`` if free or extend it if ``owner`` holds it"""
+        return bool(await self._acquire_lease(keys=[key], args=[owner, int(ttl * 1000)]))
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        """Delete the lease at ``key`` if ``owner`` still holds it"""
+        await self._release_lease(keys=[key], args=[owner])
+
+    # ---- Channel work streams (receiver/worker roles) ----
+    async def enqueue_channel_events(self, events: Iterable[ChannelEvent], partitions: int,
+                                     offset: Optional[int] = None) -> None:
+        """Queue events on their channel's partition stream in one MULTI/EXEC.
+
+        ``offset`` (the boost poller's getUpdates offset) is committed in the
+        same transaction, so a batch is either queued and committed or neither.
+        """
+        pipe = self.redis_client.pipeline()
+        for event in events:
+            pipe.xadd(
+                _work_stream(work_partition(event.channel_id, partitions)),
+                event.to_fields(),
+                maxlen=Config.WORK_STREAM_MAXLEN,
+                approximate=True,
+            )
+        _queue_boost_commit(pipe, (), offset)
+        await pipe.execute()
+
+    async def ensure_work_groups(self, partitions: int) -> None:
+        """Create the consumer group on every partition stream"""
+        for partition in range(partitions):
+            try:
+                await self.redis_client.xgroup_create(_work_stream(partition), WORK_GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def heartbeat_worker(self, consumer: str, ttl: float) -> int:
+        """Record a worker heartbeat and return the number of live workers"""
+        now = time.time()
+        pipe = self.redis_client.pipeline()
+        pipe.zadd("work:workers", {consumer: now})
+        pipe.zremrangebyscore("work:workers", "-inf", now - ttl)
+        pipe.zcard("work:workers")
+        # Unlike work:workers this survives shutdown: it tells live sessions from orphaned ones
+        pipe.hset(WORKER_SESSIONS_SEEN_KEY, consumer, int(now))
+        return (await pipe.execute())[2]
+
+    async def remove_worker(self, consumer: str) -> None:
+        """Forget a worker that is shutting down"""
+        await self.redis_client.zrem("work:workers", consumer)
+
+    async def acquire_partition(self, partition: int, consumer: str, ttl: float) -> bool:
+        """Take or renew the lease on a partition; False if another worker holds it"""
+        return await self.acquire_lease(f"{_work_stream(partition)}:lease", consumer, ttl)
+
+    async def release_partition(self, partition: int, consumer: str) -> None:
+        """Give up a partition lease held by ``consumer``"""
+        await self.release_lease(f"{_work_stream(partition)}:lease", consumer)
+
+    async def claim_channel_events(self, partition: int, consumer: str,
+                                   count: int = 100) -> List[Tuple[str, ChannelEvent]]:
+        """Take over every pending entry of a partition, oldest first.
+
+        Called right after acquiring the lease, so entries left unacknowledged
+        by a previous owner (or by us before an error) are redelivered before
+        anything new and per-channel order is kept.
+        """
+        claimed: List[Tuple[str, ChannelEvent]] = []
+        start = "0-0"
+        while True:
+            result = await self.redis_client.xautoclaim(
+                _work_stream(partition), WORK_GROUP, consumer, min_idle_time=0, start_id=start, count=count
+            )
+            start, entries = result[0], result[1]
+            claimed.extend((entry_id, ChannelEvent.from_fields(entry)) for entry_id, entry in entries if entry)
+            if start == "0-0":
+                return claimed
+
+    async def read_channel_events(self, partition: int, consumer: str, count: int = 100,
+                                  block_ms: int = 2000) -> List[Tuple[str, ChannelEvent]]:
+        """Read new entries of a partition for ``consumer``, blocking up to ``block_ms``"""
+        response = await self.redis_client.xreadgroup(
+            WORK_GROUP, consumer, {_work_stream(partition): ">"}, count=count, block=block_ms
+        )
+        return [
+            (entry_id, ChannelEvent.from_fields(entry))
+            for _, entries in response or []
+            for entry_id, entry in entries
+        ]
+
+    async def ack_channel_events(self, partition: int, entry_ids: List[str]) -> None:
+        """Acknowledge and delete processed entries"""
+        if not entry_ids:
+            return
+        stream = _work_stream(partition)
+        pipe = self.redis_client.pipeline()
+        pipe.xack(stream, WORK_GROUP, *entry_ids)
+        pipe.xdel(stream, *entry_ids)
+        await pipe.execute()
@@ -0,0 +1,137 @@
+import asyncio
+import hmac
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from aiohttp import web
+from loguru import logger
+
+from .config import Config
+
+BoostBatchHandler = Callable[[List[dict]], Awaitable[None]]
+
+
+class BoostWebhookServer:
+    """Async HTTP endpoint receiving chat_boost/removed_chat_boost webhooks.
+
+    Requests must carry Telegram's secret token header (boost updates grant
+    giveaway eligibility, so the endpoint never runs open) and are put on a
+    bounded queue; when the queue is full the server answers 503 so Telegram
+    retries later. A single consumer drains the queue in batches into the
+    same batch handler the poller uses. A request is answered 200 only once
+    its batch has been committed; anything not committed by shutdown gets a
+    503 and is redelivered by Telegram (the batch handler dedupes by update_id).
+    """
+
+    SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+    def __init__(self,
+                 handler: BoostBatchHandler,
+                 host: str = "0.0.0.0",
+                 port: Optional[int] = None,
+                 path: Optional[str] = None,
+                 secret: Optional[str] = None,
+                 queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None) -> None:
+        self.handler = handler
+        self.host = host
+        self.port = port or Config.WEBHOOK_PORT
+        self.path = path or Config.WEBHOOK_PATH
+        self.secret = secret if secret is not None else Config.WEBHOOK_SECRET
+        if not self.secret:
+            raise ValueError("Boost webhook requires a secret token")
+        self.batch_size = batch_size or Config.WEBHOOK_BATCH_SIZE
+        # Each update waits with the future its request answers on
+        self.queue: "asyncio.Queue[Tuple[dict, asyncio.Future]]" = asyncio.Queue(
+            maxsize=queue_size or Config.WEBHOOK_QUEUE_SIZE
+        )
+        self._runner: Optional[web.AppRunner] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._draining = False
+
+    async def start(self) -> None:
+        """Start the HTTP listener and the queue consumer"""
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._consumer = asyncio.ensure_future(self._consume())
+        logger.info(f"Boost webhook listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Refuse new updates, commit what was already accepted, then stop"""
+        self._draining = True
+        if self._consumer is not None:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{self.queue.qsize()} queued boost updates left for Telegram to redeliver")
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+            # Their requests answer 503; nothing was acknowledged to Telegram
+            while not self.queue.empty():
+                _, committed = self.queue.get_nowait()
+                _resolve(committed, False)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        """Validate and enqueue one webhook update; answer once it is committed"""
+        if not hmac.compare_digest(request.headers.get(self.SECRET_HEADER, ""), self.secret):
+            return web.Response(status=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            return web.Response(status=400)
+        if self._draining:
+            return web.Response(status=503)
+        committed = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((update, committed))
+        except asyncio.QueueFull:
+            # Telegram redelivers on non-2xx, which gives us backpressure for free
+            logger.warning("Boost webhook queue is full, asking Telegram to retry")
+            return web.Response(status=503)
+        # Shielded: a dropped connection must not cancel the consumer's future
+        return web.Response(status=200 if await asyncio.shield(committed) else 503)
+
+    async def _consume(self) -> None:
+        """Drain the queue in batches; a failed batch is retried, not dropped"""
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self._apply(batch)
+            finally:
+                # Committed, or cancelled at shutdown before it was
+                for _, committed in batch:
+                    _resolve(committed, False)
+                    self.queue.task_done()
+
+    async def _apply(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        delay = 1
+        while True:
+            try:
+                await self.handler([update for update, _ in batch])
+                for _, committed in batch:
+                    _resolve(committed, True)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to apply webhook boost batch: {str(e)}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+def _resolve(future: asyncio.Future, committed: bool) -> None:
+    if not future.done():
+        future.set_result(committed)
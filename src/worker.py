@@ -0,0 +1,149 @@
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+import asyncio
+import math
+
+from telethon.errors import FloodWaitError, RPCError
+from loguru import logger
+
+from .config import Config
+from .models import ChannelEvent
+
+if TYPE_CHECKING:
+    from .bot import Bot
+    from .handlers import ChatEventHandler
+
+
+class ChannelWorker:
+    """Consume channel events queued by the receiver (BOT_ROLE=worker).
+
+    Events live on ``WORK_PARTITIONS`` streams keyed by channel id. Each
+    partition is leased to exactly one live worker, which processes its
+    entries one at a time, so events for one channel stay ordered. Live
+    workers split the partitions evenly; when a worker stops renewing its
+    leases (crash, network split) another one takes the partition over and
+    claims its pending entries before reading new ones.
+    """
+
+    def __init__(self, bot: "Bot", handler: "ChatEventHandler") -> None:
+        self.storage = bot.storage
+        self.handler = handler
+        self.consumer = Config.WORK_CONSUMER
+        self.partitions = Config.WORK_PARTITIONS
+        self.lease_ttl = Config.WORK_LEASE_TTL
+        self.batch_size = Config.WORK_BATCH_SIZE
+        self._owned: Dict[int, asyncio.Task] = {}
+        # Partitions being handed back once their current batch is done
+        self._releasing: Set[int] = set()
+
+    async def run(self) -> None:
+        """Balance partition leases forever; consumption runs in per-partition tasks.
+
+        Cancelling this only stops rebalancing; call :meth:`stop` afterwards.
+        """
+        await self.storage.ensure_work_groups(self.partitions)
+        logger.info(f"Worker {self.consumer} consuming {self.partitions} channel partitions")
+        while True:
+            try:
+                await self._rebalance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Worker lease renewal failed: {str(e)}")
+            await asyncio.sleep(self.lease_ttl / 3)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Finish the entries being processed, then hand every partition back.
+
+        Partitions still busy after ``timeout`` are cancelled; their current
+        entry stays pending and is redelivered to the next owner.
+        """
+        self._releasing.update(self._owned)
+        tasks = list(self._owned.values())
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        for partition in list(self._owned):
+            await self._release(partition)
+        try:
+            await self.storage.remove_worker(self.consumer)
+        except Exception as e:
+            logger.warning(f"Failed to deregister worker {self.consumer}: {str(e)}")
+
+    async def _rebalance(self) -> None:
+        """Renew held leases, then grow or shrink to this worker's fair share"""
+        live = await self.storage.heartbeat_worker(self.consumer, self.lease_ttl)
+        target = math.ceil(self.partitions / max(live, 1))
+
+        for partition, task in list(self._owned.items()):
+            if task.done():
+                await self._release(partition)
+            elif not await self.storage.acquire_partition(partition, self.consumer, self.lease_ttl):
+                # Our lease lapsed and someone else took it; stop at once
+                logger.warning(f"Lost lease on partition {partition}")
+                task.cancel()
+                self._owned.pop(partition, None)
+                self._releasing.discard(partition)
+
+        active = [p for p in self._owned if p not in self._releasing]
+        for partition in active[target:]:
+            self._releasing.add(partition)
+
+        for partition in range(self.partitions):
+            if len(self._owned) - len(self._releasing) >= target:
+                break
+            if partition in self._owned:
+                continue
+            if await self.storage.acquire_partition(partition, self.consumer, self.lease_ttl):
+                logger.info(f"Acquired partition {partition}")
+                self._owned[partition] = asyncio.ensure_future(self._consume(partition))
+
+    async def _release(self, partition: int) -> None:
+        self._owned.pop(partition, None)
+        self._releasing.discard(partition)
+        try:
+            await self.storage.release_partition(partition, self.consumer)
+            logger.info(f"Released partition {partition}")
+        except Exception as e:
+            logger.warning(f"Failed to release partition {partition}: {str(e)}")
+
+    async def _consume(self, partition: int) -> None:
+        """Process one partition in order until asked to release it"""
+        delay = 1
+        reclaim = True
+        while partition not in self._releasing:
+            try:
+                if reclaim:
+                    # Entries a previous owner (or a failed batch) left unacknowledged go first
+                    entries = await self.storage.claim_channel_events(partition, self.consumer)
+                    if entries:
+                        logger.info(f"Claimed {len(entries)} pending entries on partition {partition}")
+                    reclaim = False
+                else:
+                    entries = await self.storage.read_channel_events(partition, self.consumer, self.batch_size)
+                await self._process(partition, entries)
+                delay = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Partition {partition} batch failed: {str(e)}, retrying in {delay}s")
+                reclaim = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def _process(self, partition: int, entries: List[Tuple[str, ChannelEvent]]) -> None:
+        """Handle entries in stream order, acknowledging each once it is done"""
+        for entry_id, event in entries:
+            while True:
+                try:
+                    await self.handler.process_event(event)
+                    break
+                except FloodWaitError as e:
+                    logger.warning(f"Flood wait {e.seconds}s on {event.type} for channel {event.channel_id}")
+                    await asyncio.sleep(e.seconds)
+                except RPCError as e:
+                    # Telegram refused (bot removed again, no rights...): retrying will not help
+                    logger.error(f"Dropping {event.type} for channel {event.channel_id}: {str(e)}")
+                    break
+            await self.storage.ack_channel_events(partition, [entry_id])
@@ -0,0 +1,27 @@
+import os
+
+# Config reads these at import; the tests never talk to Telegram
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "test")
+os.environ.setdefault("BOT_TOKEN", "0:test")
+
+import pytest
+
+
+@pytest.fixture
+def make_storage():
+    """Factory for an AsyncRedisStorage on a fresh in-memory fakeredis server.
+
+    Call it inside the test's event loop (the connection pool binds to it).
+    """
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+
+    from src.storage import AsyncRedisStorage
+
+    def make() -> AsyncRedisStorage:
+        return AsyncRedisStorage(ConnectionPool(
+            connection_class=FakeConnection, server=FakeServer(), decode_responses=True,
+        ))
+    return make
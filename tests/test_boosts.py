@@ -0,0 +1,62 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.handlers import ChatEventHandler
+from src.models import BotEvent
+
+CHANNEL_ID = -1009999000001
+USER_ID = 9900000001
+
+
+def _boost(update_id: int, boost_id: str, user_id: int = USER_ID, removed: bool = False) -> dict:
+    source = {"source": "premium", "user": {"id": user_id}}
+    if removed:
+        return {"update_id": update_id, "removed_chat_boost": {
+            "chat": {"id": CHANNEL_ID}, "boost_id": boost_id, "remove_date": int(time.time()), "source": source,
+        }}
+    return {"update_id": update_id, "chat_boost": {"chat": {"id": CHANNEL_ID}, "boost": {
+        "boost_id": boost_id, "add_date": int(time.time()), "expire_date": int(time.time()) + 86400,
+        "source": source,
+    }}}
+
+
+async def _apply(storage, *batches):
+    """Apply each batch in turn; returns the boosters and the published event types"""
+    handler = ChatEventHandler(SimpleNamespace(client=None, storage=storage, bot_api=None, onboarding=None))
+    handler.queue_work = False
+    for batch in batches:
+        await handler._apply_boost_updates(batch, offset=max(upd["update_id"] for upd in batch) + 1)
+    boosters = await storage.get_channel_boost_users(CHANNEL_ID)
+    entries = await storage.redis_client.xrange("bot:events")
+    offset = await storage.get_boost_updates_offset()
+    await storage.close()
+    return boosters, [BotEvent.from_fields(fields).type for _, fields in entries], offset
+
+
+def test_redelivered_updates_are_applied_once(make_storage):
+    first = [_boost(1, "a"), _boost(2, "b", user_id=USER_ID + 1)]
+    # A refetched batch overlapping the one already applied
+    second = [_boost(2, "b", user_id=USER_ID + 1), _boost(3, "c", user_id=USER_ID + 2)]
+    boosters, published, offset = asyncio.run(_apply(make_storage(), first, second, second))
+
+    assert boosters == {USER_ID, USER_ID + 1, USER_ID + 2}
+    assert published == [BotEvent.BOOST_ADDED] * 3
+    assert offset == 4
+
+
+def test_updates_for_one_user_collapse_to_the_final_state(make_storage):
+    # Out of order on purpose: the latest update_id wins, not the list position
+    batch = [_boost(12, "a", removed=True), _boost(11, "a"), _boost(13, "b", user_id=USER_ID + 1)]
+    boosters, published, _ = asyncio.run(_apply(make_storage(), batch))
+
+    assert boosters == {USER_ID + 1}
+    assert published == [BotEvent.BOOST_REMOVED, BotEvent.BOOST_ADDED]
+
+
+def test_readd_after_removal_in_one_batch_keeps_the_boost(make_storage):
+    batch = [_boost(21, "a"), _boost(22, "a", removed=True), _boost(23, "a2")]
+    boosters, published, _ = asyncio.run(_apply(make_storage(), batch))
+
+    assert boosters == {USER_ID}
+    assert published == [BotEvent.BOOST_ADDED]
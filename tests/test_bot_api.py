@@ -0,0 +1,84 @@
+import asyncio
+import socket
+
+import pytest
+from aiohttp import web
+
+from src.bot_api import BotAPIClient, BotAPIError
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _serve(responses):
+    """Local Bot API answering each method from its list of (status, body) in turn; None outlasts the timeout"""
+    calls = []
+
+    async def handle(request):
+        method = request.match_info["method"]
+        calls.append(method)
+        response = responses[method].pop(0)
+        if response is None:
+            await asyncio.sleep(1)
+            return web.Response(status=504)
+        status, body = response
+        return web.Response(status=status, text=body, content_type="text/html" if status >= 500 else "application/json")
+
+    port = _free_port()
+    app = web.Application()
+    app.router.add_post("/bot0:test/{method}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    client = BotAPIClient(token="0:test", base_url=f"http://127.0.0.1:{port}", timeout=0.2, max_retries=1)
+    return runner, client, calls
+
+
+def test_html_5xx_is_retried_like_any_other_5xx():
+    async def scenario():
+        runner, client, calls = await _serve({
+            "getChat": [(502, "<html>Bad Gateway</html>"), (200, '{"ok": true, "result": {"id": 1}}')],
+        })
+        try:
+            return await client.get_chat(1), calls
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == ({"id": 1}, ["getChat", "getChat"])
+
+
+def test_timeouts_are_retried_only_for_idempotent_methods():
+    ok = (200, '{"ok": true, "result": {"invite_link": "https://t.me/+x"}}')
+
+    async def scenario():
+        runner, client, calls = await _serve({"getChat": [None, ok], "createChatInviteLink": [None, ok]})
+        try:
+            chat = await client.get_chat(1)
+            with pytest.raises(asyncio.TimeoutError):
+                await client.create_chat_invite_link(1)
+            return chat, calls
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    chat, calls = asyncio.run(scenario())
+    assert chat == {"invite_link": "https://t.me/+x"}
+    assert calls == ["getChat", "getChat", "createChatInviteLink"]
+
+
+def test_non_json_4xx_is_not_retried():
+    async def scenario():
+        runner, client, calls = await _serve({"getChat": [(404, "not found")]})
+        try:
+            with pytest.raises(BotAPIError) as error:
+                await client.get_chat(1)
+            return error.value.error_code, calls
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == (404, ["getChat"])
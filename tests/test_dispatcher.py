@@ -0,0 +1,165 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+
+from src.dispatcher import KeyedDispatcher
+
+
+class _Gate:
+    """Jobs that record their start and finish and wait until released"""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.log: List[Tuple[str, object]] = []
+        self.active = 0
+        self.peak = 0
+
+    def job(self, label: object):
+        async def run() -> None:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.log.append(("start", label))
+            await self.release.wait()
+            self.log.append(("done", label))
+            self.active -= 1
+        return run
+
+    def started(self) -> List[object]:
+        return [label for event, label in self.log if event == "start"]
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_jobs_for_one_key_run_in_order_and_concurrency_is_capped():
+    async def scenario():
+        gate = _Gate()
+        dispatcher = KeyedDispatcher(concurrency=2, max_pending=100, max_per_key=100, overflow="reject")
+        for i in range(4):
+            for key in ("a", "b", "c"):
+                assert await dispatcher.submit(key, "test", gate.job((key, i)))
+        await _settle()
+        first_wave = list(gate.started())
+        gate.release.set()
+        await dispatcher.stop(timeout=1)
+        return gate, first_wave
+
+    gate, first_wave = asyncio.run(scenario())
+    assert len(first_wave) == 2
+    assert gate.peak == 2
+    for key in ("a", "b", "c"):
+        # Never two jobs of one key at once, and always in submission order
+        events = [(event, label[1]) for event, label in gate.log if label[0] == key]
+        assert events == [(event, i) for i in range(4) for event in ("start", "done")]
+
+
+def test_reject_drops_the_new_job_when_the_key_is_full():
+    async def scenario():
+        gate = _Gate()
+        dispatcher = KeyedDispatcher(concurrency=1, max_pending=100, max_per_key=2, overflow="reject")
+        accepted = [await dispatcher.submit("a", "test", gate.job(i)) for i in range(4)]
+        await _settle()
+        accepted.append(await dispatcher.submit("a", "test", gate.job(4)))
+        gate.release.set()
+        await dispatcher.stop(timeout=1)
+        return accepted, gate.started()
+
+    accepted, started = asyncio.run(scenario())
+    # 0 and 1 fill the key, 2 and 3 are rejected; once 0 holds the slot it is off the queue and 4 fits
+    assert accepted == [True, True, False, False, True]
+    assert started == [0, 1, 4]
+
+
+def test_drop_oldest_discards_the_oldest_waiting_job_of_the_key():
+    async def scenario():
+        gate = _Gate()
+        dispatcher = KeyedDispatcher(concurrency=1, max_pending=100, max_per_key=2, overflow="drop_oldest")
+        await dispatcher.submit("a", "test", gate.job(0))
+        await _settle()  # 0 is running
+        accepted = [await dispatcher.submit("a", "test", gate.job(i)) for i in range(1, 5)]
+        gate.release.set()
+        await dispatcher.stop(timeout=1)
+        return accepted, gate.started()
+
+    accepted, started = asyncio.run(scenario())
+    assert accepted == [True, True, True, True]
+    assert started == [0, 3, 4]
+
+
+def test_global_cap_bounds_waiting_jobs_across_keys():
+    async def scenario():
+        gate = _Gate()
+        dispatcher = KeyedDispatcher(concurrency=1, max_pending=3, max_per_key=100, overflow="drop_oldest")
+        accepted = [await dispatcher.submit(key, "test", gate.job(key)) for key in range(6)]
+        depth = dispatcher.depth
+        gate.release.set()
+        await dispatcher.stop(timeout=1)
+        return accepted, depth
+
+    accepted, depth = asyncio.run(scenario())
+    # A key with nothing waiting has nothing to drop, so the new job goes
+    assert accepted == [True, True, True, False, False, False]
+    assert depth == 3
+
+
+def test_block_waits_for_room_instead_of_dropping():
+    async def scenario():
+        gate = _Gate()
+        dispatcher = KeyedDispatcher(concurrency=1, max_pending=1, max_per_key=100, overflow="block")
+        await dispatcher.submit("a", "test", gate.job(0))
+        await _settle()  # 0 is running, nothing waits
+        await dispatcher.submit("a", "test", gate.job(1))
+        blocked = asyncio.ensure_future(dispatcher.submit("a", "test", gate.job(2)))
+        await _settle()
+        was_blocked = not blocked.done()
+        gate.release.set()
+        accepted = await blocked
+        await dispatcher.stop(timeout=1)
+        return was_blocked, accepted, gate.started()
+
+    was_blocked, accepted, started = asyncio.run(scenario())
+    assert was_blocked and accepted
+    assert started == [0, 1, 2]
+
+
+def test_stop_drains_then_cancels_what_is_left():
+    async def scenario():
+        gate = _Gate()
+        dispatcher = KeyedDispatcher(concurrency=1, max_pending=100, max_per_key=100, overflow="reject")
+        for i in range(3):
+            await dispatcher.submit("a", "test", gate.job(i))
+        await dispatcher.stop(timeout=0.05)
+        accepted_after_stop = await dispatcher.submit("a", "test", gate.job(3))
+        return gate.log, accepted_after_stop, dispatcher.running
+
+    log, accepted_after_stop, running = asyncio.run(scenario())
+    assert log == [("start", 0)]
+    assert not accepted_after_stop
+    assert running == 0
+
+
+def test_a_failing_job_does_not_stop_the_key():
+    async def scenario():
+        ran = []
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def ok():
+            ran.append("ok")
+
+        dispatcher = KeyedDispatcher(concurrency=1, max_pending=10, max_per_key=10, overflow="reject")
+        await dispatcher.submit("a", "test", fail)
+        await dispatcher.submit("a", "test", ok)
+        await dispatcher.stop(timeout=1)
+        return ran
+
+    assert asyncio.run(scenario()) == ["ok"]
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        KeyedDispatcher(overflow="spill")
@@ -0,0 +1,30 @@
+import time
+
+from fakeredis import FakeRedis
+
+from src.maintenance import prune_worker_sessions
+from src.storage import WORKER_SESSIONS_SEEN_KEY, RedisStorage
+
+
+def _session_keys(consumer: str):
+    return [f"bot:session:{consumer}", f"bot:entities:{consumer}", f"bot:update_state:{consumer}"]
+
+
+def test_prune_removes_only_idle_worker_sessions():
+    storage = RedisStorage()
+    storage.redis_client = client = FakeRedis(decode_responses=True)
+    now = int(time.time())
+    for consumer in ("live", "gone", "legacy"):
+        client.set(f"bot:session:{consumer}", "session")
+        client.hset(f"bot:entities:{consumer}", "1", "[]")
+        client.hset(f"bot:update_state:{consumer}", "1", "[]")
+    client.set("bot:session", "receiver session")
+    client.hset(WORKER_SESSIONS_SEEN_KEY, mapping={"live": now - 60, "gone": now - 30 * 86400})
+
+    removed = prune_worker_sessions(storage, idle=7 * 86400)
+
+    assert removed == ["gone"]
+    assert not client.exists(*_session_keys("gone"))
+    # Sessions without a last-seen time are stamped, not deleted
+    assert client.exists(*_session_keys("live"), *_session_keys("legacy"), "bot:session") == 7
+    assert set(client.hgetall(WORKER_SESSIONS_SEEN_KEY)) == {"live", "legacy"}
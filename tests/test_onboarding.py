@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+from telethon.tl import types
+
+from benchmarks.stubs import BOT_ID, StubTelegramClient
+from src.handlers import ChatEventHandler
+from src.models import BotEvent, ChannelEvent
+from src.onboarding import ChannelOnboarding
+
+CHANNEL_ID = -1009999000000001
+ACTOR_ID = 9900000001
+
+
+class _BotAPI:
+    async def get_chat(self, chat_id):
+        return {"id": chat_id, "invite_link": f"https://t.me/+test{abs(chat_id)}", "photo": {}}
+
+
+def _handler(storage) -> ChatEventHandler:
+    bot = SimpleNamespace(
+        storage=storage, client=StubTelegramClient(), bot_api=_BotAPI(), recorder=None,
+        me=types.User(id=BOT_ID, bot=True),
+    )
+    bot.onboarding = ChannelOnboarding(bot, dedupe_window=60)
+    handler = ChatEventHandler(bot)
+    handler.queue_work = False
+    return handler
+
+
+def test_readd_after_kick_within_dedupe_window_onboards_again(make_storage):
+    async def scenario():
+        storage = make_storage()
+        handler = _handler(storage)
+        for event_type in (ChannelEvent.BOT_ADDED, ChannelEvent.BOT_REMOVED, ChannelEvent.BOT_ADDED):
+            await handler.process_event(ChannelEvent(event_type, CHANNEL_ID, actor_id=ACTOR_ID))
+
+        owners = await storage.get_users_with_channel(CHANNEL_ID)
+        known = await storage.redis_client.sismember("channels:known", CHANNEL_ID)
+        entries = await storage.redis_client.xrange("bot:events")
+        await storage.close()
+        return owners, known, [BotEvent.from_fields(fields).type for _, fields in entries]
+
+    owners, known, published = asyncio.run(scenario())
+    assert ACTOR_ID in owners
+    assert len(owners) > 1  # the stub's admins, not just the actor
+    assert known
+    assert published == [BotEvent.BOT_ADDED, BotEvent.BOT_REMOVED, BotEvent.BOT_ADDED]
+
+
+def test_repeated_add_within_dedupe_window_is_skipped(make_storage):
+    async def scenario():
+        storage = make_storage()
+        handler = _handler(storage)
+        for _ in range(2):
+            await handler.process_event(ChannelEvent(ChannelEvent.BOT_ADDED, CHANNEL_ID, actor_id=ACTOR_ID))
+        entries = await storage.redis_client.xrange("bot:events")
+        await storage.close()
+        return handler.client.calls, len(entries)
+
+    calls, published = asyncio.run(scenario())
+    assert calls["iter_participants"] == 1
+    assert published == 1
@@ -0,0 +1,95 @@
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import aiohttp
+
+from src.models import ChannelRecord
+from src.photos import PhotoApiServer, PhotoUrlResolver
+
+CHANNELS = [-1009999000001, -1009999000002, -1009999000003]
+
+
+class _BotAPI:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def get_file(self, file_id):
+        self.calls.append(file_id)
+        await asyncio.sleep(0.01)
+        return {"file_id": file_id, "file_path": f"photos/{file_id}.jpg"}
+
+    def file_url(self, file_path):
+        return f"https://files.test/{file_path}"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _seed(storage) -> None:
+    # The last channel has no photo
+    for i, channel_id in enumerate(CHANNELS):
+        await storage.save_channel(ChannelRecord(
+            channel_id, title=f"Channel {i}", username="", url="",
+            photo_small_file_id=f"small{i}" if i < 2 else "",
+            photo_big_file_id=f"big{i}" if i < 2 else "",
+        ))
+
+
+def test_concurrent_misses_share_one_get_file(make_storage):
+    async def scenario():
+        storage = make_storage()
+        bot_api = _BotAPI()
+        resolver = PhotoUrlResolver(SimpleNamespace(storage=storage, bot_api=bot_api), ttl=60)
+        results = await asyncio.gather(
+            resolver.resolve("a"), resolver.resolve("a"), resolver.resolve_many(["a", "b", "a"]),
+        )
+        # A second resolver (another replica) finds the paths in Redis
+        other = PhotoUrlResolver(SimpleNamespace(storage=storage, bot_api=_BotAPI()), ttl=60)
+        from_redis = await other.resolve_many(["a", "b"])
+        ttl = await storage.redis_client.ttl("file:a:path")
+        await storage.close()
+        return results, from_redis, bot_api.calls, other.bot_api.calls, ttl
+
+    results, from_redis, calls, other_calls, ttl = asyncio.run(scenario())
+    assert results[0] == results[1] == "https://files.test/photos/a.jpg"
+    assert results[2] == {"a": "https://files.test/photos/a.jpg", "b": "https://files.test/photos/b.jpg"}
+    assert sorted(calls) == ["a", "b"]
+    assert from_redis == results[2] and other_calls == []
+    assert 0 < ttl <= 60
+
+
+def test_photo_api_serves_channel_photo_urls(make_storage):
+    async def scenario():
+        storage = make_storage()
+        await _seed(storage)
+        resolver = PhotoUrlResolver(SimpleNamespace(storage=storage, bot_api=_BotAPI()))
+        port = _free_port()
+        server = PhotoApiServer(resolver, host="127.0.0.1", port=port, token="t0ken")
+        await server.start()
+        url = f"http://127.0.0.1:{port}{server.PATH}"
+        ids = ",".join(str(c) for c in CHANNELS)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, params={"ids": ids}) as resp:
+                    unauthorized = resp.status
+                headers = {"Authorization": "Bearer t0ken"}
+                async with session.get(url, params={"ids": ids, "size": "big"}, headers=headers) as resp:
+                    body = await resp.json()
+                async with session.get(url, params={"ids": "x"}, headers=headers) as resp:
+                    bad = resp.status
+        finally:
+            await server.stop()
+            await storage.close()
+        return unauthorized, body, bad
+
+    unauthorized, body, bad = asyncio.run(scenario())
+    assert unauthorized == 401
+    assert body == {
+        str(CHANNELS[0]): "https://files.test/photos/big0.jpg",
+        str(CHANNELS[1]): "https://files.test/photos/big1.jpg",
+    }
+    assert bad == 400
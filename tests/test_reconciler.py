@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import Config
+
+from benchmarks.stubs import StubTelegramClient
+from src.models import ChannelRecord
+from src.onboarding import ChannelOnboarding
+from src.reconciler import ChannelReconciler
+
+CHANNEL_ID = -1009999000001
+INVITE = "https://t.me/+private1"
+
+
+class _BotAPI:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def get_chat(self, chat_id):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return {"id": chat_id, "invite_link": INVITE}
+
+
+async def _reconcile(storage, stored_url: str):
+    """Reconcile one channel the stub reports without a username; returns (record, getChat calls)"""
+    await storage.save_channel(ChannelRecord(CHANNEL_ID, title=f"Channel {abs(CHANNEL_ID)}",
+                                             username="oldname" if "+" not in stored_url else "",
+                                             url=stored_url))
+    bot_api = _BotAPI()
+    bot = SimpleNamespace(storage=storage, client=StubTelegramClient(), bot_api=bot_api)
+    bot.onboarding = ChannelOnboarding(bot)
+    await ChannelReconciler(bot)._reconcile_page([CHANNEL_ID])
+    record = await storage.get_channel(CHANNEL_ID)
+    await storage.close()
+    return record, bot_api.calls
+
+
+def test_channel_turned_private_gets_an_invite_link(make_storage):
+    record, calls = asyncio.run(_reconcile(make_storage(), "https://t.me/oldname"))
+    assert record.username == ""
+    assert record.url == INVITE
+    assert calls == 1
+
+
+@pytest.mark.parametrize("stored_url", [INVITE, "https://t.me/joinchat/AAAA"])
+def test_private_channel_with_an_invite_link_is_left_alone(make_storage, stored_url):
+    record, calls = asyncio.run(_reconcile(make_storage(), stored_url))
+    assert record.url == stored_url
+    assert calls == 0
+
+
+def test_invite_links_for_turned_private_channels_respect_the_limits(make_storage, monkeypatch):
+    monkeypatch.setattr(Config, "RECONCILE_CONCURRENCY", 2)
+    monkeypatch.setattr(Config, "RECONCILE_RATE", 1000.0)
+    channel_ids = [CHANNEL_ID - i for i in range(6)]
+
+    async def scenario():
+        storage = make_storage()
+        for channel_id in channel_ids:
+            await storage.save_channel(ChannelRecord(channel_id, title=f"Channel {abs(channel_id)}",
+                                                     username="oldname", url="https://t.me/oldname"))
+        bot_api = _BotAPI()
+        bot = SimpleNamespace(storage=storage, client=StubTelegramClient(), bot_api=bot_api)
+        bot.onboarding = ChannelOnboarding(bot)
+        reconciler = ChannelReconciler(bot)
+        acquired = []
+        acquire = reconciler.limiter.acquire
+
+        async def counting_acquire():
+            acquired.append(1)
+            await acquire()
+
+        reconciler.limiter.acquire = counting_acquire
+        await reconciler._reconcile_page(channel_ids)
+        urls = [(await storage.get_channel(channel_id)).url for channel_id in channel_ids]
+        await storage.close()
+        return bot_api, len(acquired), urls
+
+    bot_api, acquired, urls = asyncio.run(scenario())
+    assert urls == [INVITE] * len(channel_ids)
+    assert bot_api.max_running <= 2
+    # Entity and admin lookups, plus one getChat per channel
+    assert acquired == 3 * len(channel_ids)
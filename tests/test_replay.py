@@ -0,0 +1,20 @@
+from benchmarks import replay
+from src.config import Config
+
+
+def test_replay_runs_updates_through_the_registered_handlers(monkeypatch, capsys):
+    # The sender's default global rate would pace the /start replies
+    monkeypatch.setattr(Config, "SEND_GLOBAL_RATE", 1000.0)
+    monkeypatch.setattr(Config, "BOOST_UPDATES_MODE", Config.BOOST_UPDATES_MODE)
+    code = replay.main([
+        "--synthetic", "200", "--channels", "20", "--fake-redis",
+        "--api-latency-ms", "0", "--mtproto-latency-ms", "0", "--drain-timeout", "10",
+    ])
+    out = capsys.readouterr().out
+
+    assert code == 0, out
+    assert "handler errors: 0" in out
+    # Joins reached onboarding through the dispatcher, boosts came in over getUpdates
+    assert "'iter_participants'" in out
+    assert "'getUpdates'" in out
+    assert "'send_message'" in out
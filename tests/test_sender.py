@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+from src.sender import OutboundScheduler
+
+CHAT_ID = 9900000001
+
+
+def test_stop_waits_for_sends_already_in_flight():
+    async def scenario():
+        sender = OutboundScheduler(workers=1, global_rate=100.0, per_chat_rate=100.0)
+        sent = []
+
+        async def send():
+            await asyncio.sleep(0.3)
+            sent.append(CHAT_ID)
+
+        sender.start()
+        sender.submit(CHAT_ID, send)
+        # The worker has taken the job off the queue: depth is already 0
+        await asyncio.sleep(0.05)
+        assert sender.depth == 0
+        await sender.stop(timeout=5)
+        return sent
+
+    assert asyncio.run(scenario()) == [CHAT_ID]
+
+
+def test_chat_limit_holds_when_workers_wait_on_the_global_bucket():
+    async def scenario():
+        sender = OutboundScheduler(workers=2, global_rate=50.0, per_chat_rate=2.0)
+        sent_at = []
+
+        async def send():
+            sent_at.append(time.monotonic())
+
+        # Both jobs pass the chat check, then queue up behind the global bucket
+        sender._global.pause(0.1)
+        sender.start()
+        sender.submit(CHAT_ID, send)
+        sender.submit(CHAT_ID, send)
+        await sender.stop(timeout=5)
+        return sent_at
+
+    first, second = asyncio.run(scenario())
+    assert second - first >= 0.4
@@ -0,0 +1,57 @@
+import asyncio
+import datetime
+
+from telethon.tl import types
+
+from src.bot import Bot
+from src.session import RedisSession
+
+
+def _state(pts: int) -> types.updates.State:
+    return types.updates.State(
+        pts=pts, qts=0, seq=0, unread_count=0,
+        date=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+
+
+class _Client:
+    """Writes the final update state on disconnect, as TelegramClient does"""
+
+    def __init__(self, session: RedisSession) -> None:
+        self.session = session
+
+    async def disconnect(self) -> None:
+        self.session.set_update_state(0, _state(42))
+
+
+def test_flush_round_trips_update_state(make_storage):
+    async def scenario():
+        storage = make_storage()
+        session = RedisSession()
+        session.set_update_state(0, _state(7))
+        written = await session.flush(storage)
+        second = await session.flush(storage)
+        _, states = await storage.get_session_cache()
+        await storage.close()
+        return written, second, states
+
+    written, second, states = asyncio.run(scenario())
+    assert (written, second) == (1, 0)
+    assert states[0][0] == 7
+    assert RedisSession(update_states=states).get_update_state(0).pts == 7
+
+
+def test_shutdown_persists_the_state_written_on_disconnect(make_storage):
+    async def scenario():
+        bot = Bot()
+        bot.storage = make_storage()
+        bot.session = RedisSession()
+        bot.session.set_update_state(0, _state(7))
+        bot.client = _Client(bot.session)
+        await bot.shutdown()
+        # The closed client reconnects on use
+        _, states = await bot.storage.get_session_cache()
+        await bot.storage.close()
+        return states
+
+    assert asyncio.run(scenario())[0][0] == 42
@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telethon import errors
+
+from benchmarks.stubs import StubTelegramClient
+from src.handlers import CommandHandler
+from src.start_video import StartVideo, is_stale_media_error
+
+CACHED = {"type": "document", "id": 1, "access_hash": 2, "file_reference": b"old".hex()}
+
+
+class _FailingClient(StubTelegramClient):
+    """Raises the queued errors from send_message, then sends normally"""
+
+    def __init__(self, *failures: Exception) -> None:
+        super().__init__()
+        self.failures = list(failures)
+
+    async def send_message(self, chat_id, message, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        return await super().send_message(chat_id, message, **kwargs)
+
+
+async def _reply(storage, client: _FailingClient):
+    """Send one /start reply with a Document cached in Redis; returns (error, version, cached)"""
+    await storage.save_start_video(CACHED)
+    handler = CommandHandler(SimpleNamespace(client=client, storage=storage))
+    error = None
+    try:
+        await handler._send_start_reply(1)
+    except Exception as e:
+        error = e
+    version = await storage.get_start_video_version()
+    cached = await storage.get_start_video()
+    await storage.close()
+    return error, version, cached
+
+
+@pytest.mark.parametrize("error", [
+    errors.FileReferenceExpiredError(request=None),
+    errors.MediaEmptyError(request=None),
+    errors.FilePartMissingError(request=None, capture=3),
+    errors.RPCError(None, "FILE_ID_UNKNOWN", 400),
+])
+def test_media_errors_are_stale(error):
+    assert is_stale_media_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    errors.UserIsBlockedError(request=None),
+    errors.PeerIdInvalidError(request=None),
+    ConnectionError("reset"),
+    asyncio.TimeoutError(),
+])
+def test_chat_and_network_errors_are_not_stale(error):
+    assert not is_stale_media_error(error)
+
+
+def test_blocked_user_keeps_the_cached_document(make_storage):
+    error, version, cached = asyncio.run(_reply(make_storage(), _FailingClient(errors.UserIsBlockedError(request=None))))
+    assert isinstance(error, errors.UserIsBlockedError)
+    # No reload was published and the shared Document is untouched
+    assert version == 1
+    assert cached == CACHED
+
+
+def test_expired_reference_replaces_the_cached_document(make_storage):
+    client = _FailingClient(errors.FileReferenceExpiredError(request=None))
+    error, version, cached = asyncio.run(_reply(make_storage(), client))
+    assert error is None
+    assert client.calls["upload_file"] == 1
+    # Deleted (version 2) and replaced by the Document of the successful send (version 3)
+    assert version == 3
+    assert cached["id"] == 4242
+
+
+def test_own_version_announcement_keeps_the_document(make_storage):
+    async def scenario():
+        storage = make_storage()
+        start_video = StartVideo(SimpleNamespace(client=StubTelegramClient(), storage=storage))
+        watcher = asyncio.ensure_future(start_video.watch_updates())
+        await asyncio.sleep(0.05)
+        # Another instance invalidated the video before this one's first send
+        await storage.publish_start_video_version(await storage.delete_start_video())
+        await asyncio.sleep(0.05)
+        message = await start_video.client.send_message(1, "hi", file="media/Giveaway.mp4")
+        await start_video.remember_sent(message)
+        # Our own announcement comes back over pub/sub
+        await asyncio.sleep(0.05)
+        media = await start_video.get()
+        watcher.cancel()
+        await asyncio.gather(watcher, return_exceptions=True)
+        await storage.close()
+        return media, start_video.client.calls.get("upload_file", 0)
+
+    media, uploads = asyncio.run(scenario())
+    assert media.id == 4242
+    assert uploads == 0
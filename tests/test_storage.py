@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from fakeredis import FakeRedis, FakeServer
+from fakeredis.aioredis import FakeConnection
+from redis.asyncio import ConnectionPool
+
+from src.models import ChannelDiff
+from src.storage import AsyncRedisStorage, RedisStorage
+
+CHANNELS = [-1009999000001, -1009999000002]
+USERS = list(range(9900000000, 9900000040))
+
+
+def _seed(client: FakeRedis) -> None:
+    now = time.time()
+    for i, user_id in enumerate(USERS):
+        # Every third user has an expired boost, every other one owns the first channel
+        client.zadd(f"channel:{CHANNELS[i % 2]}:boosts", {str(user_id): now - 60 if i % 3 == 0 else now + 3600})
+        if i % 2 == 0:
+            client.sadd(f"channel:{CHANNELS[0]}:users", user_id)
+
+
+def test_sync_eligibility_checks_match_the_async_ones():
+    server = FakeServer()
+    sync_storage = RedisStorage()
+    sync_storage.redis_client = FakeRedis(server=server, decode_responses=True)
+    _seed(sync_storage.redis_client)
+
+    async def check(storage):
+        return (
+            [await storage.has_channel_boost_user(CHANNELS[0], uid) for uid in USERS],
+            await storage.filter_boosters(CHANNELS[0], USERS, chunk_size=7),
+            await storage.boosters_across_channels(CHANNELS, USERS, chunk_size=7),
+            await storage.filter_channel_owners(CHANNELS[0], USERS, chunk_size=7),
+        )
+
+    async def scenario():
+        storage = AsyncRedisStorage(ConnectionPool(
+            connection_class=FakeConnection, server=server, decode_responses=True,
+        ))
+        try:
+            return await check(storage)
+        finally:
+            await storage.close()
+
+    expected = asyncio.run(scenario())
+    actual = (
+        [sync_storage.has_channel_boost_user(CHANNELS[0], uid) for uid in USERS],
+        sync_storage.filter_boosters(CHANNELS[0], USERS, chunk_size=7),
+        sync_storage.boosters_across_channels(CHANNELS, USERS, chunk_size=7),
+        sync_storage.filter_channel_owners(CHANNELS[0], USERS, chunk_size=7),
+    )
+
+    assert actual == expected
+    has_boost, boosters, bitmaps, owners = actual
+    assert boosters == [uid for uid, active in zip(USERS, has_boost) if active]
+    assert boosters == [uid for i, uid in enumerate(USERS) if i % 2 == 0 and i % 3 != 0]
+    assert owners == USERS[0::2]
+    first = bitmaps[CHANNELS[0]]
+    assert [bool(first[i // 8] & (1 << (i % 8))) for i in range(len(USERS))] == has_boost
+
+
+def test_reconciled_fields_merge_with_unmigrated_legacy_keys(make_storage):
+    async def scenario():
+        storage = make_storage()
+        channel_id = CHANNELS[0]
+        await storage.redis_client.mset({
+            f"channel:{channel_id}:title": "Legacy title",
+            f"channel:{channel_id}:username": "oldname",
+            f"channel:{channel_id}:url": "https://t.me/oldname",
+        })
+        # The reconciler only writes what changed, creating a partial hash
+        await storage.apply_channel_diffs([ChannelDiff(channel_id, metadata={"username": "newname"})])
+        record = await storage.get_channel(channel_id)
+        await storage.close()
+        return record
+
+    record = asyncio.run(scenario())
+    assert (record.title, record.username, record.url) == ("Legacy title", "newname", "https://t.me/oldname")
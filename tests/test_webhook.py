@@ -0,0 +1,101 @@
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from src.config import Config
+from src.handlers import ChatEventHandler
+from src.webhook import BoostWebhookServer
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _noop(batch):
+    pass
+
+
+def test_webhook_requires_a_secret():
+    with pytest.raises(ValueError):
+        BoostWebhookServer(_noop, secret="")
+
+
+def test_webhook_rejects_requests_without_the_secret():
+    async def scenario():
+        port = _free_port()
+        server = BoostWebhookServer(_noop, host="127.0.0.1", port=port, path="/hook", secret="s3cret")
+        await server.start()
+        url = f"http://127.0.0.1:{port}/hook"
+        statuses = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for headers in ({}, {server.SECRET_HEADER: "wrong"}, {server.SECRET_HEADER: "s3cret"}):
+                    async with session.post(url, json={"update_id": 1}, headers=headers) as resp:
+                        statuses.append(resp.status)
+        finally:
+            await server.stop(timeout=1)
+        return statuses
+
+    assert asyncio.run(scenario()) == [401, 401, 200]
+
+
+@pytest.mark.parametrize("url, secret", [("", "s3cret"), ("https://example.org", "")])
+def test_webhook_mode_without_url_or_secret_fails_register(monkeypatch, url, secret):
+    monkeypatch.setattr(Config, "BOOST_UPDATES_MODE", "webhook")
+    monkeypatch.setattr(Config, "WEBHOOK_URL", url)
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET", secret)
+
+    async def scenario():
+        client = SimpleNamespace(add_event_handler=lambda *args: None)
+        handler = ChatEventHandler(SimpleNamespace(client=client, storage=None, bot_api=None, onboarding=None))
+        await handler.register()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def test_webhook_answers_only_after_the_batch_commits():
+    async def scenario():
+        committed = []
+        release = asyncio.Event()
+
+        async def handler(batch):
+            await release.wait()
+            committed.extend(upd["update_id"] for upd in batch)
+
+        port = _free_port()
+        server = BoostWebhookServer(handler, host="127.0.0.1", port=port, path="/hook", secret="s3cret")
+        await server.start()
+        url = f"http://127.0.0.1:{port}/hook"
+        headers = {server.SECRET_HEADER: "s3cret"}
+        try:
+            async with aiohttp.ClientSession() as session:
+                async def post(update_id):
+                    async with session.post(url, json={"update_id": update_id}, headers=headers) as resp:
+                        return resp.status, list(committed)
+
+                first = asyncio.ensure_future(post(1))
+                await asyncio.sleep(0.1)
+                assert not first.done()
+                release.set()
+                status, seen = await first
+
+                # A batch that cannot commit before shutdown is answered 503, not acknowledged
+                release.clear()
+                stuck = asyncio.ensure_future(post(2))
+                await asyncio.sleep(0.1)
+                await server.stop(timeout=0.2)
+                stuck_status, _ = await stuck
+        finally:
+            await server.stop(timeout=1)
+        return status, seen, stuck_status, committed
+
+    status, seen, stuck_status, committed = asyncio.run(scenario())
+    assert (status, seen) == (200, [1])
+    assert stuck_status == 503
+    assert committed == [1]